@@ -0,0 +1,5 @@
+"""Offline benchmarks for the Notion ToDo integration.
+
+Run a benchmark from the repository root, e.g.
+``python -m benchmarks.property_index``.
+"""
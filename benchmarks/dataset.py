@@ -0,0 +1,100 @@
+"""Synthetic Notion pages shaped like the official ToDo template."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import random
+
+from custom_components.notion_todo.const import (
+    TASK_DATE_PROPERTY,
+    TASK_DESCRIPTION_PROPERTY,
+    TASK_STATUS_PROPERTY,
+)
+
+STATUSES = {
+    "not-started": "Not started",
+    "in-progress": "In progress",
+    "done": "Done",
+    "archived": "Archived",
+}
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp(value: datetime) -> str:
+    """Format a timestamp the way Notion does."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def rich_text(content: str, annotations: dict | None = None, link: dict | None = None) -> list[dict]:
+    """Build a rich text array with a single text segment."""
+    return [{
+        "type": "text",
+        "text": {"content": content, "link": link},
+        "annotations": {
+            "bold": False, "italic": False, "strikethrough": False,
+            "underline": False, "code": False, "color": "default",
+            **(annotations or {}),
+        },
+        "plain_text": content,
+        "href": link["url"] if link else None,
+    }]
+
+
+def make_schema(database_id: str = "database", extra_properties: int = 0) -> dict:
+    """Build the database object of the ToDo template."""
+    properties = {
+        "Task name": {"id": "title", "name": "Task name", "type": "title", "title": {}},
+        "Status": {"id": TASK_STATUS_PROPERTY, "name": "Status", "type": "status", "status": {
+            "options": [{"id": id, "name": name, "color": "default"} for id, name in STATUSES.items()],
+            "groups": [],
+        }},
+        "Due": {"id": TASK_DATE_PROPERTY, "name": "Due", "type": "date", "date": {}},
+        "Summary": {"id": TASK_DESCRIPTION_PROPERTY, "name": "Summary", "type": "rich_text", "rich_text": {}},
+    }
+    for extra in range(extra_properties):
+        properties[f"Extra {extra}"] = {"id": f"x{extra:03d}", "name": f"Extra {extra}", "type": "checkbox", "checkbox": {}}
+    return {
+        "object": "database",
+        "id": database_id,
+        "title": rich_text("Tasks"),
+        "properties": properties,
+    }
+
+
+def make_page(number: int, extra_properties: int = 0, seed: int = 0) -> dict:
+    """Build a task page with the template properties and filler properties.
+
+    The properties are shuffled, so the template properties are spread over
+    the page as they are in a real database.
+    """
+    rng = random.Random(seed + number)
+    status = rng.choice(list(STATUSES))
+    created = CREATED + timedelta(minutes=number)
+    properties = {
+        "Task name": {"id": "title", "type": "title", "title": rich_text(f"Task {number}")},
+        "Status": {"id": TASK_STATUS_PROPERTY, "type": "status", "status": {
+            "id": status, "name": STATUSES[status], "color": "default"
+        }},
+        "Due": {"id": TASK_DATE_PROPERTY, "type": "date", "date": {
+            "start": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "end": None, "time_zone": None
+        }},
+        "Summary": {"id": TASK_DESCRIPTION_PROPERTY, "type": "rich_text", "rich_text": rich_text(f"Description {number}")},
+    }
+    for extra in range(extra_properties):
+        properties[f"Extra {extra}"] = {"id": f"x{extra:03d}", "type": "checkbox", "checkbox": False}
+    items = list(properties.items())
+    rng.shuffle(items)
+    return {
+        "object": "page",
+        "id": f"{number:08d}-0000-0000-0000-000000000000",
+        "created_time": timestamp(created),
+        "last_edited_time": timestamp(created + timedelta(minutes=number % 60)),
+        "archived": False,
+        "in_trash": False,
+        "parent": {"type": "database_id", "database_id": "database"},
+        "properties": dict(items),
+    }
+
+
+def make_pages(count: int, extra_properties: int = 0, seed: int = 0) -> list[dict]:
+    """Build count task pages."""
+    return [make_page(number, extra_properties, seed) for number in range(count)]
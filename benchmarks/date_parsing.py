@@ -0,0 +1,65 @@
+"""Benchmark parsing Notion dates with strptime against the ISO 8601 helper."""
+from __future__ import annotations
+
+from datetime import datetime
+import json
+import random
+import sys
+from time import perf_counter
+
+from custom_components.notion_todo.notion_date_helper import _parse_date_only, parse_date
+
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = DATE_FORMAT + 'T%H:%M:%S.%f%z'
+
+
+def make_dates(count: int, seed: int = 0) -> list[str]:
+    """Build due dates as Notion returns them, mostly date-only values."""
+    rng = random.Random(seed)
+    dates = []
+    for _ in range(count):
+        day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if rng.random() < 0.8:
+            dates.append(day)
+        else:
+            dates.append(f"{day}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000+00:00")
+    return dates
+
+
+def parse_strptime(values: list[str]) -> float:
+    """Parse with the former strptime based path and return the seconds taken."""
+    started = perf_counter()
+    for value in values:
+        if len(value) > 10:
+            datetime.strptime(value, DATETIME_FORMAT)
+        else:
+            datetime.strptime(value, DATE_FORMAT)
+    return perf_counter() - started
+
+
+def parse_iso(values: list[str]) -> float:
+    """Parse with the ISO 8601 helper and return the seconds taken."""
+    started = perf_counter()
+    for value in values:
+        parse_date(value)
+    return perf_counter() - started
+
+
+def run(count: int = 10_000) -> dict:
+    """Run the benchmark and return the result."""
+    values = make_dates(count)
+    _parse_date_only.cache_clear()
+    strptime = parse_strptime(values)
+    iso = parse_iso(values)
+    return {
+        "benchmark": "date_parsing",
+        "dates": count,
+        "strptime_s": round(strptime, 4),
+        "iso_s": round(iso, 4),
+        "speedup": round(strptime / iso, 1),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout)
+    sys.stdout.write("\n")
@@ -0,0 +1,300 @@
+"""In-process stand-in for the parts of the Notion API the integration uses."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+import json
+import uuid
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.notion_todo.notion_rich_text import MAX_TEXT_LENGTH
+
+from .dataset import STATUSES, make_pages, make_schema, rich_text, timestamp
+
+
+class FakeNotionServer:
+    """Serve one task database with the query, page and block endpoints.
+
+    Query responses are paginated with opaque cursors and honour timestamp,
+    status and compound filters. Latency and rate limiting can be injected to
+    mimic the real API under load, unavailable answers every request with 503
+    to mimic an outage. With compress, responses are sent gzip encoded, so
+    their Content-Length is the compressed size.
+    """
+
+    def __init__(
+        self,
+        tasks: int = 0,
+        token: str = "secret",
+        database_id: str = "database",
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.0,
+        extra_properties: int = 0,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            tasks (int): number of task pages in the database
+            token (str): bearer token the server accepts
+            database_id (str): id of the database
+            latency (float): seconds every response is delayed
+            rate_limit_every (int): answer every nth request with 429, 0 never
+            retry_after (float): Retry-After of the injected 429 responses
+            extra_properties (int): filler properties per page
+
+        """
+        self.token = token
+        self.database_id = database_id
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.unavailable = False
+        self.compress = False
+        self.schema = make_schema(database_id, extra_properties)
+        self.pages = {page["id"]: page for page in make_pages(tasks, extra_properties)}
+        for page in self.pages.values():
+            page["parent"]["database_id"] = database_id
+        self.blocks: dict[str, list[dict]] = {}
+        self.requests: Counter[str] = Counter()
+        self.queries: list[dict] = []
+        self._count = 0
+        self._server: TestServer | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL to pass to NotionApiClient."""
+        return str(self._server.make_url("/v1"))
+
+    async def start(self) -> FakeNotionServer:
+        """Start serving on a free local port."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/v1/databases/{id}", self._get_database)
+        app.router.add_post("/v1/databases/{id}/query", self._query_database)
+        app.router.add_post("/v1/pages", self._create_page)
+        app.router.add_get("/v1/pages/{id}", self._get_page)
+        app.router.add_patch("/v1/pages/{id}", self._update_page)
+        app.router.add_get("/v1/blocks/{id}/children", self._get_block_children)
+        app.router.add_delete("/v1/blocks/{id}", self._delete_block)
+        self._server = TestServer(app)
+        await self._server.start_server()
+        return self
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            await self._server.close()
+
+    async def __aenter__(self) -> FakeNotionServer:
+        """Start the server."""
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the server."""
+        await self.close()
+
+    def rename_property(self, name: str, new_name: str) -> None:
+        """Rename a property of the database and its pages, as a user would in Notion."""
+        self.schema["properties"][new_name] = {**self.schema["properties"].pop(name), "name": new_name}
+        for page in self.pages.values():
+            page["properties"][new_name] = page["properties"].pop(name)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self._count += 1
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[f"{request.method} {route}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.unavailable:
+            return self._error(503, "service_unavailable", "Notion is unavailable.")
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return self._error(401, "unauthorized", "API token is invalid.")
+        if self.rate_limit_every and self._count % self.rate_limit_every == 0:
+            response = self._error(429, "rate_limited", "Rate limited.")
+            response.headers["Retry-After"] = str(self.retry_after)
+            return response
+        response = await handler(request)
+        if self.compress:
+            response.enable_compression(web.ContentCoding.gzip)
+        return response
+
+    async def _get_database(self, request: web.Request) -> web.Response:
+        if request.match_info["id"] != self.database_id:
+            return self._not_found(request.match_info["id"])
+        return web.json_response(self.schema)
+
+    async def _query_database(self, request: web.Request) -> web.Response:
+        if request.match_info["id"] != self.database_id:
+            return self._not_found(request.match_info["id"])
+        body = await request.json() if request.can_read_body else {}
+        self.queries.append(body)
+        pages = [page for page in self.pages.values() if not page["archived"]]
+        if body.get("filter"):
+            pages = [page for page in pages if self._matches(page, body["filter"])]
+        for sort in reversed(body.get("sorts") or []):
+            pages.sort(key=lambda page, sort=sort: self._sort_key(page, sort), reverse=sort.get("direction") == "descending")
+        page_size = min(body.get("page_size", 100), 100)
+        start = int(body.get("start_cursor") or 0)
+        end = start + page_size
+        has_more = end < len(pages)
+        return web.json_response({
+            "object": "list",
+            "results": pages[start:end],
+            "next_cursor": str(end) if has_more else None,
+            "has_more": has_more,
+            "type": "page_or_database",
+            "page_or_database": {},
+        })
+
+    async def _create_page(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        now = timestamp(datetime.now(timezone.utc))
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "in_trash": False,
+            "parent": body["parent"],
+            "properties": {
+                name: self._empty_property(prop) for name, prop in self.schema["properties"].items()
+            },
+        }
+        self._set_properties(page, body.get("properties", {}))
+        self.pages[page["id"]] = page
+        return web.json_response(page)
+
+    async def _get_page(self, request: web.Request) -> web.Response:
+        page = self.pages.get(request.match_info["id"])
+        if page is None:
+            return self._not_found(request.match_info["id"])
+        return web.json_response(page)
+
+    async def _update_page(self, request: web.Request) -> web.Response:
+        page = self.pages.get(request.match_info["id"])
+        if page is None:
+            return self._not_found(request.match_info["id"])
+        body = await request.json()
+        self._set_properties(page, body.get("properties", {}))
+        if "archived" in body:
+            page["archived"] = body["archived"]
+        page["last_edited_time"] = timestamp(datetime.now(timezone.utc))
+        return web.json_response(page)
+
+    async def _get_block_children(self, request: web.Request) -> web.Response:
+        if request.match_info["id"] not in self.pages:
+            return self._not_found(request.match_info["id"])
+        return web.json_response({
+            "object": "list",
+            "results": self.blocks.get(request.match_info["id"], []),
+            "next_cursor": None,
+            "has_more": False,
+        })
+
+    async def _delete_block(self, request: web.Request) -> web.Response:
+        page = self.pages.get(request.match_info["id"])
+        if page is None:
+            return self._not_found(request.match_info["id"])
+        page["archived"] = True
+        page["last_edited_time"] = timestamp(datetime.now(timezone.utc))
+        return web.json_response({"object": "block", "id": page["id"], "type": "child_page", "archived": True})
+
+    def _set_properties(self, page: dict, properties: dict) -> None:
+        for name, value in properties.items():
+            prop = self.schema["properties"].get(name)
+            if prop is None:
+                raise self._validation_error(name)
+            if prop["type"] in ("title", "rich_text") and any(
+                len(item["text"]["content"]) > MAX_TEXT_LENGTH for item in value.get(prop["type"]) or []
+            ):
+                raise self._validation_error(
+                    name, f"body.properties.{name}.{prop['type']}.text.content.length should be ≤ `{MAX_TEXT_LENGTH}`"
+                )
+            page["properties"][name] = self._property_value(prop, value)
+
+    @staticmethod
+    def _empty_property(prop: dict) -> dict:
+        empty = {"title": [], "rich_text": [], "status": None, "date": None, "checkbox": False}
+        return {"id": prop["id"], "type": prop["type"], prop["type"]: empty.get(prop["type"])}
+
+    @staticmethod
+    def _property_value(prop: dict, value: dict) -> dict:
+        prop_type = prop["type"]
+        content = value.get(prop_type)
+        if prop_type in ("title", "rich_text"):
+            content = [
+                segment for item in content
+                for segment in rich_text(item["text"]["content"], item.get("annotations"), item["text"].get("link"))
+            ]
+        elif prop_type == "status" and content:
+            content = {"id": content["id"], "name": STATUSES.get(content["id"], content["id"]), "color": "default"}
+        elif prop_type == "date" and content:
+            content = {"start": content["start"], "end": content.get("end"), "time_zone": content.get("time_zone")}
+        return {"id": prop["id"], "type": prop_type, prop_type: content}
+
+    def _matches(self, page: dict, query_filter: dict) -> bool:
+        if "and" in query_filter:
+            return all(self._matches(page, condition) for condition in query_filter["and"])
+        if "or" in query_filter:
+            return any(self._matches(page, condition) for condition in query_filter["or"])
+        if "timestamp" in query_filter:
+            name = query_filter["timestamp"]
+            return self._compare(datetime.fromisoformat(page[name]), query_filter[name])
+        prop = self._page_property(page, query_filter["property"])
+        if "status" in query_filter:
+            name = (prop["status"] or {}).get("name")
+            condition = query_filter["status"]
+            if "equals" in condition:
+                return name == condition["equals"]
+            if "does_not_equal" in condition:
+                return name != condition["does_not_equal"]
+        return True
+
+    @staticmethod
+    def _compare(value: datetime, condition: dict) -> bool:
+        operators = {
+            "after": lambda other: value > other,
+            "on_or_after": lambda other: value >= other,
+            "before": lambda other: value < other,
+            "on_or_before": lambda other: value <= other,
+            "equals": lambda other: value == other,
+        }
+        return all(operators[operator](datetime.fromisoformat(other)) for operator, other in condition.items())
+
+    @staticmethod
+    def _page_property(page: dict, key: str) -> dict:
+        if key in page["properties"]:
+            return page["properties"][key]
+        for prop in page["properties"].values():
+            if prop["id"] == key:
+                return prop
+        raise FakeNotionServer._validation_error(key)
+
+    def _sort_key(self, page: dict, sort: dict):
+        if "timestamp" in sort:
+            return page[sort["timestamp"]]
+        prop = self._page_property(page, sort["property"])
+        date = prop.get("date") or {}
+        return date.get("start") or ""
+
+    @staticmethod
+    def _error(status: int, code: str, message: str) -> web.Response:
+        return web.json_response({"object": "error", "status": status, "code": code, "message": message}, status=status)
+
+    @staticmethod
+    def _validation_error(key: str, message: str | None = None) -> web.HTTPBadRequest:
+        return web.HTTPBadRequest(
+            text=json.dumps({
+                "object": "error", "status": 400, "code": "validation_error",
+                "message": message or f"Could not find property with name or id: {key}",
+            }),
+            content_type="application/json",
+        )
+
+    def _not_found(self, id: str) -> web.Response:
+        return self._error(404, "object_not_found", f"Could not find object with ID: {id}.")
@@ -0,0 +1,76 @@
+"""Benchmark the peak memory of decoding a wide query response at once against streaming it."""
+from __future__ import annotations
+
+import json
+import sys
+from time import perf_counter
+import tracemalloc
+
+from custom_components.notion_todo.json_stream import JsonStreamDecoder
+from custom_components.notion_todo.models import NotionTask
+from custom_components.notion_todo.notion_property_helper import NotionPropertyIndex
+
+from .dataset import make_pages
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_response(tasks: int, properties: int) -> bytes:
+    """Build the body of a query response."""
+    return json.dumps({
+        "object": "list",
+        "results": make_pages(tasks, extra_properties=properties - 4),
+        "next_cursor": None,
+        "has_more": False,
+    }).encode()
+
+
+def decode_at_once(body: bytes) -> tuple[float, int]:
+    """Decode the whole body and parse the tasks, return the seconds and peak bytes."""
+    index = NotionPropertyIndex()
+    tracemalloc.start()
+    started = perf_counter()
+    tasks = [NotionTask.from_page(page, index) for page in json.loads(body)["results"]]
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return elapsed, peak
+
+
+def decode_streaming(body: bytes) -> tuple[float, int]:
+    """Decode the body chunk by chunk and parse the tasks, return the seconds and peak bytes."""
+    index = NotionPropertyIndex()
+    tasks = []
+    tracemalloc.start()
+    started = perf_counter()
+    decoder = JsonStreamDecoder("results", lambda page: tasks.append(NotionTask.from_page(page, index)))
+    for offset in range(0, len(body), CHUNK_SIZE):
+        decoder.feed(body[offset:offset + CHUNK_SIZE].decode())
+    decoder.close()
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(tasks: int = 100, properties: int = 50) -> dict:
+    """Run the benchmark and return the result."""
+    body = make_response(tasks, properties)
+    at_once, at_once_peak = decode_at_once(body)
+    streaming, streaming_peak = decode_streaming(body)
+    return {
+        "benchmark": "json_stream",
+        "tasks": tasks,
+        "properties": properties,
+        "response_bytes": len(body),
+        "at_once_s": round(at_once, 4),
+        "at_once_peak_bytes": at_once_peak,
+        "streaming_s": round(streaming, 4),
+        "streaming_peak_bytes": streaming_peak,
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout)
+    sys.stdout.write("\n")
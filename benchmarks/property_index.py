@@ -0,0 +1,50 @@
+"""Benchmark property lookups with and without the compiled property index."""
+from __future__ import annotations
+
+import json
+import sys
+from time import perf_counter
+
+from custom_components.notion_todo.const import (
+    TASK_DATE_PROPERTY,
+    TASK_DESCRIPTION_PROPERTY,
+    TASK_STATUS_PROPERTY,
+)
+from custom_components.notion_todo.notion_property_helper import (
+    NotionPropertyHelper as propHelper,
+    NotionPropertyIndex,
+)
+
+from .dataset import make_pages
+
+PROPERTY_IDS = ["title", TASK_STATUS_PROPERTY, TASK_DESCRIPTION_PROPERTY, TASK_DATE_PROPERTY]
+
+
+def lookup_keys(pages: list[dict], index: NotionPropertyIndex | None) -> float:
+    """Resolve the four todo properties of every page and return the seconds taken."""
+    started = perf_counter()
+    for page in pages:
+        for property_id in PROPERTY_IDS:
+            propHelper._get_property_key_by_id(property_id, page, index)
+    return perf_counter() - started
+
+
+def run(tasks: int = 10_000, properties: int = 50) -> dict:
+    """Run the benchmark and return the result."""
+    pages = make_pages(tasks, extra_properties=properties - 4)
+    linear = lookup_keys(pages, None)
+    index = NotionPropertyIndex()
+    indexed = lookup_keys(pages, index)
+    return {
+        "benchmark": "property_index",
+        "tasks": tasks,
+        "properties": properties,
+        "linear_s": round(linear, 4),
+        "indexed_s": round(indexed, 4),
+        "speedup": round(linear / indexed, 1),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout)
+    sys.stdout.write("\n")
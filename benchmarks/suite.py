@@ -0,0 +1,188 @@
+"""Load test the client and coordinator against the local Notion stand-in.
+
+For every dataset size the suite measures:
+
+* parse throughput of query pages into NotionTask records
+* latency of a full and of a delta poll of the coordinator
+* memory retained per task in the coordinator snapshot
+* wall time of bulk creates, updates and deletes through the client
+* wall time of a full sync split into 1, 2, 4 and 8 concurrent partitions
+
+Usage: python -m benchmarks.suite [--sizes 100 1000 10000] [--output FILE]
+Every result is printed as a JSON line, --output also writes them to FILE.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.const import CONF_PARTITIONS, RATE_LIMIT, STATUS_DONE, STATUS_NOT_STARTED
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.models import NotionTask
+from custom_components.notion_todo.notion_property_helper import NotionPropertyIndex
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+
+from . import date_parsing, json_stream, property_index, write_payload
+from .dataset import make_pages
+from .fake_notion_server import FakeNotionServer
+
+SIZES = [100, 1_000, 10_000]
+BULK_WRITES = 100
+PARTITIONS = [1, 2, 4, 8]
+
+
+def parse_throughput(tasks: int) -> dict:
+    """Measure parsing query pages into tasks."""
+    pages = make_pages(tasks, extra_properties=10)
+    index = NotionPropertyIndex()
+    started = perf_counter()
+    for page in pages:
+        NotionTask.from_page(page, index)
+    elapsed = perf_counter() - started
+    return {
+        "benchmark": "parse_throughput",
+        "tasks": tasks,
+        "elapsed_s": round(elapsed, 4),
+        "tasks_per_s": round(tasks / elapsed),
+    }
+
+
+async def poll_latency(tasks: int, latency: float, rate: float) -> dict:
+    """Measure a full and a delta poll of the coordinator, and the snapshot size."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with FakeNotionServer(tasks, latency=latency) as server, aiohttp.ClientSession() as session:
+            client = _client(server, session, rate)
+            coordinator = NotionDataUpdateCoordinator(hass, client)
+
+            gc.collect()
+            tracemalloc.start()
+            started = perf_counter()
+            coordinator.data = await coordinator._async_update_data()
+            full = perf_counter() - started
+            retained, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            requests = sum(server.requests.values())
+            started = perf_counter()
+            await coordinator._async_update_data()
+            delta = perf_counter() - started
+            delta_requests = sum(server.requests.values()) - requests
+        await hass.async_stop(force=True)
+    return {
+        "benchmark": "poll_latency",
+        "tasks": tasks,
+        "latency_s": latency,
+        "full_poll_s": round(full, 4),
+        "full_poll_requests": requests,
+        "delta_poll_s": round(delta, 4),
+        "delta_poll_requests": delta_requests,
+        "bytes_per_task": round(retained / max(tasks, 1)),
+    }
+
+
+async def bulk_writes(tasks: int, latency: float, rate: float, writes: int = BULK_WRITES) -> dict:
+    """Measure creating, updating and deleting tasks concurrently."""
+    async with FakeNotionServer(tasks, latency=latency) as server, aiohttp.ClientSession() as session:
+        client = _client(server, session, rate)
+        await client.async_get_database()
+
+        started = perf_counter()
+        created = await asyncio.gather(*[
+            client.create_task(f"Bulk {number}", STATUS_NOT_STARTED) for number in range(writes)
+        ])
+        create = perf_counter() - started
+        ids = [page["id"] for page in created]
+
+        started = perf_counter()
+        await asyncio.gather(*[
+            client.async_queue_update_task(id, f"Bulk {number}", STATUS_DONE, None, "Updated")
+            for number, id in enumerate(ids)
+        ])
+        update = perf_counter() - started
+
+        started = perf_counter()
+        await asyncio.gather(*[client.async_queue_delete_task(id) for id in ids])
+        delete = perf_counter() - started
+    return {
+        "benchmark": "bulk_writes",
+        "tasks": tasks,
+        "writes": writes,
+        "latency_s": latency,
+        "create_s": round(create, 4),
+        "update_s": round(update, 4),
+        "delete_s": round(delete, 4),
+    }
+
+
+async def partitioned_full_sync(tasks: int, latency: float, rate: float) -> dict:
+    """Measure full syncs split into created_time partitions that are queried concurrently."""
+    result = {"benchmark": "partitioned_full_sync", "tasks": tasks, "latency_s": latency}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with FakeNotionServer(tasks, latency=latency) as server, aiohttp.ClientSession() as session:
+            for partitions in PARTITIONS:
+                coordinator = NotionDataUpdateCoordinator(
+                    hass, _client(server, session, rate), options={CONF_PARTITIONS: partitions}, incremental=False
+                )
+                # The first full sync finds the partition bounds.
+                await coordinator._async_update_data()
+                started = perf_counter()
+                await coordinator._async_update_data()
+                result[f"partitions_{partitions}_s"] = round(perf_counter() - started, 4)
+        await hass.async_stop(force=True)
+    return result
+
+
+def _client(server: FakeNotionServer, session: aiohttp.ClientSession, rate: float) -> NotionApiClient:
+    return NotionApiClient(
+        token=server.token,
+        database_id=server.database_id,
+        session=session,
+        scheduler=NotionRequestScheduler(rate=rate, burst=max(int(rate), 1)),
+        base_url=server.url,
+    )
+
+
+async def run(sizes: list[int], latency: float, rate: float) -> list[dict]:
+    """Run the suite and return the results."""
+    results = [property_index.run(), date_parsing.run(), write_payload.run(), json_stream.run()]
+    for tasks in sizes:
+        results.append(parse_throughput(tasks))
+        results.append(await poll_latency(tasks, latency, rate))
+        results.append(await bulk_writes(tasks, latency, rate))
+        results.append(await partitioned_full_sync(tasks, latency, rate))
+    return results
+
+
+def main() -> None:
+    """Parse the arguments, run the suite and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of tasks in the database")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake server delays each response")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT * 100, help="requests per second of the client")
+    parser.add_argument("--output", help="file to write the JSON lines to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args.sizes, args.latency, args.rate))
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    sys.stdout.write(lines)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(lines)
+
+
+if __name__ == "__main__":
+    main()
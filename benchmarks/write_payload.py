@@ -0,0 +1,64 @@
+"""Benchmark building update payloads from a deep copied template against the compiled builder."""
+from __future__ import annotations
+
+import copy
+from datetime import date
+import json
+import sys
+from time import perf_counter
+
+from custom_components.notion_todo.const import (
+    TASK_DATE_PROPERTY,
+    TASK_DESCRIPTION_PROPERTY,
+    TASK_STATUS_PROPERTY,
+)
+from custom_components.notion_todo.notion_payload_builder import NotionPayloadBuilder
+from custom_components.notion_todo.notion_property_helper import NotionPropertyHelper as propHelper
+
+from .dataset import make_schema
+
+VALUES = {"title": "Task", "status": "done", "due": date(2024, 1, 1), "description": "Description"}
+
+
+def build_from_template(schema: dict, count: int) -> float:
+    """Build payloads the former way and return the seconds taken."""
+    properties = dict(schema['properties'])
+    propHelper.del_properties_except(["title", TASK_STATUS_PROPERTY, TASK_DATE_PROPERTY, TASK_DESCRIPTION_PROPERTY], properties)
+    template = {'parent': {'database_id': schema['id']}, 'properties': properties}
+    started = perf_counter()
+    for _ in range(count):
+        task_data = copy.deepcopy(template)
+        task_data = propHelper.set_property_by_id("title", VALUES["title"], task_data)
+        task_data = propHelper.set_property_by_id(TASK_STATUS_PROPERTY, VALUES["status"], task_data)
+        task_data = propHelper.set_property_by_id(TASK_DATE_PROPERTY, VALUES["due"], task_data)
+        task_data = propHelper.set_property_by_id(TASK_DESCRIPTION_PROPERTY, VALUES["description"], task_data)
+    return perf_counter() - started
+
+
+def build_compiled(schema: dict, count: int) -> float:
+    """Build payloads with the compiled builder and return the seconds taken."""
+    builder = NotionPayloadBuilder(schema['properties'])
+    started = perf_counter()
+    for _ in range(count):
+        builder.build(**VALUES)
+    return perf_counter() - started
+
+
+def run(count: int = 10_000, properties: int = 50) -> dict:
+    """Run the benchmark and return the result."""
+    schema = make_schema(extra_properties=properties - 4)
+    template = build_from_template(schema, count)
+    compiled = build_compiled(schema, count)
+    return {
+        "benchmark": "write_payload",
+        "writes": count,
+        "properties": properties,
+        "template_s": round(template, 4),
+        "compiled_s": round(compiled, 4),
+        "speedup": round(template / compiled, 1),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout)
+    sys.stdout.write("\n")
@@ -5,16 +5,33 @@ https://github.com/JanGiese/notion_todo
 """
 from __future__ import annotations
 
+import asyncio
+from time import time
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ACCESS_TOKEN, Platform
+from homeassistant.components.webhook import async_generate_id
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_WEBHOOK_ID, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import NotionApiClient
-from .const import DOMAIN, CONF_DATABASE_ID
+from .connection import async_get_connection_pool, async_release_connection_pool
+from .const import (
+    CONF_DATABASE_ID,
+    CONF_DATABASES,
+    CONF_INSTRUMENTATION,
+    CONF_PUSH,
+    CONF_SCHEMAS,
+    DOMAIN,
+)
 from .coordinator import NotionDataUpdateCoordinator
+from .metrics import NotionMetrics
+from .outbox import NotionOutbox
+from .scheduler import async_get_scheduler
+from .store import NotionSnapshotStore
+from .webhook import async_register_webhook
 
 PLATFORMS: list[Platform] = [
+    Platform.SENSOR,
     Platform.TODO,
 ]
 
@@ -22,12 +39,51 @@ PLATFORMS: list[Platform] = [
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator = NotionDataUpdateCoordinator(
-        hass=hass,
-        client=NotionApiClient(token=entry.data[CONF_ACCESS_TOKEN], database_id=entry.data[CONF_DATABASE_ID],
-                               session=async_get_clientsession(hass)),
-    )
-    await coordinator.async_config_entry_first_refresh()
+    data = {**entry.data}
+    if CONF_WEBHOOK_ID not in data:
+        data[CONF_WEBHOOK_ID] = async_generate_id()
+    # The schemas the config flow fetched are used once instead of being
+    # fetched again, they are not kept in the entry.
+    schemas = data.pop(CONF_SCHEMAS, {})
+    if data != entry.data:
+        hass.config_entries.async_update_entry(entry, data=data)
+    token = entry.data[CONF_ACCESS_TOKEN]
+    scheduler = async_get_scheduler(hass, token)
+    session = async_get_connection_pool(hass, token, entry.entry_id).session
+
+    coordinators: dict[str, NotionDataUpdateCoordinator] = {}
+    for database_id, title in get_databases(entry).items():
+        client = NotionApiClient(
+            token=token,
+            database_id=database_id,
+            session=session,
+            scheduler=scheduler,
+            metrics=NotionMetrics(entry.options.get(CONF_INSTRUMENTATION, False)),
+        )
+        if schema := schemas.get(database_id):
+            client.set_database(schema["schema"], age=time() - schema["fetched"])
+        coordinators[database_id] = NotionDataUpdateCoordinator(
+            hass=hass,
+            client=client,
+            options=entry.options,
+            store=NotionSnapshotStore(hass, f"{entry.entry_id}.{database_id}"),
+            outbox=NotionOutbox(hass, f"{entry.entry_id}.{database_id}"),
+            title=title,
+        )
+    hass.data[DOMAIN][entry.entry_id] = coordinators
+
+    # Show the tasks of the last run right away and refresh them in the background.
+    # They stay available if Notion cannot be reached.
+    first_refreshes = []
+    for coordinator in coordinators.values():
+        if await coordinator.async_restore():
+            entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} refresh")
+        else:
+            first_refreshes.append(coordinator.async_config_entry_first_refresh())
+    await asyncio.gather(*first_refreshes)
+
+    if entry.options.get(CONF_PUSH):
+        async_register_webhook(hass, entry)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -39,10 +95,30 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        token = entry.data[CONF_ACCESS_TOKEN]
+        await async_release_connection_pool(hass, token, entry.entry_id)
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshots and queued writes of a deleted entry."""
+    for database_id in get_databases(entry):
+        await NotionSnapshotStore(hass, f"{entry.entry_id}.{database_id}").async_remove()
+        await NotionOutbox(hass, f"{entry.entry_id}.{database_id}").async_remove()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def get_databases(entry: ConfigEntry) -> dict[str, str | None]:
+    """Get the ids and titles of the databases of an entry.
+
+    Entries created before several databases were supported hold a single
+    database id without a title.
+    """
+    if CONF_DATABASES in entry.data:
+        return entry.data[CONF_DATABASES]
+    return {entry.data[CONF_DATABASE_ID]: None}
+
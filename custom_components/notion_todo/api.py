@@ -2,14 +2,42 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import json
+import random
 import socket
-import copy
 import aiohttp
-import async_timeout
+from collections.abc import AsyncIterator, Callable, Iterable
 from datetime import datetime
+from time import monotonic, perf_counter
 
-from .const import NOTION_URL, NOTION_VERSION, TASK_STATUS_PROPERTY, TASK_DATE_PROPERTY, TASK_DESCRIPTION_PROPERTY
-from .notion_property_helper import NotionPropertyHelper as propHelper
+from .const import (
+    CONNECT_TIMEOUT,
+    DEFAULT_PAGE_SIZE,
+    LOGGER,
+    MAX_PAGE_SIZE,
+    MAX_RETRIES,
+    NOTION_URL,
+    NOTION_VERSION,
+    QUERY_READ_TIMEOUT,
+    QUERY_TIMEOUT,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+    SCHEMA_TTL,
+    STREAM_CHUNK_SIZE,
+    STREAM_THRESHOLD,
+    WRITE_READ_TIMEOUT,
+    WRITE_TIMEOUT,
+)
+from .json_stream import JsonStreamDecoder
+from .metrics import NotionMetrics
+from .notion_payload_builder import REQUIRED_TASK_FIELDS, NotionPayloadBuilder
+from .scheduler import NotionRequestScheduler
+from .write_queue import NotionWriteQueue, WriteListener
+
+# Reads may return large query pages, writes are small but should fail fast.
+_READ_TIMEOUT = aiohttp.ClientTimeout(total=QUERY_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=QUERY_READ_TIMEOUT)
+_WRITE_TIMEOUT = aiohttp.ClientTimeout(total=WRITE_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=WRITE_READ_TIMEOUT)
 
 
 class NotionApiClientError(Exception):
@@ -28,20 +56,52 @@ class NotionApiClientAuthenticationError(
     """Exception to indicate an authentication error."""
 
 
+class NotionApiClientNotFoundError(
+    NotionApiClientError
+):
+    """Exception to indicate an object that does not exist or is not shared."""
+
+
+class NotionApiClientValidationError(
+    NotionApiClientError
+):
+    """Exception to indicate a request Notion rejected as invalid."""
+
+
+class NotionApiClientSchemaError(
+    NotionApiClientError
+):
+    """Exception to indicate a database without the properties of a task."""
+
+    def __init__(self, missing: list[str]) -> None:
+        """Initialize with the missing task fields."""
+        super().__init__(f"Database has no {', '.join(missing)} property")
+        self.missing = missing
+
+
+class _NotionApiClientRetryableError(
+    NotionApiClientCommunicationError
+):
+    """Exception to indicate a transient error worth retrying."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Initialize with the delay requested by the server, if any."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class NotionApiClient:
     """Notion API Client."""
 
-    _headers = {
-        'Authorization': 'Bearer <TOKEN>',
-        'Content-Type': 'application/json',
-        'Notion-Version': NOTION_VERSION
-        }
-
     def __init__(
         self,
         token: str,
         database_id: str,
-        session: aiohttp.ClientSession
+        session: aiohttp.ClientSession,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        scheduler: NotionRequestScheduler | None = None,
+        base_url: str = NOTION_URL,
+        metrics: NotionMetrics | None = None
     ) -> None:
         """Notion API Client.
 
@@ -49,22 +109,192 @@ class NotionApiClient:
             token (str): Notion token with access to ToDo database
             database_id (str): id of the ToDo database
             session (aiohttp.ClientSession): the session
+            page_size (int): number of tasks requested per query page
+            scheduler (NotionRequestScheduler): rate limiter shared by all
+                requests made with the token
+            base_url (str): URL of the Notion API, e.g. of a local stand-in
+            metrics (NotionMetrics): instrumentation of the requests
 
         """
         self._token = token
         self._session = session
-        self._headers['Authorization'] = f'Bearer {token}'
+        self._headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+            'Notion-Version': NOTION_VERSION
+        }
         self._database_id = database_id
-        self._task_template = None
+        self._base_url = base_url
+        self._page_size = min(page_size, MAX_PAGE_SIZE)
+        self.scheduler = scheduler or NotionRequestScheduler()
+        self.metrics = metrics or NotionMetrics()
+        self._write_queue = NotionWriteQueue(
+            update=lambda task_id, values: self.update_task(task_id, **values),
+            delete=self.delete_task,
+        )
+        self._database = None
+        self._database_fetched = 0.0
+        self._payload_builder = None
+        self._reads: dict[tuple, asyncio.Future] = {}
+
+    @property
+    def database_id(self) -> str:
+        """Return the id of the ToDo database."""
+        return self._database_id
+
+    async def async_get_data(self, page_size: int | None = None) -> any:
+        """Get all tasks of the database, following the pagination cursor.
+
+        Args:
+            page_size (int): number of tasks requested per query page
+
+        """
+        results = []
+        async for page in self.async_iter_pages(page_size=page_size):
+            results.extend(page)
+        return {"object": "list", "results": results, "next_cursor": None, "has_more": False}
+
+    async def async_iter_pages(
+        self,
+        page_size: int | None = None,
+        query_filter: dict | None = None,
+        sorts: list[dict] | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """Yield the tasks of the database one query page at a time.
+
+        Only one page is held by the generator at any time, so callers that
+        consume the pages as they arrive keep their memory bounded by the
+        page size instead of the size of the database.
+
+        Args:
+            page_size (int): number of tasks requested per query page
+            query_filter (dict): optional Notion filter object for the query
+            sorts (list): optional Notion sort objects for the query
+
+        """
+        query = self._query(page_size, query_filter, sorts)
+        while True:
+            response = await self._api_wrapper(
+                method="post",
+                url=f"{self._base_url}/databases/{self._database_id}/query",
+                headers=self._headers,
+                data=query
+            )
+            yield response['results']
+            if not response.get('has_more') or not response.get('next_cursor'):
+                return
+            query = {**query, "start_cursor": response['next_cursor']}
+
+    async def async_stream_pages(
+        self,
+        on_page: Callable[[dict], None],
+        page_size: int | None = None,
+        query_filter: dict | None = None,
+        sorts: list[dict] | None = None
+    ) -> int:
+        """Query the tasks of the database, passing each page to on_page as it is decoded.
+
+        Large responses are decoded while they are received, so only one page
+        object of a response is in memory at a time instead of the whole
+        response. A response that is retried after an error may pass pages
+        to on_page a second time.
 
-    async def async_get_data(self) -> any:
-        """Get data from the API."""
+        Args:
+            on_page (Callable): called with every page of the query result
+            page_size (int): number of tasks requested per query page
+            query_filter (dict): optional Notion filter object for the query
+            sorts (list): optional Notion sort objects for the query
+
+        Returns:
+            int: number of requests made
+
+        """
+        query = self._query(page_size, query_filter, sorts)
+        requests = 0
+        while True:
+            response = await self._api_wrapper(
+                method="post",
+                url=f"{self._base_url}/databases/{self._database_id}/query",
+                headers=self._headers,
+                data=query,
+                on_result=on_page
+            )
+            requests += 1
+            if not response.get('has_more') or not response.get('next_cursor'):
+                return requests
+            query = {**query, "start_cursor": response['next_cursor']}
+
+    def _query(self, page_size: int | None, query_filter: dict | None, sorts: list[dict] | None) -> dict:
+        query = {"page_size": min(page_size or self._page_size, MAX_PAGE_SIZE)}
+        if query_filter:
+            query["filter"] = query_filter
+        if sorts:
+            query["sorts"] = sorts
+        return query
+
+    async def get_page(self, page_id: str) -> any:
+        """Get a single page.
+
+        Args:
+            page_id (str): id of the page
+
+        """
         return await self._api_wrapper(
-            method="post",
-            url=f"{NOTION_URL}/databases/{self._database_id}/query",
+            method="get",
+            url=f"{self._base_url}/pages/{page_id}",
             headers=self._headers
         )
 
+    async def get_pages(
+        self,
+        page_ids: Iterable[str],
+        return_exceptions: bool = False
+    ) -> dict[str, dict | None | BaseException]:
+        """Get several pages concurrently, within the rate limit of the scheduler.
+
+        Args:
+            page_ids (Iterable[str]): ids of the pages
+            return_exceptions (bool): return errors in place of the pages
+                instead of raising the first one
+
+        Returns:
+            dict: page by id, None for pages that do not exist or are not shared
+
+        """
+        page_ids = list(dict.fromkeys(page_ids))
+        results = await asyncio.gather(
+            *[self.get_page(page_id) for page_id in page_ids],
+            return_exceptions=True
+        )
+        pages = {}
+        for page_id, result in zip(page_ids, results):
+            if isinstance(result, NotionApiClientNotFoundError):
+                result = None
+            elif isinstance(result, BaseException) and not return_exceptions:
+                raise result
+            pages[page_id] = result
+        return pages
+
+    async def async_get_blocks(self, block_id: str) -> list[dict]:
+        """Get the child blocks of a page or block, following the pagination cursor.
+
+        Args:
+            block_id (str): id of the page or block
+
+        """
+        blocks = []
+        url = f"{self._base_url}/blocks/{block_id}/children?page_size={MAX_PAGE_SIZE}"
+        cursor = None
+        while True:
+            response = await self._api_wrapper(
+                method="get",
+                url=f"{url}&start_cursor={cursor}" if cursor else url,
+                headers=self._headers
+            )
+            blocks.extend(response['results'])
+            if not response.get('has_more') or not (cursor := response.get('next_cursor')):
+                return blocks
+
     async def update_task(
         self,
         task_id: str,
@@ -83,38 +313,72 @@ class NotionApiClient:
             description (str): Description of the task
 
         """
-        task_data = await self._get_task_template()
-        task_data = propHelper.set_property_by_id("title", title, task_data)
-        task_data = propHelper.set_property_by_id(TASK_STATUS_PROPERTY, status, task_data)
-        task_data = propHelper.set_property_by_id(TASK_DATE_PROPERTY, due, task_data)
-        task_data = propHelper.set_property_by_id(TASK_DESCRIPTION_PROPERTY, description, task_data)
-        update_properties = task_data['properties']
-        return await self._api_wrapper(
+        return await self._write_properties(
             method="patch",
-            url=f"{NOTION_URL}/pages/{task_id}",
-            headers=self._headers,
-            data={"properties": update_properties}
+            url=f"{self._base_url}/pages/{task_id}",
+            values={"title": title, "status": status, "due": due, "description": description},
+        )
+
+    async def async_queue_update_task(
+        self,
+        task_id: str,
+        title: str,
+        status: str,
+        due: datetime,
+        description: str
+    ) -> any:
+        """Queue an update of a task, merging it with other queued edits of the task.
+
+        Args:
+            task_id (str): id of the task
+            title: (str): Title of the task
+            status (str): Status of the task
+            due (datetime): Due date of the task
+            description (str): Description of the task
+
+        """
+        return await self._write_queue.async_update(
+            task_id,
+            {"title": title, "status": status, "due": due, "description": description}
         )
 
-    async def create_task(self, title: str, status: str) -> any:
+    async def async_queue_delete_task(self, task_id: str) -> any:
+        """Queue the deletion of a task, superseding queued edits of the task.
+
+        Args:
+            task_id (str): id of the task
+
+        """
+        return await self._write_queue.async_delete(task_id)
+
+    def add_write_listener(self, listener: WriteListener) -> Callable[[], None]:
+        """Listen for batches of queued writes, see NotionWriteQueue.add_listener."""
+        return self._write_queue.add_listener(listener)
+
+    async def create_task(
+        self,
+        title: str,
+        status: str,
+        due: datetime | None = None,
+        description: str | None = None
+    ) -> any:
         """Create a new task in Notion.
 
         Args:
             title (str): Title of the task
             status (str): Status of the task
+            due (datetime): Due date of the task
+            description (str): Description of the task
 
         """
-        task_template = await self._get_task_template()
-        task_data = task_template.copy()
-        task_data["properties"] = propHelper.del_properties_except(["title", TASK_STATUS_PROPERTY], task_data["properties"])
-        task_data = propHelper.set_property_by_id("title", title, task_data)
-        task_data = propHelper.set_property_by_id(TASK_STATUS_PROPERTY, status, task_data)
-
-        return await self._api_wrapper(
+        # Retrying a create after a timeout or server error could add the task twice.
+        return await self._write_properties(
             method="post",
-            url=f"{NOTION_URL}/pages",
-            headers=self._headers,
-            data=task_data)
+            url=f"{self._base_url}/pages",
+            values={"title": title, "status": status, "due": due, "description": description},
+            data={"parent": {"database_id": self._database_id}},
+            idempotent=False,
+        )
 
     async def delete_task(self,
                           task_id: str):
@@ -129,26 +393,100 @@ class NotionApiClient:
         """
         return await self._api_wrapper(
             method="delete",
-            url=f"{NOTION_URL}/blocks/{task_id}",
+            url=f"{self._base_url}/blocks/{task_id}",
             headers=self._headers)
 
+    async def async_get_database(self):
+        """Get the database schema, fetching it again once it is older than SCHEMA_TTL."""
+        if not self._database or monotonic() - self._database_fetched >= SCHEMA_TTL.total_seconds():
+            self.set_database(await self._get_database())
+        return self._database
+
+    def set_database(self, database: dict, age: float = 0.0) -> None:
+        """Use a schema fetched elsewhere, e.g. by the config flow, instead of fetching it.
+
+        Args:
+            database (dict): the schema
+            age (float): seconds since the schema was fetched
+
+        """
+        self._database = database
+        self._database_fetched = monotonic() - age
+        self._payload_builder = None
+
+    async def async_validate_database(self) -> dict:
+        """Fetch the schema and check that the database has the properties of a task.
+
+        This takes a single request and, unlike a query, does not transfer
+        any tasks.
+
+        Raises:
+            NotionApiClientSchemaError: if the title, status or due date property is missing
+
+        """
+        builder = await self._get_payload_builder()
+        if missing := [field for field in builder.missing if field in REQUIRED_TASK_FIELDS]:
+            raise NotionApiClientSchemaError(missing)
+        return self._database
+
+    def invalidate_database(self) -> None:
+        """Drop the cached schema, the next use fetches it again."""
+        self._database = None
+        self._payload_builder = None
+
+    async def async_get_title(self) -> str:
+        """Get the title of the database."""
+        database = await self.async_get_database()
+        return ''.join(text['plain_text'] for text in database.get('title', [])) or self._database_id
+
     async def _get_database(self):
         return await self._api_wrapper(
             method="get",
-            url=f"{NOTION_URL}/databases/{self._database_id}",
+            url=f"{self._base_url}/databases/{self._database_id}",
             headers=self._headers
         )
 
-    async def _get_task_template(self):
-        if not self._task_template:
-            database = await self._get_database()
-            properties = database['properties']
-            propHelper.del_properties_except(["title", TASK_STATUS_PROPERTY, TASK_DATE_PROPERTY, TASK_DESCRIPTION_PROPERTY], properties)
-            self._task_template = {
-                'parent': {'database_id': self._database_id},
-                'properties': properties
-            }
-        return copy.deepcopy(self._task_template)
+    async def _get_payload_builder(self) -> NotionPayloadBuilder:
+        database = await self.async_get_database()
+        if self._payload_builder is None:
+            self._payload_builder = NotionPayloadBuilder(database['properties'])
+        return self._payload_builder
+
+    async def _write_properties(
+        self,
+        method: str,
+        url: str,
+        values: dict,
+        data: dict | None = None,
+        idempotent: bool = True,
+    ) -> any:
+        """Send the properties built from values.
+
+        Notion rejects properties that were renamed or removed since the
+        schema was fetched. Any validation error of the write fetches the
+        schema once more, and the write is sent again if the properties
+        built from the new schema differ from the rejected ones.
+        """
+        builder = await self._get_payload_builder()
+        properties = builder.build(**values)
+        for attempt in range(2):
+            try:
+                return await self._api_wrapper(
+                    method=method,
+                    url=url,
+                    headers=self._headers,
+                    data={**(data or {}), "properties": properties},
+                    idempotent=idempotent,
+                )
+            except NotionApiClientValidationError as exception:
+                if attempt or not properties:
+                    raise
+                LOGGER.debug("%s, refreshing the schema of %s", exception, self._database_id)
+                self.invalidate_database()
+                builder = await self._get_payload_builder()
+                if (rebuilt := builder.build(**values)) == properties:
+                    raise
+                properties = rebuilt
 
     async def _api_wrapper(
         self,
@@ -156,24 +494,137 @@ class NotionApiClient:
         url: str,
         data: dict | None = None,
         headers: dict | None = None,
+        idempotent: bool = True,
+        on_result: Callable[[dict], None] | None = None,
+    ) -> any:
+        """Get information from the API.
+
+        With on_result, the items of the results member are passed to it
+        instead of being returned, see async_stream_pages.
+
+        Requests wait for the rate limit of the scheduler, their timeouts
+        only start once they are sent. Rate limited
+        requests are retried after the Retry-After delay, timeouts and server
+        errors of idempotent requests with a jittered exponential backoff.
+
+        Reads, i.e. GET requests and database queries, that are already in
+        flight are not sent again, the callers share the response and must
+        not modify it.
+        """
+        if on_result is not None or not self._is_read(method, url):
+            return await self._send(method, url, data, headers, idempotent, on_result)
+        key = (method, url, json.dumps(data, sort_keys=True) if data else None)
+        read = self._reads.get(key)
+        if read is None:
+            read = self._reads[key] = asyncio.ensure_future(self._send(method, url, data, headers, idempotent))
+            read.add_done_callback(lambda future: self._read_done(key, future))
+        else:
+            LOGGER.debug("Joining %s %s in flight", method, url)
+        return await asyncio.shield(read)
+
+    @staticmethod
+    def _is_read(method: str, url: str) -> bool:
+        return method == "get" or url.endswith("/query")
+
+    def _read_done(self, key: tuple, future: asyncio.Future) -> None:
+        del self._reads[key]
+        # The error of a read whose callers were all cancelled is not logged.
+        if not future.cancelled():
+            future.exception()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        idempotent: bool,
+        on_result: Callable[[dict], None] | None = None,
+    ) -> any:
+        attempt = 0
+        while True:
+            try:
+                return await self._request(method, url, data, headers, idempotent, on_result)
+            except _NotionApiClientRetryableError as exception:
+                if attempt >= MAX_RETRIES:
+                    raise NotionApiClientCommunicationError(str(exception)) from exception
+                delay = exception.retry_after
+                if delay is None:
+                    delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+                attempt += 1
+                self.scheduler.record_retry()
+                self.metrics.record_retry()
+                LOGGER.debug("%s, retrying %s %s in %.1fs (attempt %s)", exception, method, url, delay, attempt)
+                await asyncio.sleep(delay)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        idempotent: bool,
+        on_result: Callable[[dict], None] | None = None,
     ) -> any:
-        """Get information from the API."""
         try:
-            async with async_timeout.timeout(10):
+            async with self.scheduler.slot():
+                started = perf_counter()
                 response = await self._session.request(
                     method=method,
                     url=url,
                     headers=headers,
                     json=data,
+                    timeout=_READ_TIMEOUT if self._is_read(method, url) else _WRITE_TIMEOUT,
+                )
+                # The Content-Length of a compressed body is not the size it decodes to.
+                if on_result is not None and response.status == 200 and (
+                    response.content_length is None
+                    or response.content_length > STREAM_THRESHOLD
+                    or aiohttp.hdrs.CONTENT_ENCODING in response.headers
+                ):
+                    result, size = await self._decode_stream(response, on_result)
+                    self.metrics.record_request(
+                        method, url[len(self._base_url):], response.status, perf_counter() - started, size
+                    )
+                    return result
+                body = await response.read()
+                self.metrics.record_request(
+                    method, url[len(self._base_url):], response.status, perf_counter() - started, len(body)
                 )
                 if response.status in (401, 403):
                     raise NotionApiClientAuthenticationError(
                         "Invalid credentials",
                     )
+                if response.status == 429:
+                    retry_after = self._retry_after(response)
+                    self.scheduler.throttle(retry_after)
+                    raise _NotionApiClientRetryableError(
+                        "Rate limited", retry_after=retry_after,
+                    )
+                if response.status == 404:
+                    raise NotionApiClientNotFoundError(self._error(body).get("message", "Not found"))
+                if response.status == 400:
+                    error = self._error(body)
+                    if error.get("code") == "validation_error":
+                        raise NotionApiClientValidationError(error.get("message", "Validation error"))
+                if response.status >= 500 and idempotent:
+                    raise _NotionApiClientRetryableError(
+                        f"Server error {response.status}",
+                    )
                 response.raise_for_status()
-                return await response.json()
+                result = self._decode(body)
+                if on_result is not None:
+                    for item in result.pop('results'):
+                        on_result(item)
+                return result
 
+        except NotionApiClientError:
+            raise
         except asyncio.TimeoutError as exception:
+            if idempotent:
+                raise _NotionApiClientRetryableError(
+                    "Timeout error fetching information",
+                ) from exception
             raise NotionApiClientCommunicationError(
                 "Timeout error fetching information",
             ) from exception
@@ -185,3 +636,54 @@ class NotionApiClient:
             raise NotionApiClientError(
                 "Something really wrong happened!"
             ) from exception
+
+    def _decode(self, body: bytes) -> any:
+        if not self.metrics.enabled:
+            return json.loads(body)
+        started = perf_counter()
+        data = json.loads(body)
+        self.metrics.record_decode(perf_counter() - started)
+        return data
+
+    async def _decode_stream(
+        self, response: aiohttp.ClientResponse, on_result: Callable[[dict], None]
+    ) -> tuple[dict, int]:
+        # The decode time leaves out waiting for chunks and the time spent in
+        # on_result, like _decode leaves out both.
+        handled = 0.0
+
+        def handle(item: dict) -> None:
+            nonlocal handled
+            started = perf_counter()
+            on_result(item)
+            handled += perf_counter() - started
+
+        decoder = JsonStreamDecoder('results', handle if self.metrics.enabled else on_result)
+        text = codecs.getincrementaldecoder('utf-8')()
+        size = 0
+        decoding = 0.0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            started = perf_counter()
+            decoder.feed(text.decode(chunk))
+            decoding += perf_counter() - started
+        started = perf_counter()
+        decoder.feed(text.decode(b'', final=True))
+        result = decoder.close()
+        self.metrics.record_decode(decoding + perf_counter() - started - handled)
+        return result, size
+
+    @staticmethod
+    def _error(body: bytes) -> dict:
+        try:
+            error = json.loads(body)
+        except ValueError:
+            return {}
+        return error if isinstance(error, dict) else {}
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> float:
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", 1)))
+        except ValueError:
+            return 1.0
@@ -1,19 +1,45 @@
 """Adds config flow for Notion ToDo."""
 from __future__ import annotations
 
+from time import time
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.const import CONF_ACCESS_TOKEN
+from homeassistant.components import webhook
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_WEBHOOK_ID
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import (
     NotionApiClient,
     NotionApiClientAuthenticationError,
     NotionApiClientCommunicationError,
     NotionApiClientError,
+    NotionApiClientSchemaError,
+)
+from .connection import async_get_connection_pool, async_release_connection_pool
+from .const import (
+    DOMAIN,
+    LOGGER,
+    CONF_BLOCK_DESCRIPTIONS,
+    CONF_COMPLETED_DAYS,
+    CONF_DATABASE_IDS,
+    CONF_DATABASES,
+    CONF_EXCLUDE_ARCHIVED,
+    CONF_INSTRUMENTATION,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_PARTITIONS,
+    CONF_PUSH,
+    CONF_SCHEMAS,
+    CONF_SORT_BY_DUE,
+    CONF_VERIFICATION_TOKEN,
+    MAX_PARTITIONS,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
 )
-from .const import DOMAIN, LOGGER, CONF_DATABASE_ID
+from .scheduler import async_get_scheduler
 
 
 class NotionTodoConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -21,18 +47,26 @@ class NotionTodoConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return NotionTodoOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self,
         user_input: dict | None = None,
     ) -> config_entries.FlowResult:
         """Handle a flow initialized by the user."""
         _errors = {}
+        placeholders = {"properties": "-"}
         if user_input is not None:
             try:
-
-                await self._test_credentials(
+                databases, schemas = await self._test_credentials(
                     token=user_input[CONF_ACCESS_TOKEN],
-                    database_id=user_input[CONF_DATABASE_ID]
+                    database_ids=user_input[CONF_DATABASE_IDS]
                 )
             except NotionApiClientAuthenticationError as exception:
                 LOGGER.warning(exception)
@@ -40,13 +74,21 @@ class NotionTodoConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             except NotionApiClientCommunicationError as exception:
                 LOGGER.error(exception)
                 _errors["base"] = "connection"
+            except NotionApiClientSchemaError as exception:
+                LOGGER.warning(exception)
+                _errors["base"] = "schema"
+                placeholders["properties"] = ", ".join(exception.missing)
             except NotionApiClientError as exception:
                 LOGGER.exception(exception)
                 _errors["base"] = "unknown"
             else:
                 return self.async_create_entry(
-                    title=user_input[CONF_DATABASE_ID],
-                    data=user_input,
+                    title=", ".join(databases.values()),
+                    data={
+                        CONF_ACCESS_TOKEN: user_input[CONF_ACCESS_TOKEN],
+                        CONF_DATABASES: databases,
+                        CONF_SCHEMAS: schemas,
+                    },
                 )
 
         return self.async_show_form(
@@ -54,11 +96,12 @@ class NotionTodoConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema(
                 {
                     vol.Required(
-                        CONF_DATABASE_ID,
-                        default=(user_input or {}).get(CONF_DATABASE_ID),
+                        CONF_DATABASE_IDS,
+                        default=(user_input or {}).get(CONF_DATABASE_IDS, []),
                     ): selector.TextSelector(
                         selector.TextSelectorConfig(
-                            type=selector.TextSelectorType.TEXT
+                            type=selector.TextSelectorType.TEXT,
+                            multiple=True,
                         ),
                     ),
                     vol.Required(CONF_ACCESS_TOKEN): selector.TextSelector(
@@ -69,9 +112,137 @@ class NotionTodoConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 }
             ),
             errors=_errors,
+            description_placeholders=placeholders,
+        )
+
+    async def _test_credentials(
+        self, token: str, database_ids: list[str]
+    ) -> tuple[dict[str, str], dict[str, dict]]:
+        """Validate credentials and the schemas, and return the title and schema of each database.
+
+        Only the schemas are fetched, no tasks. They are handed over in the
+        entry data with the time they were fetched, so its setup does not
+        fetch them again.
+        """
+        # The requests reuse the connections and count against the rate limit
+        # of the entries using the token. The flow may be abandoned, so it
+        # releases the pool right away, closing it if no entry uses the token.
+        session = async_get_connection_pool(self.hass, token, self.flow_id).session
+        scheduler = async_get_scheduler(self.hass, token)
+        databases = {}
+        schemas = {}
+        try:
+            for database_id in dict.fromkeys(id.strip() for id in database_ids if id.strip()):
+                client = NotionApiClient(
+                    token=token,
+                    database_id=database_id,
+                    session=session,
+                    scheduler=scheduler,
+                )
+                schemas[database_id] = {"schema": await client.async_validate_database(), "fetched": time()}
+                databases[database_id] = await client.async_get_title()
+        finally:
+            await async_release_connection_pool(self.hass, token, self.flow_id)
+        if not databases:
+            raise NotionApiClientError("No database id given")
+        return databases, schemas
+
+
+class NotionTodoOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Notion ToDo."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Manage the query and polling options."""
+        _errors = {}
+        if user_input is not None:
+            if user_input.get(CONF_MIN_INTERVAL, 0) > user_input.get(CONF_MAX_INTERVAL, float("inf")):
+                _errors[CONF_MIN_INTERVAL] = "min_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        # The form is shown again with the rejected input.
+        options = {**self.config_entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_EXCLUDE_ARCHIVED,
+                        default=options.get(CONF_EXCLUDE_ARCHIVED, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_COMPLETED_DAYS,
+                        default=options.get(CONF_COMPLETED_DAYS, 0),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0, max=3650, mode=selector.NumberSelectorMode.BOX
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_SORT_BY_DUE,
+                        default=options.get(CONF_SORT_BY_DUE, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, MIN_UPDATE_INTERVAL.total_seconds()),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=5, max=3600, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_MAX_INTERVAL,
+                        default=options.get(CONF_MAX_INTERVAL, MAX_UPDATE_INTERVAL.total_seconds()),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=60, max=86400, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_PARTITIONS,
+                        default=options.get(CONF_PARTITIONS, 1),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1, max=MAX_PARTITIONS, mode=selector.NumberSelectorMode.BOX
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_BLOCK_DESCRIPTIONS,
+                        default=options.get(CONF_BLOCK_DESCRIPTIONS, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_INSTRUMENTATION,
+                        default=options.get(CONF_INSTRUMENTATION, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_PUSH,
+                        default=options.get(CONF_PUSH, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_VERIFICATION_TOKEN,
+                        description={"suggested_value": options.get(CONF_VERIFICATION_TOKEN)},
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.PASSWORD
+                        ),
+                    ),
+                }
+            ),
+            errors=_errors,
+            description_placeholders={"webhook_url": self._webhook_url()},
         )
 
-    async def _test_credentials(self, token: str, database_id: str) -> None:
-        """Validate credentials."""
-        client = NotionApiClient(token=token, database_id=database_id, session=async_create_clientsession(self.hass))
-        await client.async_get_data()
+    def _webhook_url(self) -> str:
+        if CONF_WEBHOOK_ID not in self.config_entry.data:
+            return "-"
+        try:
+            return webhook.async_generate_url(self.hass, self.config_entry.data[CONF_WEBHOOK_ID])
+        except HomeAssistantError:
+            return webhook.async_generate_path(self.config_entry.data[CONF_WEBHOOK_ID])
@@ -1,4 +1,5 @@
 """Constants for notion_todo."""
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
@@ -10,7 +11,56 @@ ATTRIBUTION = "Data provided by https://api.notion.com/v1"
 NOTION_URL = "https://api.notion.com/v1"
 NOTION_VERSION = "2022-02-22"
 CONF_DATABASE_ID = "database_id"
+CONF_DATABASE_IDS = "database_ids"
+CONF_DATABASES = "databases"
+CONF_SCHEMAS = "schemas"
+DATA_SCHEDULERS = "notion_todo_schedulers"
+DATA_CONNECTION_POOLS = "notion_todo_connection_pools"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+STREAM_THRESHOLD = 256 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+UPDATE_INTERVAL = timedelta(minutes=5)
+MIN_UPDATE_INTERVAL = timedelta(seconds=30)
+MAX_UPDATE_INTERVAL = timedelta(minutes=30)
+POLL_RATE_SHARE = 0.1
+POLL_HISTORY = 20
+FULL_SYNC_INTERVAL = timedelta(hours=1)
+SCHEMA_TTL = timedelta(hours=1)
+RATE_LIMIT = 3.0
+RATE_LIMIT_BURST = 3
+MAX_CONCURRENT_REQUESTS = 3
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+CONNECT_TIMEOUT = 10
+QUERY_TIMEOUT = 30
+QUERY_READ_TIMEOUT = 20
+WRITE_TIMEOUT = 15
+WRITE_READ_TIMEOUT = 10
+MAX_RETRIES = 4
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 30.0
+WRITE_BATCH_WINDOW = 0.25
+PUSH_DEBOUNCE = 1.0
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
 TASK_DATE_PROPERTY = "notion%3A%2F%2Ftasks%2Fdue_date_property"
 TASK_ASSIGNEE_PROPERTY = "notion%3A%2F%2Ftasks%2Fassign_property"
 TASK_STATUS_PROPERTY = "notion%3A%2F%2Ftasks%2Fstatus_property"
 TASK_DESCRIPTION_PROPERTY = "notion%3A%2F%2Ftasks%2Fai_summary_property"
+STATUS_IN_PROGRESS = "in-progress"
+STATUS_ARCHIVED = "archived"
+STATUS_DONE = "done"
+STATUS_NOT_STARTED = "not-started"
+CONF_EXCLUDE_ARCHIVED = "exclude_archived"
+CONF_COMPLETED_DAYS = "completed_days"
+CONF_SORT_BY_DUE = "sort_by_due"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_INSTRUMENTATION = "instrumentation"
+CONF_PUSH = "push"
+CONF_VERIFICATION_TOKEN = "verification_token"
+CONF_BLOCK_DESCRIPTIONS = "block_descriptions"
+CONF_PARTITIONS = "partitions"
+MAX_PARTITIONS = 8
@@ -1,27 +1,91 @@
 """DataUpdateCoordinator for notion_todo."""
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.util import dt as dt_util
 
 from .api import (
     NotionApiClient,
     NotionApiClientAuthenticationError,
+    NotionApiClientCommunicationError,
     NotionApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import (
+    CONF_BLOCK_DESCRIPTIONS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_PARTITIONS,
+    CONF_PUSH,
+    DOMAIN,
+    FULL_SYNC_INTERVAL,
+    LOGGER,
+    MAX_UPDATE_INTERVAL,
+    MIN_UPDATE_INTERVAL,
+    PUSH_DEBOUNCE,
+)
+from .models import NotionTask
+from .notion_date_helper import format_date, parse_timestamp
+from .notion_property_helper import NotionPropertyHelper as propHelper, NotionPropertyIndex
+from .notion_query_helper import NotionQueryHelper as queryHelper
+from .notion_rich_text import blocks_to_markdown
+from .outbox import CREATE, DELETE, LOCAL_ID_PREFIX, UPDATE, NotionOutbox
+from .partitions import even_bounds, in_range, quantile_bounds, range_conditions
+from .polling import AdaptivePollInterval
+from .single_flight import SingleFlight
+from .store import NotionSnapshotStore
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 class NotionDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the API."""
+    """Class to manage fetching data from the API.
+
+    The coordinator keeps a snapshot of all tasks keyed by page id. Pages are
+    parsed into NotionTask records one by one while a response is decoded
+    and the raw payload is dropped, the data of the coordinator is a dict of
+    these records. A poll only queries the pages edited since the newest
+    last_edited_time in the snapshot and merges them in. Deleted pages never
+    show up in such a delta query, so the whole database is re-read every
+    full_sync_interval.
+
+    The filter and sorts configured in the options are applied by Notion, so
+    rows that are not displayed are never transferred.
+
+    Each good snapshot is saved to the store, so it can be restored at startup
+    before Notion is reached. With an outbox, the restored tasks stay
+    available while Notion cannot be reached.
+
+    The poll interval adapts to the change rate, see AdaptivePollInterval.
+    Each poll is moved to the nearest multiple of the interval shifted by
+    the offset of the database's poll slot, so databases sharing a token
+    stay staggered, see NotionRequestScheduler.poll_offset.
+    With push enabled, changed pages are reported to a webhook and fetched one
+    by one, and polling at the longest interval only catches missed pushes.
+
+    Refreshes are single-flight: a refresh requested while one is running
+    joins a single trailing refresh, so a burst of requests, e.g. from the
+    update_entity service or webhooks, costs at most two queries.
+
+    With an outbox, writes that fail because Notion is unreachable are
+    queued on disk and shown right away, and replayed after the next
+    successful poll, see NotionOutbox.
+
+    With block descriptions enabled, descriptions are read from the content
+    of the task pages. That costs a request per page, so they are only
+    fetched when a list is opened and cached until the page is edited.
+    """
 
     config_entry: ConfigEntry
 
@@ -29,21 +93,542 @@ class NotionDataUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         client: NotionApiClient,
+        options: Mapping[str, Any] | None = None,
+        store: NotionSnapshotStore | None = None,
+        outbox: NotionOutbox | None = None,
+        title: str | None = None,
+        incremental: bool = True,
+        full_sync_interval: timedelta = FULL_SYNC_INTERVAL,
     ) -> None:
         """Initialize."""
         self.client = client
+        self.title = title
+        self._options = options or {}
+        self._poll_slot = client.scheduler.reserve_poll_slot()
+        maximum = timedelta(seconds=self._options.get(CONF_MAX_INTERVAL, MAX_UPDATE_INTERVAL.total_seconds()))
+        self._interval = AdaptivePollInterval(
+            minimum=maximum if self._options.get(CONF_PUSH) else timedelta(
+                seconds=self._options.get(CONF_MIN_INTERVAL, MIN_UPDATE_INTERVAL.total_seconds())
+            ),
+            maximum=maximum,
+            rate=client.scheduler.rate,
+        )
+        self._store = store
+        self._outbox = outbox
+        self._incremental = incremental
+        self._full_sync_interval = full_sync_interval
+        self._partitions = int(self._options.get(CONF_PARTITIONS, 1))
+        self._partition_bounds: list[str] = []
+        self._snapshot: dict[str, NotionTask] = {}
+        self._property_index = NotionPropertyIndex()
+        self._watermark: datetime | None = None
+        self._last_full_sync: datetime | None = None
+        self.block_descriptions: bool = self._options.get(CONF_BLOCK_DESCRIPTIONS, False)
+        self._descriptions: dict[str, tuple[datetime, str]] = {}
+        self._description_failures: dict[str, datetime] = {}
+        client.add_write_listener(self._async_handle_writes)
         super().__init__(
             hass=hass,
             logger=LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(minutes=5),
+            name=f"{DOMAIN} {client.database_id}",
+            update_interval=self._interval.interval,
+        )
+        self._refresh = SingleFlight(super()._async_refresh)
+        self._replay = SingleFlight(self._async_replay)
+        self._pushed: set[str] = set()
+        self._push_debouncer = Debouncer(
+            hass, LOGGER, cooldown=PUSH_DEBOUNCE, immediate=False, function=self._async_refresh_pushed
+        )
+
+    async def _async_refresh(
+        self,
+        log_failures: bool = True,
+        raise_on_auth_failed: bool = False,
+        scheduled: bool = False,
+        raise_on_entry_error: bool = False,
+    ) -> None:
+        """Refresh data, or join the trailing refresh if one is running."""
+        await self._refresh(
+            log_failures=log_failures,
+            raise_on_auth_failed=raise_on_auth_failed,
+            scheduled=scheduled,
+            raise_on_entry_error=raise_on_entry_error,
         )
 
     async def _async_update_data(self):
         """Update data via library."""
+        started = perf_counter()
         try:
-            return await self.client.async_get_data()
+            if self._full_sync_due():
+                changes, requests = await self._async_full_sync()
+            else:
+                changes, requests = await self._async_delta_sync()
         except NotionApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
         except NotionApiClientError as exception:
             raise UpdateFailed(exception) from exception
+        self._set_update_interval(self._interval.record_poll(changes, requests))
+        self.client.metrics.record_poll(perf_counter() - started, requests, changes)
+        self._async_save()
+        if self._outbox:
+            # Notion is reachable again.
+            self.hass.async_create_background_task(self._replay(), f"{DOMAIN} outbox replay")
+        return self._tasks()
+
+    def _set_update_interval(self, interval: timedelta) -> None:
+        """Schedule the next poll at the time of this database nearest to interval from now.
+
+        The times are the multiples of the interval shifted by the offset of
+        the poll slot. The offset is taken for the current interval and the
+        databases sharing a token have different slots, so their polls do
+        not coincide however often the interval adapts.
+        """
+        seconds = interval.total_seconds()
+        offset = self.client.scheduler.poll_offset(self._poll_slot, interval).total_seconds()
+        now = self.hass.loop.time()
+        slot = round((now + seconds - offset) / seconds) * seconds + offset
+        self.update_interval = timedelta(seconds=slot - now)
+
+    @property
+    def available_offline(self) -> bool:
+        """Return whether tasks can be shown and edited while Notion is unreachable.
+
+        That needs a snapshot, polled or restored, and an outbox to queue the
+        writes in.
+        """
+        return self._outbox is not None and self.data is not None
+
+    @property
+    def diagnostics(self) -> dict:
+        """Return diagnostics of the sync state, polling and rate limiting."""
+        return {
+            "title": self.title,
+            "tasks": len(self._snapshot),
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "last_full_sync": self._last_full_sync.isoformat() if self._last_full_sync else None,
+            "polling": self._interval.diagnostics,
+            "scheduler": self.client.scheduler.metrics,
+            "refreshes": {"runs": self._refresh.runs, "joined": self._refresh.joined},
+            "queued_writes": len(self._outbox) if self._outbox is not None else None,
+            "metrics": self.client.metrics.diagnostics,
+        }
+
+    async def async_restore(self) -> bool:
+        """Restore the snapshot saved by a previous run.
+
+        Returns:
+            bool: whether a snapshot was restored and data is available
+
+        """
+        if self._outbox is not None:
+            await self._outbox.async_load()
+        if self._store is None or not (restored := await self._store.async_load()):
+            return False
+        self._snapshot = restored.tasks
+        self._watermark = restored.watermark
+        # A snapshot queried with other options is shown, but replaced by a full sync.
+        self._last_full_sync = restored.full_sync if restored.options == queryHelper.query_options(self._options) else None
+        self.data = self._tasks()
+        LOGGER.debug("Restored %s tasks from storage", len(self._snapshot))
+        return True
+
+    @callback
+    def async_merge_task(self, page: dict) -> None:
+        """Merge a page returned by a write into the snapshot and notify listeners.
+
+        The watermark is left alone, remote edits older than this page may not
+        have been polled yet.
+        """
+        self._merge(page)
+        self._async_record_activity()
+        self._async_publish()
+
+    async def async_create_task(self, title: str, status: str) -> None:
+        """Create a task, or queue it in the outbox while Notion is unreachable."""
+        page = await self._async_write(
+            None, CREATE, {"title": title, "status": status}, lambda _: self.client.create_task(title, status)
+        )
+        if page is not None:
+            self.async_merge_task(page)
+
+    async def async_update_task(self, uid: str, values: dict[str, Any]) -> None:
+        """Update a task, or queue the update in the outbox while Notion is unreachable.
+
+        Args:
+            uid (str): id of the task
+            values (dict): title, status, due and description of the task
+
+        """
+        await self._async_write(
+            uid, UPDATE, values, lambda uid: self.client.async_queue_update_task(uid, **values)
+        )
+
+    async def async_delete_task(self, uid: str) -> None:
+        """Delete a task, or queue the deletion in the outbox while Notion is unreachable."""
+        await self._async_write(uid, DELETE, {}, self.client.async_queue_delete_task)
+
+    async def _async_write(
+        self,
+        uid: str | None,
+        operation: str,
+        values: dict[str, Any],
+        send: Callable[[str | None], Awaitable[dict]],
+    ) -> dict | None:
+        """Send a write, queuing it if Notion is unreachable or earlier writes of the task are queued.
+
+        Returns:
+            dict: the page Notion returned, None if the write was queued
+
+        """
+        if self._outbox is None:
+            return await send(uid)
+        if uid is not None:
+            uid = await self._outbox.async_resolve(uid)
+        if uid is None or uid not in self._outbox:
+            try:
+                return await send(uid)
+            except NotionApiClientCommunicationError as exception:
+                LOGGER.warning("Notion is unreachable, queuing the %s of a task: %s", operation, exception)
+        await self._outbox.async_add(uid, operation, values, self._snapshot.get)
+        self._async_publish()
+        return None
+
+    async def async_replay_writes(self) -> None:
+        """Send the writes queued in the outbox, after a replay in progress."""
+        await self._replay()
+
+    async def _async_replay(self) -> None:
+        def written(uid: str, page: dict | None) -> None:
+            if page is None:
+                self._snapshot.pop(uid, None)
+            else:
+                self._merge(page)
+
+        try:
+            await self._outbox.async_replay(self.client, written)
+        finally:
+            self._async_publish()
+
+    @callback
+    def async_push(self, page_ids: Iterable[str]) -> None:
+        """Fetch pages reported as changed, coalescing the pushes of a short burst."""
+        self._pushed.update(page_ids)
+        self._push_debouncer.async_schedule_call()
+
+    async def async_refresh_pages(self, page_ids: Iterable[str]) -> None:
+        """Fetch pages by id, merge them into the snapshot and notify listeners once.
+
+        The pages are fetched concurrently, so refreshing a few known pages
+        costs a request per page instead of a query of the whole database.
+        Deleted or no longer shared pages are removed, pages of other
+        databases are ignored. Like a delta sync, this does not apply the
+        configured filter, so pages that stop matching it are only dropped by
+        the next full sync.
+        """
+        self.async_merge_pages(await self.client.get_pages(page_ids, return_exceptions=True))
+
+    @callback
+    def async_merge_pages(self, pages: Mapping[str, dict | BaseException | None]) -> None:
+        """Merge pages fetched by id into the snapshot and notify listeners once.
+
+        Args:
+            pages (Mapping): pages by id as NotionApiClient.get_pages returns
+                them, None for a deleted page and the error of a failed fetch
+
+        """
+        changed = False
+        for page_id, page in pages.items():
+            if isinstance(page, BaseException):
+                LOGGER.warning("Error fetching page %s: %s", page_id, page)
+            elif page is None:
+                changed |= self._snapshot.pop(page_id, None) is not None
+            elif self._in_database(page):
+                previous = self._snapshot.get(page['id'])
+                changed |= self._merge(page) is not previous
+        if changed:
+            self._async_publish()
+
+    def cached_description(self, task: NotionTask) -> str | None:
+        """Return the description read from the content of a task page, if it is cached and current."""
+        cached = self._descriptions.get(task.id)
+        if cached is None or cached[0] != task.last_edited_time:
+            return None
+        return cached[1]
+
+    def description_missing(self, task: NotionTask) -> bool:
+        """Return whether the description of a task should be read from its page.
+
+        Tasks only queued in the outbox have no page yet. A page whose content
+        could not be read is not tried again until it is edited.
+        """
+        return (
+            not task.id.startswith(LOCAL_ID_PREFIX)
+            and self.cached_description(task) is None
+            and self._description_failures.get(task.id) != task.last_edited_time
+        )
+
+    async def async_fetch_descriptions(self, tasks: Iterable[NotionTask]) -> set[str]:
+        """Read the descriptions of tasks from the content of their pages.
+
+        Only tasks whose description is missing are fetched, see
+        description_missing. Returns the ids of the tasks whose description
+        was read.
+        """
+        tasks = [task for task in tasks if self.description_missing(task)]
+        results = await asyncio.gather(
+            *[self.client.async_get_blocks(task.id) for task in tasks],
+            return_exceptions=True
+        )
+        fetched = set()
+        for task, blocks in zip(tasks, results):
+            if isinstance(blocks, BaseException):
+                LOGGER.warning("Error fetching the content of page %s: %s", task.id, blocks)
+                self._description_failures[task.id] = task.last_edited_time
+            else:
+                self._descriptions[task.id] = (task.last_edited_time, blocks_to_markdown(blocks))
+                self._description_failures.pop(task.id, None)
+                fetched.add(task.id)
+        for cache in (self._descriptions, self._description_failures):
+            for uid in cache.keys() - self._snapshot.keys():
+                del cache[uid]
+        return fetched
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending pushes and release the poll slot."""
+        await super().async_shutdown()
+        self._push_debouncer.async_cancel()
+        self.client.scheduler.release_poll_slot(self._poll_slot)
+
+    async def _async_refresh_pushed(self) -> None:
+        page_ids, self._pushed = self._pushed, set()
+        await self.async_refresh_pages(page_ids)
+
+    def _in_database(self, page: dict) -> bool:
+        database_id = page.get('parent', {}).get('database_id') or ''
+        return database_id.replace('-', '') == self.client.database_id.replace('-', '')
+
+    @callback
+    def _async_handle_writes(self, written: dict[str, dict | None]) -> None:
+        """Merge a batch of queued writes and notify listeners once.
+
+        Deletions are invisible to a delta query, so deleted tasks are removed
+        here instead of waiting for the next full sync.
+        """
+        for uid, page in written.items():
+            if page is None:
+                self._snapshot.pop(uid, None)
+            else:
+                self._merge(page)
+        self._async_record_activity()
+        self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        """Notify listeners of the tasks without touching last_update_success.
+
+        Writes queued during an outage are published too, and must not mark
+        the failed poll as successful.
+        """
+        if self.data is not None:
+            self._async_save()
+            self.data = self._tasks()
+            self.async_update_listeners()
+
+    def _async_record_activity(self) -> None:
+        """Poll sooner after local activity, rescheduling the pending poll."""
+        self._set_update_interval(self._interval.record_activity())
+        if self._listeners:
+            self._schedule_refresh()
+
+    def _tasks(self) -> dict[str, NotionTask]:
+        """Return the tasks of the snapshot with the queued writes applied."""
+        if not self._outbox:
+            return dict(self._snapshot)
+        return self._outbox.apply(self._snapshot)
+
+    @callback
+    def _async_save(self) -> None:
+        if self._store is not None:
+            self._store.async_save(self._snapshot, self._watermark, self._last_full_sync,
+                                   queryHelper.query_options(self._options))
+
+    def _full_sync_due(self) -> bool:
+        if not self._incremental or self._watermark is None or self._last_full_sync is None:
+            return True
+        return dt_util.utcnow() - self._last_full_sync >= self._full_sync_interval
+
+    async def _async_query(self) -> tuple[list[dict], list[dict] | None]:
+        if not queryHelper.query_options(self._options):
+            return [], None
+        database = await self.client.async_get_database()
+        conditions = queryHelper.build_conditions(self._options, database, dt_util.utcnow())
+        return conditions, queryHelper.build_sorts(self._options, database)
+
+    async def _async_full_sync(self) -> tuple[int, int]:
+        """Replace the snapshot, return the number of changed tasks and requests.
+
+        With several partitions, the created_time ranges of the partitions
+        are queried concurrently, as the cursor chain of a single query can
+        only be followed one page at a time. The partitions are merged in
+        order and checked for tasks returned twice or outside their range.
+        """
+        started = dt_util.utcnow()
+        previous = self._snapshot
+        watermark = None
+        changes = 0
+        conditions, sorts = await self._async_query()
+        # The schema may have changed since the last full sync.
+        self._property_index.invalidate()
+        ranges, requests = await self._async_partition_ranges(conditions)
+        parts: list[dict[str, NotionTask]] = [{} for _ in ranges]
+        created_times: list[str] = []
+        misplaced = 0
+
+        def loader(part: dict[str, NotionTask], range_conditions: list[dict]) -> Callable[[dict], None]:
+            def load(page: dict) -> None:
+                nonlocal changes, watermark, misplaced
+                task = NotionTask.from_page(page, self._property_index)
+                if task != previous.get(task.id):
+                    changes += 1
+                else:
+                    task = previous[task.id]
+                part[task.id] = task
+                watermark = self._newer(watermark, task.last_edited_time)
+                if len(ranges) > 1:
+                    created_times.append(page['created_time'])
+                    if not in_range(parse_timestamp(page['created_time']), range_conditions):
+                        misplaced += 1
+            return load
+
+        streams = [
+            asyncio.ensure_future(self.client.async_stream_pages(
+                self._timed(loader(part, range_conditions)),
+                query_filter=queryHelper.combine(conditions + range_conditions),
+                sorts=sorts,
+            ))
+            for part, range_conditions in zip(parts, ranges)
+        ]
+        try:
+            requests += sum(await asyncio.gather(*streams))
+        except BaseException:
+            for stream in streams:
+                stream.cancel()
+            raise
+
+        snapshot = {}
+        for part in parts:
+            duplicates = part.keys() & snapshot.keys()
+            changes -= len(duplicates)
+            snapshot.update(part)
+        if misplaced or len(snapshot) != sum(map(len, parts)):
+            LOGGER.warning("Partitioned full sync returned %s tasks twice and %s outside their partition",
+                           sum(map(len, parts)) - len(snapshot), misplaced)
+        if sorts and len(parts) > 1:
+            # Each partition is sorted by Notion, the merged result is sorted here.
+            snapshot = dict(sorted(snapshot.items(), key=lambda item: _due_key(item[1])))
+        if created_times:
+            self._partition_bounds = quantile_bounds(created_times, self._partitions)
+        changes += len(previous.keys() - snapshot.keys())
+        self._snapshot = snapshot
+        self._watermark = watermark
+        self._last_full_sync = started
+        LOGGER.debug("Full sync loaded %s tasks in %s partitions, %s changed", len(snapshot), len(parts), changes)
+        return changes, requests
+
+    async def _async_partition_ranges(self, conditions: list[dict]) -> tuple[list[list[dict]], int]:
+        """Return the created_time ranges of the partitions and the number of requests made.
+
+        The bounds are the quantiles of the created times seen by the last
+        full sync, so the partitions are about equally large. Without them,
+        the time between the oldest and the newest task is split evenly.
+        """
+        if self._partitions <= 1:
+            return [[]], 0
+        if self._partition_bounds:
+            return range_conditions(self._partition_bounds), 0
+        oldest, newest = await asyncio.gather(
+            self._async_created_time(conditions, 'ascending'),
+            self._async_created_time(conditions, 'descending'),
+        )
+        if oldest is None or newest is None:
+            return [[]], 2
+        return range_conditions(even_bounds(oldest, newest, self._partitions)), 2
+
+    async def _async_created_time(self, conditions: list[dict], direction: str) -> datetime | None:
+        """Return the created_time of the oldest or newest task, None if there are no tasks."""
+        pages = self.client.async_iter_pages(
+            page_size=1,
+            query_filter=queryHelper.combine(conditions),
+            sorts=[{'timestamp': 'created_time', 'direction': direction}],
+        )
+        try:
+            async for results in pages:
+                return parse_timestamp(results[0]['created_time']) if results else None
+        finally:
+            await pages.aclose()
+        return None
+
+    async def _async_delta_sync(self) -> tuple[int, int]:
+        """Merge edited pages, return the number of changed tasks and requests."""
+        # Notion truncates last_edited_time to the minute, so pages edited in
+        # the same minute as the watermark are fetched again to not miss any.
+        # Pages that stop matching the configured filter are only dropped by
+        # the next full sync.
+        conditions, sorts = await self._async_query()
+        conditions.append({
+            'timestamp': 'last_edited_time',
+            'last_edited_time': {'on_or_after': self._watermark.isoformat()},
+        })
+        changes = 0
+        watermark = self._watermark
+
+        def merge(page: dict) -> None:
+            nonlocal changes, watermark
+            previous = self._snapshot.get(page['id'])
+            task = self._merge(page)
+            if task is not previous:
+                changes += 1
+            last_edited_time = task.last_edited_time if task else propHelper.get_last_edited_time(page)
+            watermark = self._newer(watermark, last_edited_time)
+
+        requests = await self.client.async_stream_pages(
+            self._timed(merge), query_filter=queryHelper.combine(conditions), sorts=sorts
+        )
+        self._watermark = watermark
+        LOGGER.debug("Delta sync merged %s changed tasks", changes)
+        return changes, requests
+
+    def _timed(self, on_page: Callable[[dict], None]) -> Callable[[dict], None]:
+        """Record the parse time of every page, if the metrics are enabled."""
+        metrics = self.client.metrics
+        if not metrics.enabled:
+            return on_page
+
+        def timed(page: dict) -> None:
+            started = perf_counter()
+            on_page(page)
+            metrics.record_parse(1, perf_counter() - started)
+        return timed
+
+    def _merge(self, page: dict) -> NotionTask | None:
+        """Merge a page into the snapshot, keeping the current record if it is unchanged."""
+        if page.get('archived') or page.get('in_trash'):
+            self._snapshot.pop(page['id'], None)
+            return None
+        task = NotionTask.from_page(page, self._property_index)
+        previous = self._snapshot.get(task.id)
+        if task == previous:
+            return previous
+        self._snapshot[task.id] = task
+        return task
+
+    @staticmethod
+    def _newer(watermark: datetime | None, last_edited_time: datetime) -> datetime:
+        if watermark is None or last_edited_time > watermark:
+            return last_edited_time
+        return watermark
+
+
+def _due_key(task: NotionTask) -> tuple[bool, str]:
+    # Notion sorts tasks without a due date last.
+    return task.due is None, format_date(task.due) if task.due else ''
@@ -0,0 +1,29 @@
+"""Diagnostics support for notion_todo."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_VERIFICATION_TOKEN, DATA_CONNECTION_POOLS, DOMAIN
+from .coordinator import NotionDataUpdateCoordinator
+
+TO_REDACT = {CONF_ACCESS_TOKEN, CONF_VERIFICATION_TOKEN, CONF_WEBHOOK_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinators: dict[str, NotionDataUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "connections": hass.data[DATA_CONNECTION_POOLS][entry.data[CONF_ACCESS_TOKEN]].diagnostics,
+        "databases": {
+            database_id: coordinator.diagnostics
+            for database_id, coordinator in coordinators.items()
+        },
+    }
@@ -0,0 +1,129 @@
+"""Incremental decoding of JSON objects with a large array member."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import json
+import re
+from typing import Any
+
+_WHITESPACE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+
+# States of the decoder, named after what is expected next.
+_OBJECT, _KEY, _COLON, _VALUE, _MEMBER_END, _ITEM, _ITEM_END, _DONE = range(8)
+_INCOMPLETE = object()
+
+
+class JsonStreamDecoder:
+    """Decode a JSON object fed in chunks, handing out one array member item by item.
+
+    The items of the array member named key are decoded one at a time with
+    raw_decode and passed to on_item as soon as they are complete, the text
+    they were decoded from is dropped. So the memory needed is bounded by the
+    largest item instead of the whole document. All other members are decoded
+    as usual and returned by close, the streamed member is left out.
+    """
+
+    def __init__(self, key: str, on_item: Callable[[Any], None]) -> None:
+        """Initialize the decoder.
+
+        Args:
+            key (str): name of the array member to stream
+            on_item (Callable): called with every item of the array
+
+        """
+        self._key = key
+        self._on_item = on_item
+        self._buffer = ''
+        self._pos = 0
+        self._state = _OBJECT
+        self._member: str | None = None
+        self._result: dict[str, Any] = {}
+        self.items = 0
+
+    def feed(self, text: str) -> None:
+        """Decode as much of the document as the text received so far allows."""
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        self._decode(final=False)
+
+    def close(self) -> dict[str, Any]:
+        """Decode the rest of the document and return its other members.
+
+        Raises:
+            json.JSONDecodeError: if the document is invalid or incomplete
+
+        """
+        self._decode(final=True)
+        if self._state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of document", self._buffer, len(self._buffer))
+        if self._buffer[self._pos:].strip():
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+        return self._result
+
+    def _decode(self, final: bool) -> None:
+        while self._state != _DONE:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos == len(self._buffer):
+                return
+            char = self._buffer[self._pos]
+            if self._state == _OBJECT:
+                self._expect(char, '{')
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if (key := self._value(final)) is _INCOMPLETE:
+                    return
+                self._member = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(char, ':')
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._member == self._key and char == '[':
+                    self._pos += 1
+                    self._state = _ITEM
+                    continue
+                if (value := self._value(final)) is _INCOMPLETE:
+                    return
+                self._result[self._member] = value
+                self._state = _MEMBER_END
+            elif self._state == _MEMBER_END:
+                self._expect(char, ',}')
+                self._state = _KEY if char == ',' else _DONE
+            elif self._state == _ITEM:
+                if char == ']':
+                    self._pos += 1
+                    self._state = _MEMBER_END
+                    continue
+                if (item := self._value(final)) is _INCOMPLETE:
+                    return
+                self.items += 1
+                self._on_item(item)
+                self._state = _ITEM_END
+            elif self._state == _ITEM_END:
+                self._expect(char, ',]')
+                self._state = _ITEM if char == ',' else _MEMBER_END
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char not in expected:
+            raise json.JSONDecodeError(f"Expecting one of {expected!r}", self._buffer, self._pos)
+        self._pos += 1
+
+    def _value(self, final: bool) -> Any:
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE
+        # A number at the end of the text, e.g. "1" or "1." of "1.5", may go
+        # on in the next chunk.
+        if not final and (end == len(self._buffer) or self._buffer[end] in '.eE+-'):
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
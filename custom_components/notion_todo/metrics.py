@@ -0,0 +1,204 @@
+"""Instrumentation of the Notion client and coordinator."""
+from __future__ import annotations
+
+from collections import Counter
+
+from .const import LATENCY_BUCKETS
+
+
+class _Histogram:
+    """Count observations in fixed buckets, plus their sum and maximum."""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for bucket, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[bucket] += 1
+                return
+        self.buckets[-1] += 1
+
+    @property
+    def average(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.average,
+            "max": self.max,
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "le_inf": self.buckets[-1],
+            },
+        }
+
+
+class _EndpointMetrics:
+    """Latency, size and status codes of the requests to one endpoint."""
+
+    __slots__ = ('latency', 'bytes', 'statuses')
+
+    def __init__(self) -> None:
+        self.latency = _Histogram()
+        self.bytes = 0
+        self.statuses: Counter[int] = Counter()
+
+
+class NotionMetrics:
+    """Record where the time of requests and polls goes.
+
+    Request latency is measured from sending the request until its body is
+    read, without the wait for the rate limit, and kept per endpoint with
+    the ids replaced by {id}. JSON decoding, parsing pages into tasks and
+    building the todo items are timed separately.
+
+    Every record method returns right away while the metrics are disabled.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialize the metrics.
+
+        Args:
+            enabled (bool): whether anything is recorded
+
+        """
+        self.enabled = enabled
+        self._endpoints: dict[str, _EndpointMetrics] = {}
+        self._decode = _Histogram()
+        self._entity_update = _Histogram()
+        self._retries = 0
+        self._polls = 0
+        self._poll_tasks = 0
+        self._poll_parse = 0.0
+        self._last_poll: dict | None = None
+
+    def record_request(self, method: str, path: str, status: int, seconds: float, size: int) -> None:
+        """Record a response of the API.
+
+        Args:
+            method (str): HTTP method of the request
+            path (str): path of the request below the API URL
+            status (int): HTTP status of the response
+            seconds (float): time until the body was read
+            size (int): bytes of the body
+
+        """
+        if not self.enabled:
+            return
+        endpoint = self._endpoints.setdefault(self._endpoint(method, path), _EndpointMetrics())
+        endpoint.latency.observe(seconds)
+        endpoint.bytes += size
+        endpoint.statuses[status] += 1
+
+    def record_decode(self, seconds: float) -> None:
+        """Record the time taken to decode a response body."""
+        if self.enabled:
+            self._decode.observe(seconds)
+
+    def record_retry(self) -> None:
+        """Record a retried request."""
+        if self.enabled:
+            self._retries += 1
+
+    def record_parse(self, tasks: int, seconds: float) -> None:
+        """Record the time taken to parse a batch of pages of the current poll."""
+        if self.enabled:
+            self._poll_tasks += tasks
+            self._poll_parse += seconds
+
+    def record_poll(self, seconds: float, requests: int, changes: int) -> None:
+        """Finish the current poll.
+
+        Args:
+            seconds (float): duration of the poll
+            requests (int): query requests of the poll
+            changes (int): tasks changed by the poll
+
+        """
+        if not self.enabled:
+            return
+        self._polls += 1
+        self._last_poll = {
+            "duration": seconds,
+            "requests": requests,
+            "tasks": self._poll_tasks,
+            "changes": changes,
+            "parse_time": self._poll_parse,
+            "parse_time_per_task": self._poll_parse / self._poll_tasks if self._poll_tasks else None,
+        }
+        self._poll_tasks = 0
+        self._poll_parse = 0.0
+
+    def record_entity_update(self, seconds: float) -> None:
+        """Record the time taken to update the todo items from a poll."""
+        if self.enabled:
+            self._entity_update.observe(seconds)
+
+    @property
+    def last_poll(self) -> dict | None:
+        """Return the figures of the last poll."""
+        return self._last_poll
+
+    @property
+    def request_latency(self) -> float | None:
+        """Return the average latency of all requests in seconds."""
+        count = sum(endpoint.latency.count for endpoint in self._endpoints.values())
+        total = sum(endpoint.latency.total for endpoint in self._endpoints.values())
+        return total / count if count else None
+
+    @property
+    def bytes_received(self) -> int:
+        """Return the bytes received from the API."""
+        return sum(endpoint.bytes for endpoint in self._endpoints.values())
+
+    @property
+    def retries(self) -> int:
+        """Return the number of retried requests."""
+        return self._retries
+
+    @property
+    def rate_limited(self) -> int:
+        """Return the number of responses with status 429."""
+        return sum(endpoint.statuses[429] for endpoint in self._endpoints.values())
+
+    @property
+    def diagnostics(self) -> dict:
+        """Return all recorded metrics."""
+        if not self.enabled:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "endpoints": {
+                name: {
+                    "latency": endpoint.latency.as_dict(),
+                    "bytes": endpoint.bytes,
+                    "statuses": dict(endpoint.statuses),
+                }
+                for name, endpoint in self._endpoints.items()
+            },
+            "bytes_received": self.bytes_received,
+            "retries": self._retries,
+            "rate_limited": self.rate_limited,
+            "json_decode": self._decode.as_dict(),
+            "entity_update": self._entity_update.as_dict(),
+            "polls": self._polls,
+            "last_poll": self._last_poll,
+        }
+
+    @staticmethod
+    def _endpoint(method: str, path: str) -> str:
+        # Notion paths alternate between object types and ids, e.g. /databases/{id}/query.
+        segments = path.strip('/').split('/')
+        return f"{method.upper()} /" + '/'.join(
+            '{id}' if position % 2 else segment for position, segment in enumerate(segments)
+        )
@@ -0,0 +1,62 @@
+"""Models for notion_todo."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from .const import TASK_DATE_PROPERTY, TASK_DESCRIPTION_PROPERTY, TASK_STATUS_PROPERTY
+from .notion_date_helper import format_date, parse_date, parse_timestamp
+from .notion_property_helper import NotionPropertyHelper as propHelper, NotionPropertyIndex
+
+
+@dataclass(frozen=True, slots=True)
+class NotionTask:
+    """The fields of a Notion task page used by the integration.
+
+    Pages are parsed into tasks as soon as they are received, so the raw
+    page payload with its user objects, annotations and unused properties
+    is not kept in memory.
+    """
+
+    id: str
+    title: str
+    status: str | None
+    due: date | datetime | None
+    description: str | None
+    last_edited_time: datetime
+
+    @classmethod
+    def from_page(cls, page: dict, index: NotionPropertyIndex | None = None) -> NotionTask:
+        """Parse a Notion page into a task."""
+        return cls(
+            id=page['id'],
+            title=propHelper.get_property_by_id('title', page, index),
+            status=propHelper.get_property_by_id(TASK_STATUS_PROPERTY, page, index),
+            due=propHelper.get_property_by_id(TASK_DATE_PROPERTY, page, index),
+            description=propHelper.get_property_by_id(TASK_DESCRIPTION_PROPERTY, page, index),
+            last_edited_time=propHelper.get_last_edited_time(page),
+        )
+
+    def to_row(self) -> list:
+        """Serialize the task to a compact JSON compatible row."""
+        return [
+            self.id,
+            self.title,
+            self.status,
+            format_date(self.due) if self.due else None,
+            self.description,
+            self.last_edited_time.isoformat(),
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> NotionTask:
+        """Deserialize a task from a row created by to_row."""
+        id, title, status, due, description, last_edited_time = row
+        return cls(
+            id=id,
+            title=title,
+            status=status,
+            due=parse_date(due) if due else None,
+            description=description,
+            last_edited_time=parse_timestamp(last_edited_time),
+        )
@@ -0,0 +1,55 @@
+"""ISO 8601 parsing and formatting of Notion dates and timestamps."""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone, tzinfo
+from functools import lru_cache
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DATE_CACHE_SIZE = 4096
+
+
+def parse_date(value: str, time_zone: str | None = None) -> date | datetime:
+    """Parse the start or end of a Notion date property.
+
+    Date-only values become a date, values with a time an aware datetime.
+    Values without an offset are read in time_zone, or UTC if none is given.
+    """
+    if len(value) == 10:
+        return _parse_date_only(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=_zone(time_zone))
+    return parsed
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a Notion timestamp such as created_time or last_edited_time."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def format_date(value: date | datetime | str) -> str:
+    """Format a date or datetime for a Notion date property."""
+    if isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_only(value: str) -> date:
+    # Due dates repeat a lot across tasks, so the few distinct ones are cached.
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=32)
+def _zone(time_zone: str | None) -> tzinfo:
+    if not time_zone:
+        return timezone.utc
+    try:
+        return ZoneInfo(time_zone)
+    except (ZoneInfoNotFoundError, ValueError):
+        logging.warning(f'Unknown time zone {time_zone}, using UTC')
+        return timezone.utc
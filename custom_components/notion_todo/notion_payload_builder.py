@@ -0,0 +1,82 @@
+"""Build the property payloads of task writes."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any
+
+from .const import TASK_DATE_PROPERTY, TASK_DESCRIPTION_PROPERTY, TASK_STATUS_PROPERTY
+from .notion_date_helper import format_date
+from .notion_rich_text import from_markdown, from_plain_text
+
+TASK_FIELDS = {
+    'title': 'title',
+    'status': TASK_STATUS_PROPERTY,
+    'due': TASK_DATE_PROPERTY,
+    'description': TASK_DESCRIPTION_PROPERTY,
+}
+
+# Tasks cannot be shown or written without these, descriptions are optional.
+REQUIRED_TASK_FIELDS = ('title', 'status', 'due')
+
+
+def _date(value: date | datetime | str) -> dict:
+    return {'start': format_date(value)}
+
+
+def _status(value: str) -> dict:
+    return {'id': value}
+
+
+WRITERS: dict[str, Callable[[Any], Any]] = {
+    'title': from_plain_text,
+    'rich_text': from_markdown,
+    'date': _date,
+    'status': _status,
+}
+
+
+class NotionPayloadBuilder:
+    """Property payloads of task writes, compiled from the database schema.
+
+    The names and types of the task properties are looked up once per
+    schema, a write then only builds the JSON of the properties it sets.
+    Fields without a value are left out and so keep their value in Notion,
+    as are fields whose property the database does not have.
+    """
+
+    __slots__ = ('_properties',)
+
+    def __init__(self, schema: dict[str, dict]) -> None:
+        """Compile the builder.
+
+        Args:
+            schema (dict): properties of the database object, keyed by name
+
+        """
+        ids = {prop['id']: (name, prop['type']) for name, prop in schema.items() if 'id' in prop}
+        self._properties: dict[str, tuple[str, str, Callable[[Any], Any]]] = {}
+        for field, property_id in TASK_FIELDS.items():
+            if property_id in ids and ids[property_id][1] in WRITERS:
+                name, prop_type = ids[property_id]
+                self._properties[field] = (name, prop_type, WRITERS[prop_type])
+
+    @property
+    def missing(self) -> list[str]:
+        """Return the task fields the database has no property of a supported type for."""
+        return [field for field in TASK_FIELDS if field not in self._properties]
+
+    def build(self, **values: Any) -> dict[str, dict]:
+        """Build the properties of a page from task fields.
+
+        Args:
+            values: title, status, due and description of the task
+
+        """
+        properties = {}
+        for field, value in values.items():
+            if not value or field not in self._properties:
+                continue
+            name, prop_type, writer = self._properties[field]
+            properties[name] = {prop_type: writer(value)}
+        return properties
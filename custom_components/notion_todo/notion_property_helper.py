@@ -1,18 +1,56 @@
 """Helper class to parse Notion properties."""
-from datetime import datetime
 import logging
 
-DATE_FORMAT = '%Y-%m-%d'
-DATETIME_FORMAT = DATE_FORMAT + 'T%H:%M:%S.%f%z'
+from .notion_date_helper import format_date, parse_date, parse_timestamp
+from .notion_rich_text import from_markdown, from_plain_text, to_markdown, to_plain_text
+
+
+class NotionPropertyIndex:
+    """Index of property ids to property names of one database.
+
+    The index is compiled from the first page it is used with and reused for
+    all following pages, so a batch of pages costs one scan of the properties
+    instead of one per lookup. A cached name is checked against the page it is
+    used with and the index is recompiled if the schema changed.
+    """
+
+    __slots__ = ('_keys',)
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._keys = None
+
+    def invalidate(self):
+        """Drop the compiled index, the next lookup compiles it again."""
+        self._keys = None
+
+    def key(self, id, data):
+        """Get the name of the property with the given id."""
+        properties = data['properties']
+        if self._keys is not None and id in self._keys:
+            name = self._keys[id]
+            if name is None or properties.get(name, {}).get('id') == id:
+                return name
+        self._keys = {attr['id']: name for name, attr in properties.items() if 'id' in attr}
+        return self._keys.setdefault(id, None)
+
+
 class NotionPropertyHelper:
     """Helper class to parse Notion properties."""
 
     @staticmethod
-    def get_property_by_id(id, data):
-        """Get property by id."""
-        key = NotionPropertyHelper._get_property_key_by_id(id, data)
+    def get_property_by_id(id, data, index=None):
+        """Get property by id, None if the page has no such property."""
+        key = NotionPropertyHelper._get_property_key_by_id(id, data, index)
+        if key is None:
+            return None
         return NotionPropertyHelper._property(data['properties'][key])
 
+    @staticmethod
+    def get_last_edited_time(data):
+        """Get the last edited time of a page."""
+        return NotionPropertyHelper._parse_last_edited_time(data)
+
     @staticmethod
     def set_property_by_id(id, value, data):
         """Set property by id."""
@@ -44,7 +82,9 @@ class NotionPropertyHelper:
 
 
     @staticmethod
-    def _get_property_key_by_id(id, data):
+    def _get_property_key_by_id(id, data, index=None):
+        if index is not None:
+            return index.key(id, data)
         for name, attr in data['properties'].items():
             if 'id' in attr and attr['id'] == id:
                 return name
@@ -84,7 +124,7 @@ class NotionPropertyHelper:
     @staticmethod
     def _date(prop, value=None):
         if value:
-            prop['date'] = {'start': value}
+            prop['date'] = {'start': format_date(value)}
             if 'name' in prop:
                 del prop['name']
             return prop
@@ -93,10 +133,8 @@ class NotionPropertyHelper:
                 logging.warning(f'No date provided: {prop}')
                 return None
             start_date = prop['date']['start']
-            if start_date and len(start_date) > 10:
-                return datetime.strptime(start_date, DATETIME_FORMAT)
-            elif start_date:
-                return datetime.strptime(start_date, DATE_FORMAT)
+            if start_date:
+                return parse_date(start_date, prop['date'].get('time_zone'))
             else:
                 logging.warning(f'No date provided: {prop}')
                 return None
@@ -123,7 +161,7 @@ class NotionPropertyHelper:
 
     @staticmethod
     def _parse_last_edited_time(prop):
-        return datetime.strptime(prop['last_edited_time'], DATETIME_FORMAT)
+        return parse_timestamp(prop['last_edited_time'])
 
     @staticmethod
     def _parse_relation(prop):
@@ -140,24 +178,22 @@ class NotionPropertyHelper:
 
     @staticmethod
     def _title(prop, value=None):
-        return NotionPropertyHelper._text(prop, 'title', value)
+        if value:
+            return NotionPropertyHelper._set_text(prop, 'title', from_plain_text(value))
+        return to_plain_text(prop['title'])
 
     @staticmethod
     def _rich_text(prop, value=None):
-        return NotionPropertyHelper._text(prop, 'rich_text', value)
+        if value:
+            return NotionPropertyHelper._set_text(prop, 'rich_text', from_markdown(value))
+        return to_markdown(prop['rich_text'])
 
     @staticmethod
-    def _text(prop, prop_type, value=None):
-        if value:
-            prop[prop_type] = [{'type': 'text', 'text': {'content': value}}]
-            if 'name' in prop:
-                del prop['name']
-            return prop
-        else:
-            text = ''
-            for line in prop[prop_type]:
-                text += line['plain_text'] + '\n'
-            return text
+    def _set_text(prop, prop_type, rich_text):
+        prop[prop_type] = rich_text
+        if 'name' in prop:
+            del prop['name']
+        return prop
 
     @staticmethod
     def _parse_array(prop):
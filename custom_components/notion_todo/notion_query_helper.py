@@ -0,0 +1,83 @@
+"""Helper class to build Notion database query filters and sorts."""
+from datetime import datetime, timedelta
+
+from .const import (
+    CONF_COMPLETED_DAYS,
+    CONF_EXCLUDE_ARCHIVED,
+    CONF_SORT_BY_DUE,
+    STATUS_ARCHIVED,
+    STATUS_IN_PROGRESS,
+    STATUS_NOT_STARTED,
+    TASK_DATE_PROPERTY,
+    TASK_STATUS_PROPERTY,
+)
+from .notion_property_helper import NotionPropertyHelper as propHelper
+
+
+class NotionQueryHelper:
+    """Helper class to build Notion database query filters and sorts.
+
+    Filters are built as a list of conditions so they can be combined with
+    other conditions without exceeding Notion's nesting depth of two.
+    """
+
+    QUERY_OPTIONS = (CONF_EXCLUDE_ARCHIVED, CONF_COMPLETED_DAYS, CONF_SORT_BY_DUE)
+
+    @staticmethod
+    def query_options(options):
+        """Get the options that change the query."""
+        return {key: options[key] for key in NotionQueryHelper.QUERY_OPTIONS if options.get(key)}
+
+    @staticmethod
+    def build_conditions(options, database, now: datetime):
+        """Build the filter conditions configured in the options."""
+        conditions = []
+        status_key = propHelper._get_property_key_by_id(TASK_STATUS_PROPERTY, database)
+        if not status_key:
+            return conditions
+        status_names = NotionQueryHelper._status_names(database['properties'][status_key])
+
+        if options.get(CONF_EXCLUDE_ARCHIVED) and STATUS_ARCHIVED in status_names:
+            conditions.append(NotionQueryHelper._status_condition(
+                TASK_STATUS_PROPERTY, 'does_not_equal', status_names[STATUS_ARCHIVED]))
+
+        completed_days = int(options.get(CONF_COMPLETED_DAYS) or 0)
+        if completed_days:
+            # Notion has no completion date, the last edit is the closest match.
+            cutoff = now - timedelta(days=completed_days)
+            open_conditions = [
+                NotionQueryHelper._status_condition(TASK_STATUS_PROPERTY, 'equals', status_names[status])
+                for status in (STATUS_NOT_STARTED, STATUS_IN_PROGRESS) if status in status_names
+            ]
+            conditions.append({'or': [
+                *open_conditions,
+                {'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': cutoff.isoformat()}},
+            ]})
+        return conditions
+
+    @staticmethod
+    def build_sorts(options, database):
+        """Build the sorts configured in the options."""
+        if not options.get(CONF_SORT_BY_DUE):
+            return None
+        due_key = propHelper._get_property_key_by_id(TASK_DATE_PROPERTY, database)
+        if not due_key:
+            return None
+        return [{'property': due_key, 'direction': 'ascending'}]
+
+    @staticmethod
+    def combine(conditions):
+        """Combine filter conditions to a single Notion filter object."""
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {'and': conditions}
+
+    @staticmethod
+    def _status_condition(property_id, operator, name):
+        return {'property': property_id, 'status': {operator: name}}
+
+    @staticmethod
+    def _status_names(prop):
+        return {option['id']: option['name'] for option in prop['status']['options']}
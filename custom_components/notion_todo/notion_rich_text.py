@@ -0,0 +1,338 @@
+"""Conversion between Notion rich text and Markdown."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import groupby, takewhile
+from operator import itemgetter
+import re
+
+MAX_TEXT_LENGTH = 2000
+
+# Annotations in the order their markers are nested, outermost first.
+MARKERS = {
+    'bold': '**',
+    'strikethrough': '~~',
+    'italic': '*',
+    'code': '`',
+}
+_ESCAPED = '\\*~`[]'
+_WORDS = re.compile(r'\s+|\S+')
+_RUNS = re.compile(r'\*+|~+')
+
+
+def to_plain_text(rich_text: Iterable[dict]) -> str:
+    """Join the plain text of rich text segments."""
+    return ''.join(segment['plain_text'] for segment in rich_text)
+
+
+def to_markdown(rich_text: Iterable[dict]) -> str:
+    """Render rich text as Markdown.
+
+    Bold, italic, strikethrough, code and links are kept, colors and
+    underlines are dropped. Markdown characters in the text are escaped, so
+    from_markdown gives back the same segments. Markers cannot open before
+    or close after whitespace, nor sit inside a word, so whitespace at the
+    edges of a run is left out of its markers and emphasis changing inside
+    a word changes where the word ends.
+    """
+    return _render(_merge(rich_text))
+
+
+def from_plain_text(text: str) -> list[dict]:
+    """Build rich text segments of plain text."""
+    return _segments(text, frozenset(), None)
+
+
+def from_markdown(text: str) -> list[dict]:
+    """Build rich text segments of Markdown written by to_markdown or a user.
+
+    Emphasis follows the flanking rules of CommonMark: an opening marker is
+    followed by text and a closing one preceded by text, and markers inside
+    a word are text, like _ in CommonMark. Markers without a counterpart
+    and empty code spans are kept as text. Segments longer than the 2000
+    characters Notion accepts are split.
+    """
+    tokens = _tokenize(text)
+    _match(tokens)
+    segments: list[dict] = []
+    active: Counter[str] = Counter()
+    buffer: list[str] = []
+
+    def flush() -> None:
+        if buffer:
+            segments.extend(_segments(''.join(buffer), _active(active), None))
+            buffer.clear()
+
+    for token in tokens:
+        if isinstance(token, str):
+            buffer.append(token)
+        elif isinstance(token, _Delimiter):
+            if token.closes:
+                flush()
+                active.subtract(token.closes)
+            buffer.append(token.char * token.count)
+            if token.opens:
+                flush()
+                active.update(token.opens)
+        elif isinstance(token, _Code):
+            flush()
+            segments.extend(_segments(token.text, _active(active) | {'code'}, None))
+        else:
+            flush()
+            label, url = token
+            for segment in from_markdown(label):
+                segment['text']['link'] = {'url': url}
+                if emphasis := _active(active):
+                    segment['annotations'] = {**segment.get('annotations', {}), **dict.fromkeys(emphasis, True)}
+                segments.append(segment)
+    flush()
+    return segments
+
+
+def blocks_to_markdown(blocks: Iterable[dict]) -> str:
+    """Render the text blocks of a page body as Markdown, one line per block.
+
+    Nested blocks and blocks without text, e.g. images, are left out.
+    """
+    lines = []
+    for block in blocks:
+        block_type = block.get('type')
+        content = block.get(block_type) or {}
+        text = to_markdown(content.get('rich_text', []))
+        if block_type == 'paragraph' or block_type == 'toggle':
+            lines.append(text)
+        elif block_type in ('heading_1', 'heading_2', 'heading_3'):
+            lines.append(f"{'#' * int(block_type[-1])} {text}")
+        elif block_type == 'bulleted_list_item':
+            lines.append(f"- {text}")
+        elif block_type == 'numbered_list_item':
+            lines.append(f"1. {text}")
+        elif block_type == 'to_do':
+            lines.append(f"- [{'x' if content.get('checked') else ' '}] {text}")
+        elif block_type in ('quote', 'callout'):
+            lines.append(f"> {text}")
+        elif block_type == 'code':
+            lines.append(f"```{content.get('language', '')}\n{to_plain_text(content.get('rich_text', []))}\n```")
+        elif block_type == 'divider':
+            lines.append('---')
+    return '\n'.join(lines)
+
+
+def _merge(rich_text: Iterable[dict]) -> list[tuple[str, frozenset[str], str | None]]:
+    """Join neighbouring segments with the same annotations and link."""
+    merged: list[tuple[str, frozenset[str], str | None]] = []
+    for segment in rich_text:
+        annotations = segment.get('annotations') or {}
+        active = frozenset(name for name in MARKERS if annotations.get(name))
+        link = segment.get('href')
+        if merged and merged[-1][1:] == (active, link):
+            merged[-1] = (merged[-1][0] + segment['plain_text'], active, link)
+        else:
+            merged.append((segment['plain_text'], active, link))
+    return merged
+
+
+def _segments(text: str, annotations: frozenset[str], link: str | None) -> list[dict]:
+    segments = []
+    for start in range(0, len(text), MAX_TEXT_LENGTH):
+        segment: dict = {'type': 'text', 'text': {'content': text[start:start + MAX_TEXT_LENGTH]}}
+        if link:
+            segment['text']['link'] = {'url': link}
+        if annotations:
+            segment['annotations'] = dict.fromkeys(annotations, True)
+        segments.append(segment)
+    return segments
+
+
+def _render(runs: list[tuple[str, frozenset[str], str | None]]) -> str:
+    units: list[tuple[str, frozenset[str], bool]] = []
+    for link, group in groupby(runs, key=itemgetter(2)):
+        if link and _link(f"[label]({link})", 0) == ('label', link, len(link) + 9):
+            label = _render([(text, active, None) for text, active, _ in group])
+            units.append((f"[{label}]({link})", frozenset(), False))
+            continue
+        for text, active, _ in group:
+            # A code span cannot contain its own marker.
+            if 'code' in active and '`' not in text:
+                units.append((f"`{text}`", active - {'code'}, True))
+            else:
+                units.extend(
+                    (''.join('\\' + char if char in _ESCAPED else char for char in part), active - {'code'}, False)
+                    for part in _WORDS.findall(text)
+                )
+    return _emphasize(units)
+
+
+def _emphasize(units: list[tuple[str, frozenset[str], bool]]) -> str:
+    """Join rendered units, opening and closing their emphasis markers nested."""
+    parts: list[str] = []
+    stack: list[str] = []
+    previous: str | None = None
+    previous_code = False
+    for index, (body, emphasis, code) in enumerate(units):
+        if body.isspace():
+            # Whitespace keeps no emphasis the next word does not have.
+            emphasis &= next((other for text, other, _ in units[index + 1:] if not text.isspace()), frozenset())
+        first = body[0]
+        kept = len(list(takewhile(emphasis.__contains__, stack)))
+        if kept < len(stack) and (previous.isspace() or first.isalnum()):
+            kept = len(stack)
+        openers = _openers(emphasis, stack[:kept])
+        if openers and (first.isspace() or previous is not None and previous.isalnum()):
+            openers = []
+        elif openers and previous is not None and not previous.isspace() and not first.isalnum():
+            # Where markers can close, an opening * would close an open * or
+            # **, so that one is closed and opened again after it.
+            chars = {MARKERS[name][0] for name in openers}
+            kept = next((index for index, name in enumerate(stack[:kept]) if MARKERS[name][0] in chars), kept)
+            openers = _openers(emphasis, stack[:kept])
+        markers = ''.join(MARKERS[name] for name in reversed(stack[kept:])) + ''.join(MARKERS[name] for name in openers)
+        stack = stack[:kept] + openers
+        if code and previous_code and not markers:
+            # Neighbouring code spans would read as a double backtick.
+            parts[-1] = parts[-1][:-1]
+            body = body[1:]
+        parts.append(markers + body)
+        previous, previous_code = body[-1], code
+    parts.append(''.join(MARKERS[name] for name in reversed(stack)))
+    return ''.join(parts)
+
+
+def _openers(emphasis: frozenset[str], stack: list[str]) -> list[str]:
+    return [name for name in MARKERS if name in emphasis and name not in stack and name != 'code']
+
+
+@dataclass(slots=True)
+class _Delimiter:
+    """A run of * or ~ that may open or close emphasis."""
+
+    char: str
+    count: int
+    cluster: int
+    can_open: bool
+    can_close: bool
+    opens: list[str] = field(default_factory=list)
+    closes: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _Code:
+    """A code span."""
+
+    text: str
+
+
+def _tokenize(text: str) -> list[str | _Delimiter | _Code | tuple[str, str]]:
+    """Split Markdown into text, delimiter runs, code spans and links."""
+    tokens: list[str | _Delimiter | _Code | tuple[str, str]] = []
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char == '\\' and text[position + 1:position + 2] in _ESCAPED and position + 1 < len(text):
+            tokens.append(text[position + 1])
+            position += 2
+        elif char == '`':
+            if (close := _code_end(text, position)) != -1:
+                tokens.append(_Code(text[position + 1:close]))
+                position = close + 1
+            else:
+                # Backticks without a counterpart and double backticks are text.
+                end = position + 1
+                while end < len(text) and text[end] == '`':
+                    end += 1
+                tokens.append(text[position:end])
+                position = end
+        elif char == '[' and (link := _link(text, position)):
+            label, url, position = link
+            tokens.append((label, url))
+        elif char in '*~':
+            end = position
+            while end < len(text) and text[end] in '*~':
+                end += 1
+            before = text[position - 1] if position else None
+            after = text[end] if end < len(text) else None
+            can_open = after is not None and not after.isspace() and not (before is not None and before.isalnum())
+            can_close = before is not None and not before.isspace() and not (after is not None and after.isalnum())
+            for run in _RUNS.findall(text[position:end]):
+                if run[0] == '~' and len(run) != 2:
+                    tokens.append(run)
+                else:
+                    tokens.append(_Delimiter(run[0], len(run), position, can_open, can_close))
+            position = end
+        else:
+            tokens.append(char)
+            position += 1
+    return tokens
+
+
+def _match(tokens: list) -> None:
+    """Pair opening and closing delimiters like CommonMark's emphasis algorithm."""
+    openers: list[_Delimiter] = []
+    for token in tokens:
+        if not isinstance(token, _Delimiter):
+            continue
+        while token.can_close and token.count:
+            # Neighbouring runs like **~~* all open or all close.
+            index = next((index for index in reversed(range(len(openers)))
+                          if openers[index].char == token.char and openers[index].cluster != token.cluster), None)
+            if index is None:
+                break
+            # Openers between the pair stay text.
+            del openers[index + 1:]
+            opener = openers[-1]
+            used = 2 if opener.count >= 2 and token.count >= 2 else 1
+            name = 'strikethrough' if token.char == '~' else 'bold' if used == 2 else 'italic'
+            opener.opens.append(name)
+            token.closes.append(name)
+            opener.count -= used
+            token.count -= used
+            if not opener.count:
+                openers.pop()
+        if token.count and token.can_open:
+            openers.append(token)
+
+
+def _active(active: Counter[str]) -> frozenset[str]:
+    return frozenset(name for name, count in active.items() if count > 0)
+
+
+def _code_end(text: str, position: int) -> int:
+    """Return the index of the backtick closing a code span opened at position, -1 if there is none.
+
+    Code spans are opened and closed by single backticks and are not empty.
+    """
+    if text[position + 1:position + 2] in ('', '`'):
+        return -1
+    close = text.find('`', position + 1)
+    return -1 if close == -1 or text[close + 1:close + 2] == '`' else close
+
+
+def _link(text: str, position: int) -> tuple[str, str, int] | None:
+    """Parse [label](url) at position into the label, url and end position.
+
+    The label ends at the first ] that is not escaped or in a code span, the
+    url may contain balanced parentheses but no whitespace.
+    """
+    index = position + 1
+    while index < len(text) and text[index] != ']':
+        if text[index] == '\\' and text[index + 1:index + 2] in _ESCAPED:
+            index += 2
+        elif text[index] == '`' and (close := _code_end(text, index)) != -1:
+            index = close + 1
+        else:
+            index += 1
+    if index in (position + 1, len(text)) or text[index + 1:index + 2] != '(':
+        return None
+    depth = 0
+    for end in range(index + 2, len(text)):
+        if text[end].isspace():
+            return None
+        if text[end] == '(':
+            depth += 1
+        elif text[end] == ')' and depth:
+            depth -= 1
+        elif text[end] == ')':
+            return (text[position + 1:index], text[index + 2:end], end + 1) if end > index + 2 else None
+    return None
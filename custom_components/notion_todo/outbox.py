@@ -0,0 +1,252 @@
+"""Write-ahead log of task mutations made while Notion is unreachable."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any
+import uuid
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import (
+    NotionApiClient,
+    NotionApiClientAuthenticationError,
+    NotionApiClientCommunicationError,
+    NotionApiClientError,
+    NotionApiClientNotFoundError,
+)
+from .const import DOMAIN, LOGGER, STORAGE_VERSION
+from .models import NotionTask
+from .notion_date_helper import format_date, parse_date, parse_timestamp
+
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+LOCAL_ID_PREFIX = 'local-'
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxEntry:
+    """The queued mutations of one task, coalesced into one write."""
+
+    operation: str
+    values: dict[str, Any]
+    base: NotionTask | None
+    queued: datetime
+
+
+class NotionOutbox:
+    """Keep the mutations Notion could not be reached for on disk and replay them.
+
+    Mutations are coalesced per task: updates are merged into the latest
+    values, a delete supersedes the updates and a delete of a task created
+    while offline drops it altogether. The entries are saved before a
+    mutation is acknowledged, so they survive a restart.
+
+    Each entry keeps the task as it was when it was queued. If Notion's
+    last_edited_time of the page is newer on replay, the page was edited
+    elsewhere meanwhile: fields changed in Notion keep their value there and
+    a delete is dropped. Tasks created while offline have a local id until
+    they are created in Notion.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the outbox.
+
+        Args:
+            hass (HomeAssistant): the Home Assistant instance
+            key (str): unique key of the outbox, e.g. the config entry id
+
+        """
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{key}.outbox")
+        self._entries: dict[str, OutboxEntry] = {}
+        self._sending: dict[str, asyncio.Event] = {}
+        self._created: dict[str, str] = {}
+
+    def __contains__(self, task_id: str) -> bool:
+        """Return whether mutations of the task are queued."""
+        return task_id in self._entries
+
+    def __len__(self) -> int:
+        """Return the number of tasks with queued mutations."""
+        return len(self._entries)
+
+    async def async_load(self) -> None:
+        """Load the entries saved by a previous run."""
+        data = await self._store.async_load()
+        try:
+            self._entries = {row[0]: _load_entry(row) for row in (data or {}).get('entries', [])}
+        except (KeyError, TypeError, ValueError) as exception:
+            LOGGER.warning("Ignoring invalid outbox: %s", exception)
+            self._entries = {}
+        if self._entries:
+            LOGGER.info("Restored %s queued task writes", len(self._entries))
+
+    async def async_remove(self) -> None:
+        """Remove the outbox from disk."""
+        await self._store.async_remove()
+
+    async def async_resolve(self, task_id: str) -> str:
+        """Wait until a write of the task being replayed is done and return the current id of the task."""
+        if (sending := self._sending.get(task_id)) is not None:
+            await sending.wait()
+        return self._created.get(task_id, task_id)
+
+    async def async_add(
+        self,
+        task_id: str | None,
+        operation: str,
+        values: dict[str, Any],
+        current: Callable[[str], NotionTask | None],
+    ) -> str:
+        """Queue a mutation and save the outbox.
+
+        Args:
+            task_id (str): id of the task, None to create one
+            operation (str): create, update or delete
+            values (dict): title, status, due and description to write,
+                fields without a value are left alone
+            current (Callable): returns the task as currently known by id
+
+        Returns:
+            str: id of the task, a local id for a created task
+
+        """
+        if task_id is not None:
+            task_id = await self.async_resolve(task_id)
+        values = {field: value for field, value in values.items() if value}
+        previous = self._entries.get(task_id) if task_id else None
+        if task_id is None:
+            task_id = f"{LOCAL_ID_PREFIX}{uuid.uuid4().hex}"
+            self._entries[task_id] = OutboxEntry(CREATE, values, None, dt_util.utcnow())
+        elif previous is None:
+            self._entries[task_id] = OutboxEntry(operation, values, current(task_id), dt_util.utcnow())
+        elif operation == DELETE and previous.operation == CREATE:
+            del self._entries[task_id]
+        elif operation == DELETE:
+            self._entries[task_id] = replace(previous, operation=DELETE, values={})
+        elif previous.operation != DELETE:
+            self._entries[task_id] = replace(previous, values={**previous.values, **values})
+        await self._async_save()
+        return task_id
+
+    def apply(self, tasks: dict[str, NotionTask]) -> dict[str, NotionTask]:
+        """Return the tasks with the queued mutations applied."""
+        tasks = dict(tasks)
+        for task_id, entry in self._entries.items():
+            if entry.operation == DELETE:
+                tasks.pop(task_id, None)
+            elif entry.operation == CREATE:
+                tasks[task_id] = NotionTask(
+                    id=task_id,
+                    title=entry.values.get('title', ''),
+                    status=entry.values.get('status'),
+                    due=entry.values.get('due'),
+                    description=entry.values.get('description'),
+                    last_edited_time=entry.queued,
+                )
+            elif task_id in tasks:
+                tasks[task_id] = replace(tasks[task_id], **entry.values)
+        return tasks
+
+    async def async_replay(
+        self,
+        client: NotionApiClient,
+        on_written: Callable[[str, dict | None], None],
+    ) -> bool:
+        """Send the queued writes in order, one at a time.
+
+        Sending them one by one keeps a reconnect from flooding the rate
+        limit. Replaying stops at the first communication or authentication
+        error, the rest is tried again later. Writes Notion rejects are
+        dropped.
+
+        Args:
+            client (NotionApiClient): the client to send the writes with
+            on_written (Callable): called with the id of a replayed task and
+                the page Notion returned, or None if the task is deleted
+
+        Returns:
+            bool: whether all queued writes were sent
+
+        """
+        for task_id in list(self._entries):
+            if (entry := self._entries.get(task_id)) is None:
+                continue
+            self._sending[task_id] = asyncio.Event()
+            try:
+                try:
+                    page = await self._send(client, task_id, entry)
+                except (NotionApiClientCommunicationError, NotionApiClientAuthenticationError) as exception:
+                    LOGGER.debug("Stopped replaying queued task writes: %s", exception)
+                    return False
+                except NotionApiClientError as exception:
+                    LOGGER.warning("Dropping the queued %s of %s: %s", entry.operation, task_id, exception)
+                else:
+                    if entry.operation == CREATE:
+                        self._created[task_id] = page['id']
+                    on_written(page['id'] if page else task_id, page)
+                del self._entries[task_id]
+            finally:
+                # Mutations of the task waiting for this write go on with its result.
+                self._sending.pop(task_id).set()
+            await self._async_save()
+        return True
+
+    async def _send(self, client: NotionApiClient, task_id: str, entry: OutboxEntry) -> dict | None:
+        values = entry.values
+        if entry.operation == CREATE:
+            return await client.create_task(
+                values.get('title', ''), values.get('status'), values.get('due'), values.get('description')
+            )
+
+        try:
+            page = await client.get_page(task_id)
+        except NotionApiClientNotFoundError:
+            return None
+        if page.get('archived') or page.get('in_trash'):
+            return None
+        remote = NotionTask.from_page(page)
+        if entry.base is not None and remote.last_edited_time > entry.base.last_edited_time:
+            if entry.operation == DELETE:
+                LOGGER.warning("Not deleting %s, it was edited in Notion while Notion was unreachable", task_id)
+                return page
+            kept = {field: value for field, value in values.items()
+                    if getattr(remote, field) == getattr(entry.base, field)}
+            if kept.keys() != values.keys():
+                LOGGER.warning("Keeping the values of %s edited in Notion: %s", task_id, ', '.join(values.keys() - kept))
+            values = kept
+        if entry.operation == DELETE:
+            await client.delete_task(task_id)
+            return None
+        if not values:
+            return page
+        return await client.update_task(
+            task_id, values.get('title'), values.get('status'), values.get('due'), values.get('description')
+        )
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({'entries': [_dump_entry(task_id, entry) for task_id, entry in self._entries.items()]})
+
+
+def _dump_entry(task_id: str, entry: OutboxEntry) -> list:
+    values = dict(entry.values)
+    if 'due' in values:
+        values['due'] = format_date(values['due'])
+    return [task_id, entry.operation, values, entry.base.to_row() if entry.base else None, entry.queued.isoformat()]
+
+
+def _load_entry(row: list) -> OutboxEntry:
+    _, operation, values, base, queued = row
+    if 'due' in values:
+        values['due'] = parse_date(values['due'])
+    return OutboxEntry(
+        operation=operation,
+        values=values,
+        base=NotionTask.from_row(base) if base else None,
+        queued=parse_timestamp(queued),
+    )
@@ -0,0 +1,55 @@
+"""Split a database query into created_time ranges that can be fetched concurrently."""
+from __future__ import annotations
+
+from datetime import datetime
+
+
+def quantile_bounds(created_times: list[str], partitions: int) -> list[str]:
+    """Return the bounds splitting the pages into partitions of about equal size.
+
+    Args:
+        created_times (list): created_time of the pages, as Notion returns it
+        partitions (int): number of partitions
+
+    """
+    if not created_times:
+        return []
+    created_times = sorted(created_times)
+    bounds = {created_times[len(created_times) * index // partitions] for index in range(1, partitions)}
+    return sorted(bound for bound in bounds if bound > created_times[0])
+
+
+def even_bounds(start: datetime, end: datetime, partitions: int) -> list[str]:
+    """Return the bounds splitting the time from start to end into equal ranges."""
+    step = (end - start) / partitions
+    return [(start + step * index).isoformat() for index in range(1, partitions)]
+
+
+def range_conditions(bounds: list[str]) -> list[list[dict]]:
+    """Build the filter conditions of the created_time ranges between the bounds.
+
+    The first range is open towards the past and the last towards the
+    future, and each range ends where the next one starts. So the ranges
+    cover every page exactly once, however the bounds are chosen.
+    """
+    edges = [None, *bounds, None]
+    ranges = []
+    for start, end in zip(edges, edges[1:]):
+        conditions = []
+        if start is not None:
+            conditions.append({'timestamp': 'created_time', 'created_time': {'on_or_after': start}})
+        if end is not None:
+            conditions.append({'timestamp': 'created_time', 'created_time': {'before': end}})
+        ranges.append(conditions)
+    return ranges
+
+
+def in_range(created_time: datetime, conditions: list[dict]) -> bool:
+    """Check that a page created at created_time belongs to the range of the conditions."""
+    for condition in conditions:
+        bound = datetime.fromisoformat(next(iter(condition['created_time'].values())))
+        if 'before' in condition['created_time'] and created_time >= bound:
+            return False
+        if 'on_or_after' in condition['created_time'] and created_time < bound:
+            return False
+    return True
@@ -0,0 +1,78 @@
+"""Adaptive poll interval for notion_todo."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import POLL_HISTORY, POLL_RATE_SHARE, UPDATE_INTERVAL
+
+
+class AdaptivePollInterval:
+    """Poll interval that follows how often a database changes.
+
+    The interval drops to the minimum after a poll found changes or a local
+    write happened, and doubles after every idle poll up to the maximum. It
+    never goes below a floor that keeps polling within a share of the rate
+    limit, based on the number of requests the last poll needed.
+    """
+
+    def __init__(
+        self,
+        minimum: timedelta,
+        maximum: timedelta,
+        rate: float,
+        initial: timedelta = UPDATE_INTERVAL,
+    ) -> None:
+        """Initialize the interval.
+
+        Args:
+            minimum (timedelta): interval while the database is active
+            maximum (timedelta): interval the idle back-off stops at
+            rate (float): requests per second allowed by the rate limit
+            initial (timedelta): interval until the first poll
+
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self._rate = rate
+        self._current = min(max(initial, self.minimum), self.maximum)
+        self._floor = timedelta()
+        self._history: deque[tuple[datetime, int]] = deque(maxlen=POLL_HISTORY)
+
+    @property
+    def interval(self) -> timedelta:
+        """Return the interval until the next poll."""
+        return max(self._current, self._floor)
+
+    def record_poll(self, changes: int, requests: int) -> timedelta:
+        """Adapt the interval to the result of a poll and return it."""
+        self._history.append((dt_util.utcnow(), changes))
+        self._floor = timedelta(seconds=requests / (self._rate * POLL_RATE_SHARE))
+        if changes:
+            self._current = self.minimum
+        else:
+            self._current = min(self._current * 2, self.maximum)
+        return self.interval
+
+    def record_activity(self) -> timedelta:
+        """Poll soon after a local write and return the interval."""
+        self._current = self.minimum
+        return self.interval
+
+    @property
+    def diagnostics(self) -> dict:
+        """Return the interval and change rate statistics."""
+        changes = sum(changes for _, changes in self._history)
+        span = (self._history[-1][0] - self._history[0][0]).total_seconds() if self._history else 0
+        return {
+            "interval": self.interval.total_seconds(),
+            "minimum": self.minimum.total_seconds(),
+            "maximum": self.maximum.total_seconds(),
+            "rate_limit_floor": self._floor.total_seconds(),
+            "recent_polls": len(self._history),
+            "recent_polls_with_changes": sum(1 for _, changes in self._history if changes),
+            "recent_changes": changes,
+            "changes_per_hour": round(changes * 3600 / span, 2) if span else None,
+        }
@@ -0,0 +1,155 @@
+"""Rate limit aware request scheduler for the Notion API."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from time import monotonic
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SCHEDULERS, MAX_CONCURRENT_REQUESTS, RATE_LIMIT, RATE_LIMIT_BURST
+
+
+class NotionRequestScheduler:
+    """Token bucket that spaces out the requests made with one Notion token.
+
+    Notion allows about three requests per second per integration. Every
+    request takes a token from the bucket before it is sent, and at most
+    max_concurrency requests are in flight at a time. A 429 response pauses
+    the whole bucket for the duration the server asked for.
+
+    All databases polled with the token share one scheduler, which also hands
+    out poll slots that spread the polls of the databases evenly over their
+    interval, so the databases are not polled together.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT,
+        burst: int = RATE_LIMIT_BURST,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            rate (float): tokens added to the bucket per second
+            burst (int): maximum number of tokens in the bucket
+            max_concurrency (int): maximum number of requests in flight
+
+        """
+        self._rate = rate
+        self._capacity = burst
+        self._tokens = float(burst)
+        self._refilled = monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._waiting = 0
+        self._in_flight = 0
+        self._requests = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._throttled = 0
+        self._retries = 0
+        self._poll_slots: set[int] = set()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free slot and a token, then hold the slot for the request."""
+        self._waiting += 1
+        started = monotonic()
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._acquire_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+
+        waited = monotonic() - started
+        self._requests += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def throttle(self, retry_after: float) -> None:
+        """Pause all requests after Notion answered with 429 Too Many Requests."""
+        self._throttled += 1
+        self._tokens = 0.0
+        self._refilled = monotonic()
+        self._paused_until = max(self._paused_until, monotonic() + retry_after)
+
+    @property
+    def rate(self) -> float:
+        """Return the number of requests per second."""
+        return self._rate
+
+    def reserve_poll_slot(self) -> int:
+        """Reserve the lowest free poll slot for a database, see poll_offset."""
+        slot = next(slot for slot in range(len(self._poll_slots) + 1) if slot not in self._poll_slots)
+        self._poll_slots.add(slot)
+        return slot
+
+    def release_poll_slot(self, slot: int) -> None:
+        """Release the poll slot of a database that is no longer polled."""
+        self._poll_slots.discard(slot)
+
+    def poll_offset(self, slot: int, interval: timedelta) -> timedelta:
+        """Return the offset of the polls in a slot within the poll interval.
+
+        The slots split the interval evenly, so databases polled at the same
+        interval are polled interval / slots apart.
+        """
+        return interval * slot / (max(self._poll_slots, default=0) + 1)
+
+    def record_retry(self) -> None:
+        """Count a retried request."""
+        self._retries += 1
+
+    @property
+    def metrics(self) -> dict:
+        """Return queue depth and wait time metrics of the scheduler."""
+        return {
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "max_concurrency": self._max_concurrency,
+            "requests": self._requests,
+            "wait_time_avg": self._wait_total / self._requests if self._requests else 0.0,
+            "wait_time_max": self._wait_max,
+            "throttled": self._throttled,
+            "retries": self._retries,
+        }
+
+    async def _acquire_token(self) -> None:
+        # The lock hands out tokens in arrival order.
+        async with self._lock:
+            while True:
+                now = monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self._capacity, self._tokens + (now - self._refilled) * self._rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant, token: str) -> NotionRequestScheduler:
+    """Get the scheduler shared by all databases, entries and flows using the token."""
+    schedulers: dict[str, NotionRequestScheduler] = hass.data.setdefault(DATA_SCHEDULERS, {})
+    if token not in schedulers:
+        schedulers[token] = NotionRequestScheduler()
+    return schedulers[token]
@@ -0,0 +1,133 @@
+"""Diagnostic sensors of the request and poll metrics."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import NotionDataUpdateCoordinator
+from .metrics import NotionMetrics
+
+
+@dataclass(frozen=True, kw_only=True)
+class NotionMetricsSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of the metrics."""
+
+    value_fn: Callable[[NotionMetrics], StateType]
+
+
+def _last_poll(field: str, scale: float = 1) -> Callable[[NotionMetrics], StateType]:
+    def value(metrics: NotionMetrics) -> StateType:
+        if metrics.last_poll is None or metrics.last_poll[field] is None:
+            return None
+        return round(metrics.last_poll[field] * scale, 3)
+    return value
+
+
+SENSORS: tuple[NotionMetricsSensorEntityDescription, ...] = (
+    NotionMetricsSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_poll("duration"),
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="poll_tasks",
+        name="Tasks per poll",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_poll("tasks"),
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="parse_time_per_task",
+        name="Parse time per task",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_poll("parse_time_per_task", 1000),
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="request_latency",
+        name="Request latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: round(metrics.request_latency * 1000, 1) if metrics.request_latency else None,
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.bytes_received,
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="retries",
+        name="Retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.retries,
+    ),
+    NotionMetricsSensorEntityDescription(
+        key="rate_limited",
+        name="Rate limited responses",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.rate_limited,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the metrics sensors if the metrics are enabled."""
+    coordinators: dict[str, NotionDataUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        NotionMetricsSensor(coordinator, f"{entry.entry_id}-{database_id}", description)
+        for database_id, coordinator in coordinators.items()
+        if coordinator.client.metrics.enabled
+        for description in SENSORS
+    )
+
+
+class NotionMetricsSensor(CoordinatorEntity[NotionDataUpdateCoordinator], SensorEntity):
+    """A diagnostic sensor of the metrics of one database, updated after each poll."""
+
+    entity_description: NotionMetricsSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: NotionDataUpdateCoordinator,
+        unique_id: str,
+        description: NotionMetricsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{unique_id}-{description.key}"
+        self._attr_name = f"{coordinator.title or 'Notion'} {description.name}"
+
+    @property
+    def available(self) -> bool:
+        """Metrics are also available while Notion is not."""
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value of the metric."""
+        return self.entity_description.value_fn(self.coordinator.client.metrics)
@@ -0,0 +1,66 @@
+"""Coalescing of concurrent calls of a coroutine function."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+_T = TypeVar('_T')
+
+
+class SingleFlight(Generic[_T]):
+    """Run a coroutine function at most once at a time.
+
+    A call while a run is in flight cannot tell whether that run already
+    sees what the caller is asking for, so it waits for one trailing run
+    started after the flight. All calls arriving during a flight share that
+    trailing run, so a burst of any number of calls costs at most two runs.
+    A run is started with the arguments of the call that started it.
+
+    Runs are shielded, a cancelled caller does not cancel a run other
+    callers are waiting for.
+    """
+
+    def __init__(self, function: Callable[..., Awaitable[_T]]) -> None:
+        """Initialize.
+
+        Args:
+            function (Callable): the coroutine function to run
+
+        """
+        self._function = function
+        self._running: asyncio.Future[_T] | None = None
+        self._trailing: asyncio.Future[_T] | None = None
+        self.runs = 0
+        self.joined = 0
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> _T:
+        """Run the function, or join the trailing run if one is in flight."""
+        if self._running is None:
+            self._running = asyncio.ensure_future(self._run(None, args, kwargs))
+            self._running.add_done_callback(_retrieve)
+            return await asyncio.shield(self._running)
+        self.joined += 1
+        if self._trailing is None:
+            self._trailing = asyncio.ensure_future(self._run(self._running, args, kwargs))
+            self._trailing.add_done_callback(_retrieve)
+        return await asyncio.shield(self._trailing)
+
+    async def _run(self, previous: asyncio.Future | None, args: tuple, kwargs: dict) -> _T:
+        if previous is not None:
+            await asyncio.wait([previous])
+            self._running, self._trailing = self._trailing, None
+        self.runs += 1
+        try:
+            return await self._function(*args, **kwargs)
+        finally:
+            # With a trailing run queued, the finished run stays in place
+            # until it starts, so calls in between join it.
+            if self._trailing is None:
+                self._running = None
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    # The error of a run whose callers were all cancelled is not logged.
+    if not future.cancelled():
+        future.exception()
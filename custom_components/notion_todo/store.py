@@ -0,0 +1,85 @@
+"""Persistent storage of the task snapshot for notion_todo."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LOGGER, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .models import NotionTask
+from .notion_date_helper import parse_timestamp
+
+
+@dataclass(slots=True)
+class StoredSnapshot:
+    """A task snapshot restored from disk."""
+
+    tasks: dict[str, NotionTask]
+    watermark: datetime | None
+    full_sync: datetime | None
+    options: dict[str, Any]
+
+
+class NotionSnapshotStore:
+    """Store the last good task snapshot and sync watermark on disk.
+
+    Tasks are saved as rows of plain values, which keeps the file small and
+    avoids storing the raw Notion payload.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the store.
+
+        Args:
+            hass (HomeAssistant): the Home Assistant instance
+            key (str): unique key of the snapshot, e.g. the config entry id
+
+        """
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{key}")
+
+    async def async_load(self) -> StoredSnapshot | None:
+        """Load the snapshot, None if there is no valid one."""
+        data = await self._store.async_load()
+        if not data:
+            return None
+        try:
+            return StoredSnapshot(
+                tasks={row[0]: NotionTask.from_row(row) for row in data['tasks']},
+                watermark=parse_timestamp(data['watermark']) if data['watermark'] else None,
+                full_sync=parse_timestamp(data['full_sync']) if data['full_sync'] else None,
+                options=data['options'],
+            )
+        except (KeyError, TypeError, ValueError) as exception:
+            LOGGER.warning("Ignoring invalid task snapshot: %s", exception)
+            return None
+
+    @callback
+    def async_save(
+        self,
+        tasks: dict[str, NotionTask],
+        watermark: datetime | None,
+        full_sync: datetime | None,
+        options: Mapping[str, Any],
+    ) -> None:
+        """Save the snapshot after a short delay, coalescing frequent saves.
+
+        The query options are saved along, a snapshot taken with other
+        options needs a full sync.
+        """
+        self._store.async_delay_save(
+            lambda: {
+                'watermark': watermark.isoformat() if watermark else None,
+                'full_sync': full_sync.isoformat() if full_sync else None,
+                'options': dict(options),
+                'tasks': [task.to_row() for task in tasks.values()],
+            },
+            STORAGE_SAVE_DELAY,
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot from disk."""
+        await self._store.async_remove()
@@ -61,6 +61,16 @@ class TestApi(unittest.IsolatedAsyncioTestCase):
 
             assert uid == result['results'][0]['id']
 
+    async def test_get_data_given_small_page_size_should_follow_cursor(self):
+        """Test getting all tasks when they span several query pages."""
+        async with aiohttp.ClientSession() as session:
+            client = NotionApiClient(TOKEN, DATABASE_ID, session)
+            uids = {await self.__create_task(client) for _ in range(3)}
+
+            result = await client.async_get_data(page_size=1)
+
+            assert {task['id'] for task in result['results']} == uids
+
     async def test_update_task_returns_expected_result(self):
         """Test updating a task."""
         async with aiohttp.ClientSession() as session:
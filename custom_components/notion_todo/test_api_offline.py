@@ -0,0 +1,315 @@
+"""Test cases for the Notion API client against the local Notion stand-in."""
+import aiohttp
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from benchmarks.dataset import rich_text
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import (
+    NotionApiClient,
+    NotionApiClientAuthenticationError,
+    NotionApiClientSchemaError,
+    NotionApiClientValidationError,
+)
+from custom_components.notion_todo.connection import (
+    NotionConnectionPool,
+    async_get_connection_pool,
+    async_release_connection_pool,
+)
+from custom_components.notion_todo.const import SCHEMA_TTL, TASK_STATUS_PROPERTY
+from custom_components.notion_todo.metrics import NotionMetrics
+from custom_components.notion_todo.models import NotionTask
+from custom_components.notion_todo.notion_rich_text import blocks_to_markdown
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+
+TITLE = "title"
+NOT_STARTED = 'not-started'
+DONE = "done"
+
+
+class TestApiOffline(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the Notion API client that run without a Notion account."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server with a few tasks."""
+        self.server = await FakeNotionServer(tasks=25).start()
+        self.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        """Stop the stand-in server."""
+        await self.session.close()
+        await self.server.close()
+
+    def __client(self, token=None, page_size=100, metrics=None):
+        return NotionApiClient(
+            token or self.server.token,
+            self.server.database_id,
+            self.session,
+            page_size=page_size,
+            scheduler=NotionRequestScheduler(rate=1000, burst=1000),
+            base_url=self.server.url,
+            metrics=metrics,
+        )
+
+    async def test_get_data_given_small_page_size_should_follow_cursor(self):
+        """Test reading all tasks over several query pages."""
+        client = self.__client(page_size=10)
+
+        result = await client.async_get_data()
+
+        assert len(result['results']) == 25
+        assert len(self.server.queries) == 3
+
+    async def test_iter_pages_given_filter_should_return_matching_tasks(self):
+        """Test that the query filter is applied."""
+        client = self.__client()
+        query_filter = {'property': TASK_STATUS_PROPERTY, 'status': {'equals': 'Done'}}
+
+        pages = [page async for results in client.async_iter_pages(query_filter=query_filter) for page in results]
+
+        expected = [page for page in self.server.pages.values()
+                    if page['properties']['Status']['status']['name'] == 'Done']
+        assert {page['id'] for page in pages} == {page['id'] for page in expected}
+
+    async def test_stream_pages_given_large_response_should_pass_every_page(self):
+        """Test decoding responses above the streaming threshold page by page."""
+        await self.server.close()
+        self.server = await FakeNotionServer(tasks=120, extra_properties=100).start()
+        client = self.__client()
+        pages = []
+
+        requests = await client.async_stream_pages(pages.append)
+
+        assert requests == 2
+        assert [page['id'] for page in pages] == list(self.server.pages)
+
+    async def test_stream_pages_given_compressed_response_should_decode_it_page_by_page(self):
+        """Test that a body that is small on the wire but large once decoded is streamed."""
+        await self.server.close()
+        self.server = await FakeNotionServer(tasks=120, extra_properties=100).start()
+        self.server.compress = True
+        client = self.__client(metrics=NotionMetrics(enabled=True))
+        pages = []
+
+        with patch.object(client, "_decode_stream", wraps=client._decode_stream) as decode_stream:
+            await client.async_stream_pages(pages.append)
+
+        assert decode_stream.call_count == 2
+        assert [page['id'] for page in pages] == list(self.server.pages)
+        assert client.metrics.diagnostics['json_decode']['count'] == 2
+
+    async def test_get_data_given_rate_limit_should_retry(self):
+        """Test that a 429 response is retried after Retry-After."""
+        self.server.rate_limit_every = 2
+        client = self.__client(page_size=10)
+
+        result = await client.async_get_data()
+
+        assert len(result['results']) == 25
+        assert client.scheduler.metrics['throttled'] >= 1
+
+    async def test_get_data_given_invalid_token_should_raise(self):
+        """Test that an invalid token raises an authentication error."""
+        client = self.__client(token="invalid")
+
+        with self.assertRaises(NotionApiClientAuthenticationError):
+            await client.async_get_data()
+
+    async def test_create_update_delete_task(self):
+        """Test the lifecycle of a task."""
+        client = self.__client()
+
+        created = await client.create_task(TITLE, NOT_STARTED)
+        updated = await client.async_queue_update_task(created['id'], TITLE, DONE, None, "description")
+        await client.async_queue_delete_task(created['id'])
+
+        assert updated['properties']['Status']['status']['id'] == DONE
+        assert self.server.pages[created['id']]['archived']
+        result = await client.async_get_data()
+        assert created['id'] not in {page['id'] for page in result['results']}
+
+    async def test_update_task_given_renamed_property_should_refresh_schema(self):
+        """Test that a write after a schema change fetches the schema again."""
+        client = self.__client()
+        created = await client.create_task(TITLE, NOT_STARTED)
+        self.server.rename_property("Summary", "Notes")
+
+        result = await client.update_task(created['id'], TITLE, DONE, None, "description")
+
+        assert result['properties']['Notes']['rich_text'][0]['plain_text'] == "description"
+        assert self.server.requests['GET /v1/databases/{id}'] == 2
+
+    async def test_set_database_given_expired_schema_should_fetch_it_again(self):
+        """Test that a schema handed over by the config flow keeps its age."""
+        schema = await self.__client().async_validate_database()
+        fresh, expired = self.__client(), self.__client()
+        fresh.set_database(schema, age=60)
+        expired.set_database(schema, age=SCHEMA_TTL.total_seconds())
+        self.server.requests.clear()
+
+        await fresh.create_task(TITLE, NOT_STARTED)
+        assert self.server.requests['GET /v1/databases/{id}'] == 0
+        await expired.create_task(TITLE, NOT_STARTED)
+        assert self.server.requests['GET /v1/databases/{id}'] == 1
+
+    async def test_update_task_given_validation_error_should_not_resend_unchanged_properties(self):
+        """Test that a rejected write is not sent again when the schema did not change."""
+        client = self.__client()
+        created = await client.create_task(TITLE, NOT_STARTED)
+        error = FakeNotionServer._validation_error("Status", "body.properties.Status failed validation")
+
+        with patch.object(self.server, "_set_properties", side_effect=error), \
+                self.assertRaises(NotionApiClientValidationError):
+            await client.update_task(created['id'], TITLE, DONE, None, None)
+
+        assert self.server.requests['PATCH /v1/pages/{id}'] == 1
+        assert self.server.requests['GET /v1/databases/{id}'] == 2
+
+    async def test_queue_update_task_given_updates_of_one_page_should_send_one_merged_patch(self):
+        """Test that queued updates of a page go out as one request with the final values."""
+        client = self.__client()
+        created = await client.create_task(TITLE, NOT_STARTED)
+        self.server.requests.clear()
+
+        with patch.object(self.server, "_set_properties", wraps=self.server._set_properties) as set_properties:
+            results = await asyncio.gather(
+                client.async_queue_update_task(created['id'], "first", NOT_STARTED, None, None),
+                client.async_queue_update_task(created['id'], "second", NOT_STARTED, None, "notes"),
+                client.async_queue_update_task(created['id'], "third", DONE, None, "notes"),
+            )
+
+        assert self.server.requests['PATCH /v1/pages/{id}'] == 1
+        properties = set_properties.call_args.args[1]
+        assert properties['Task name']['title'][0]['text']['content'] == "third"
+        assert results[0]['properties']['Status']['status']['name'] == 'Done'
+        assert properties['Summary']['rich_text'][0]['text']['content'] == "notes"
+        assert results[0] is results[1] is results[2]
+
+    async def test_queue_update_task_given_error_should_raise_it_to_every_caller(self):
+        """Test that the error of a merged request reaches every queued update."""
+        client = self.__client()
+        created = await client.create_task(TITLE, NOT_STARTED)
+        error = FakeNotionServer._validation_error("Status", "body.properties.Status failed validation")
+
+        with patch.object(self.server, "_set_properties", side_effect=error):
+            results = await asyncio.gather(
+                *[client.async_queue_update_task(created['id'], title, DONE, None, None)
+                  for title in ("first", "second", "third")],
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(result, NotionApiClientValidationError) for result in results)
+        assert self.server.requests['PATCH /v1/pages/{id}'] == 1
+
+    async def test_update_task_given_long_markdown_description_should_round_trip(self):
+        """Test that a description is split into segments Notion accepts and keeps its formatting."""
+        client = self.__client()
+        created = await client.create_task(TITLE, NOT_STARTED)
+        description = "Buy **milk**, *eggs* and [more](https://example.com) " + "x" * 4500
+
+        result = await client.update_task(created['id'], TITLE, DONE, None, description)
+
+        assert max(len(segment['plain_text']) for segment in result['properties']['Summary']['rich_text']) == 2000
+        assert NotionTask.from_page(result).description == description
+
+    async def test_get_blocks_should_render_page_content(self):
+        """Test reading a description from the content of a page."""
+        client = self.__client()
+        page_id = next(iter(self.server.pages))
+        self.server.blocks[page_id] = [
+            {'type': 'heading_2', 'heading_2': {'rich_text': rich_text("Steps")}},
+            {'type': 'to_do', 'to_do': {'rich_text': rich_text("Call", {'bold': True}), 'checked': True}},
+            {'type': 'image', 'image': {}},
+        ]
+
+        blocks = await client.async_get_blocks(page_id)
+
+        assert blocks_to_markdown(blocks) == "## Steps\n- [x] **Call**"
+
+    async def test_validate_database_should_only_fetch_the_schema(self):
+        """Test that validating a database transfers no tasks and keeps the schema for later writes."""
+        client = self.__client()
+
+        database = await client.async_validate_database()
+        await client.create_task(TITLE, NOT_STARTED)
+
+        assert database['id'] == self.server.database_id
+        assert self.server.requests['GET /v1/databases/{id}'] == 1
+        assert 'POST /v1/databases/{id}/query' not in self.server.requests
+
+    async def test_validate_database_given_missing_status_should_raise(self):
+        """Test that a database without a status property is rejected."""
+        del self.server.schema['properties']['Status']
+
+        with self.assertRaises(NotionApiClientSchemaError) as context:
+            await self.__client().async_validate_database()
+
+        assert context.exception.missing == ['status']
+
+    async def test_get_pages_given_missing_page_should_return_none(self):
+        """Test fetching several pages by id."""
+        client = self.__client()
+        page_ids = list(self.server.pages)[:3]
+        missing = "ffffffff-0000-0000-0000-000000000000"
+
+        result = await client.get_pages([*page_ids, missing, page_ids[0]])
+
+        assert [page['id'] for page in map(result.get, page_ids)] == page_ids
+        assert result[missing] is None
+        assert self.server.requests['GET /v1/pages/{id}'] == 4
+
+    async def test_get_data_given_concurrent_calls_should_share_requests(self):
+        """Test that reads in flight are not sent again."""
+        client = self.__client(page_size=10)
+        page_id = next(iter(self.server.pages))
+
+        results = await asyncio.gather(*[client.async_get_data() for _ in range(5)],
+                                       *[client.get_page(page_id) for _ in range(5)])
+
+        assert all(len(result['results']) == 25 for result in results[:5])
+        assert self.server.requests['POST /v1/databases/{id}/query'] == 3
+        assert self.server.requests['GET /v1/pages/{id}'] == 1
+
+    async def test_get_data_given_connection_pool_should_reuse_connections(self):
+        """Test that the requests of a poll share one kept-alive connection."""
+        await self.session.close()
+        pool = NotionConnectionPool()
+        self.session = pool.session
+
+        await self.__client(page_size=5).async_get_data()
+
+        assert pool.diagnostics['connections_created'] == 1
+        assert pool.diagnostics['connections_reused'] == 4
+
+    async def test_release_connection_pool_given_last_entry_should_close_it(self):
+        """Test that a pool is shared by the entries of a token and closed with the last one."""
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            pool = async_get_connection_pool(hass, "token", "first")
+            assert async_get_connection_pool(hass, "token", "second") is pool
+
+            await async_release_connection_pool(hass, "token", "first")
+            assert not pool.session.closed
+            await async_release_connection_pool(hass, "token", "second")
+
+            assert pool.session.closed
+            assert async_get_connection_pool(hass, "token", "first") is not pool
+            await hass.async_stop(force=True)
+
+    async def test_get_data_given_metrics_enabled_should_record_requests(self):
+        """Test that latency, size and 429 responses are recorded per endpoint."""
+        self.server.rate_limit_every = 3
+        client = self.__client(page_size=10, metrics=NotionMetrics(enabled=True))
+
+        await client.async_get_data()
+
+        diagnostics = client.metrics.diagnostics
+        query = diagnostics['endpoints']['POST /databases/{id}/query']
+        assert query['statuses'] == {200: 3, 429: 1}
+        assert diagnostics['retries'] == 1
+        assert diagnostics['bytes_received'] > 0
+        assert diagnostics['json_decode']['count'] == 3
@@ -0,0 +1,107 @@
+"""Test cases for the options flow."""
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.config_flow import NotionTodoConfigFlowHandler, NotionTodoOptionsFlowHandler
+from custom_components.notion_todo.connection import async_get_connection_pool
+from custom_components.notion_todo.const import (
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    DATA_CONNECTION_POOLS,
+    DATA_SCHEDULERS,
+    DOMAIN,
+)
+
+INTERVALS = (CONF_MIN_INTERVAL, CONF_MAX_INTERVAL)
+
+
+class TestOptionsFlow(unittest.IsolatedAsyncioTestCase):
+    """Test cases for NotionTodoOptionsFlowHandler."""
+
+    async def asyncSetUp(self):
+        """Build the options flow of an entry."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.flow = NotionTodoOptionsFlowHandler(ConfigEntry(
+            version=1, minor_version=1, domain=DOMAIN, title="Notion", source="user", data={}, options={},
+        ))
+        self.flow.hass = self.hass
+
+    async def asyncTearDown(self):
+        """Stop Home Assistant."""
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def test_init_given_min_interval_above_max_interval_should_show_an_error(self):
+        """Test that a minimum interval above the maximum is rejected and the input is kept."""
+        result = await self.flow.async_step_init({CONF_MIN_INTERVAL: 600, CONF_MAX_INTERVAL: 300})
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {CONF_MIN_INTERVAL: "min_interval"}
+        defaults = {str(key): key.default() for key in result["data_schema"].schema if key in INTERVALS}
+        assert defaults == {CONF_MIN_INTERVAL: 600, CONF_MAX_INTERVAL: 300}
+
+    async def test_init_given_valid_intervals_should_save_the_options(self):
+        """Test that intervals within each other are saved."""
+        user_input = {CONF_MIN_INTERVAL: 300, CONF_MAX_INTERVAL: 300}
+
+        result = await self.flow.async_step_init(user_input)
+
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["data"] == user_input
+
+
+class TestConfigFlow(unittest.IsolatedAsyncioTestCase):
+    """Test cases for NotionTodoConfigFlowHandler."""
+
+    async def asyncSetUp(self):
+        """Build a config flow whose databases validate without Notion."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.flow = NotionTodoConfigFlowHandler()
+        self.flow.hass = self.hass
+        self.flow.flow_id = "flow"
+        self.sessions = []
+
+        async def async_validate_database(client):
+            self.sessions.append(client._session)
+            return {}
+
+        self.patches = [
+            patch.object(NotionApiClient, "async_validate_database", async_validate_database),
+            patch.object(NotionApiClient, "async_get_title", return_value="Tasks"),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    async def asyncTearDown(self):
+        """Stop Home Assistant."""
+        for patcher in self.patches:
+            patcher.stop()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def test_test_credentials_given_loaded_entry_should_use_its_pool(self):
+        """Test that the flow validates with the pool of an entry using the token and leaves it open."""
+        pool = async_get_connection_pool(self.hass, "token", "entry")
+
+        await self.flow._test_credentials("token", ["database"])
+
+        assert self.sessions == [pool.session]
+        assert not pool.session.closed
+        assert pool.entry_ids == {"entry"}
+
+    async def test_test_credentials_given_new_token_should_close_the_pool(self):
+        """Test that a pool opened by the flow is closed, with its scheduler, once the flow is done."""
+        await self.flow._test_credentials("token", ["database"])
+
+        [session] = self.sessions
+        assert session.closed
+        assert "token" not in self.hass.data[DATA_CONNECTION_POOLS]
+        assert "token" not in self.hass.data[DATA_SCHEDULERS]
@@ -0,0 +1,176 @@
+"""Test cases for the syncs and the poll schedule of the coordinator."""
+from datetime import datetime, timedelta, timezone
+import tempfile
+import unittest
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from benchmarks.dataset import rich_text, timestamp
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.const import FULL_SYNC_INTERVAL
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.notion_date_helper import parse_timestamp
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+
+DATABASES = 12
+TASKS = 10
+
+
+class TestSync(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the delta and full syncs with the local Notion stand-in."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server and run the first, full sync."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.server = await FakeNotionServer(tasks=TASKS).start()
+        self.session = aiohttp.ClientSession()
+        self.coordinator = NotionDataUpdateCoordinator(self.hass, NotionApiClient(
+            self.server.token,
+            self.server.database_id,
+            self.session,
+            scheduler=NotionRequestScheduler(rate=1000, burst=1000),
+            base_url=self.server.url,
+        ))
+        await self.coordinator.async_refresh()
+        self.watermark = self.coordinator._watermark
+        self.server.queries.clear()
+
+    async def asyncTearDown(self):
+        """Stop the stand-in server."""
+        await self.coordinator.async_shutdown()
+        await self.session.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    def edit(self, uid: str, last_edited_time: str | None = None, **changes) -> None:
+        """Edit a page in Notion, now or at last_edited_time."""
+        page = self.server.pages[uid]
+        page.update(changes)
+        page["last_edited_time"] = last_edited_time or timestamp(datetime.now(timezone.utc))
+
+    def delta_filter(self) -> str | None:
+        """Return the last_edited_time condition of the only query since the setup, None for a full sync."""
+        [query] = self.server.queries
+        query_filter = query.get("filter") or {}
+        conditions = [
+            condition for condition in query_filter.get("and", [query_filter])
+            if condition.get("timestamp") == "last_edited_time"
+        ]
+        return conditions[0]["last_edited_time"]["on_or_after"] if conditions else None
+
+    async def test_first_refresh_should_load_every_task_and_set_the_watermark(self):
+        """Test that the first sync reads every task and remembers the newest edit."""
+        assert len(self.coordinator.data) == TASKS
+        assert self.watermark == max(task.last_edited_time for task in self.coordinator.data.values())
+
+    async def test_delta_sync_given_remote_edit_should_merge_it_and_advance_the_watermark(self):
+        """Test that a poll only asks for pages edited since the watermark and merges them."""
+        uid = next(iter(self.server.pages))
+        self.edit(uid)
+        self.server.pages[uid]["properties"]["Task name"]["title"] = rich_text("edited")
+
+        await self.coordinator.async_refresh()
+
+        assert parse_timestamp(self.delta_filter()) == self.watermark
+        assert self.coordinator.data[uid].title == "edited"
+        assert self.coordinator._watermark == parse_timestamp(self.server.pages[uid]["last_edited_time"])
+        assert len(self.coordinator.data) == TASKS
+
+    async def test_delta_sync_given_edit_in_the_watermark_minute_should_fetch_it(self):
+        """Test that a page edited in the minute of the watermark is not missed."""
+        uid = next(uid for uid, task in self.coordinator.data.items() if task.last_edited_time < self.watermark)
+        self.edit(uid, timestamp(self.watermark))
+        self.server.pages[uid]["properties"]["Task name"]["title"] = rich_text("same minute")
+
+        await self.coordinator.async_refresh()
+
+        assert self.coordinator.data[uid].title == "same minute"
+        assert self.coordinator._watermark == self.watermark
+
+    async def test_refresh_pages_given_archived_or_trashed_page_should_remove_it(self):
+        """Test that pages read one by one, e.g. when pushed, are removed once archived or trashed.
+
+        Queries do not return such pages, so delta syncs leave them to the
+        next full sync.
+        """
+        archived, trashed = list(self.server.pages)[:2]
+        self.edit(archived, archived=True)
+        self.edit(trashed, in_trash=True)
+
+        await self.coordinator.async_refresh_pages({archived, trashed})
+
+        assert archived not in self.coordinator.data and trashed not in self.coordinator.data
+        assert len(self.coordinator.data) == TASKS - 2
+
+    async def test_full_sync_given_deleted_page_should_remove_it_once_due(self):
+        """Test that a deletion, invisible to delta syncs, is reconciled by the next full sync."""
+        uid = next(iter(self.server.pages))
+        del self.server.pages[uid]
+
+        await self.coordinator.async_refresh()
+        assert self.delta_filter() is not None
+        assert uid in self.coordinator.data
+
+        self.server.queries.clear()
+        self.coordinator._last_full_sync -= FULL_SYNC_INTERVAL
+        await self.coordinator.async_refresh()
+
+        assert self.delta_filter() is None
+        assert uid not in self.coordinator.data
+        assert len(self.coordinator.data) == TASKS - 1
+
+
+class TestPollSchedule(unittest.IsolatedAsyncioTestCase):
+    """Test cases for staggering the polls of databases sharing a token."""
+
+    async def asyncSetUp(self):
+        """Build coordinators of databases sharing a scheduler."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.session = aiohttp.ClientSession()
+        self.scheduler = NotionRequestScheduler()
+        self.coordinators = [self.coordinator(f"database-{index}") for index in range(DATABASES)]
+
+    async def asyncTearDown(self):
+        """Close the session."""
+        await self.session.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    def coordinator(self, database_id: str) -> NotionDataUpdateCoordinator:
+        """Build the coordinator of a database polled with the shared scheduler."""
+        return NotionDataUpdateCoordinator(
+            self.hass, NotionApiClient("token", database_id, self.session, scheduler=self.scheduler)
+        )
+
+    def next_polls(self, interval: timedelta) -> list[float]:
+        """Reschedule every coordinator with the interval and return the seconds of their next polls within it."""
+        now = self.hass.loop.time()
+        polls = []
+        for coordinator in self.coordinators:
+            coordinator._set_update_interval(interval)
+            assert interval / 2 <= coordinator.update_interval <= interval * 1.5
+            polls.append((now + coordinator.update_interval.total_seconds()) % interval.total_seconds())
+        return sorted(polls)
+
+    def test_set_update_interval_should_spread_the_polls_over_every_interval(self):
+        """Test that the polls are spread evenly however often the interval changes."""
+        for interval in (timedelta(minutes=5), timedelta(seconds=30), timedelta(seconds=60), timedelta(seconds=45)):
+            polls = self.next_polls(interval)
+
+            gaps = [later - earlier for earlier, later in zip(polls, polls[1:] + [polls[0] + interval.total_seconds()])]
+            for gap in gaps:
+                self.assertAlmostEqual(gap, interval.total_seconds() / DATABASES, places=2, msg=interval)
+
+    async def test_shutdown_should_release_the_poll_slot(self):
+        """Test that the slot of a removed database is reused by the next database."""
+        removed = self.coordinators.pop(3)
+        await removed.async_shutdown()
+        self.coordinators.append(self.coordinator("added"))
+
+        assert self.coordinators[-1]._poll_slot == removed._poll_slot
+        assert len(set(self.next_polls(timedelta(seconds=30)))) == DATABASES
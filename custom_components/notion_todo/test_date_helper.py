@@ -0,0 +1,70 @@
+"""Test cases for parsing Notion dates and timestamps."""
+from datetime import date, datetime, timedelta, timezone
+import unittest
+from zoneinfo import ZoneInfo
+
+from custom_components.notion_todo.notion_date_helper import format_date, parse_date, parse_timestamp
+
+EDITED = datetime(2024, 3, 5, 14, 30, tzinfo=timezone.utc)
+
+
+class TestParseTimestamp(unittest.TestCase):
+    """Test cases for parse_timestamp."""
+
+    def test_parse_timestamp_given_z_suffix_should_be_utc(self):
+        """Test the format Notion sends created_time and last_edited_time in."""
+        assert parse_timestamp("2024-03-05T14:30:00.000Z") == EDITED
+        assert parse_timestamp("2024-03-05T14:30:00.000Z").utcoffset() == timedelta()
+
+    def test_parse_timestamp_given_utc_offset_should_equal_z_suffix(self):
+        """Test that +00:00 and Z are the same instant."""
+        assert parse_timestamp("2024-03-05T14:30:00.000+00:00") == parse_timestamp("2024-03-05T14:30:00.000Z")
+
+    def test_parse_timestamp_given_no_fractional_seconds_should_parse(self):
+        """Test timestamps without milliseconds, e.g. written back by the coordinator."""
+        assert parse_timestamp("2024-03-05T14:30:00Z") == EDITED
+        assert parse_timestamp("2024-03-05T14:30Z") == EDITED
+
+    def test_parse_timestamp_given_no_offset_should_be_utc(self):
+        """Test that a naive timestamp is read as UTC."""
+        assert parse_timestamp("2024-03-05T14:30:00") == EDITED
+
+
+class TestParseDate(unittest.TestCase):
+    """Test cases for parse_date and format_date."""
+
+    def test_parse_date_given_date_only_should_return_a_date(self):
+        """Test that a due date without a time is a date, whatever the time zone."""
+        assert parse_date("2024-03-05") == date(2024, 3, 5)
+        assert parse_date("2024-03-05", "Europe/Berlin") == date(2024, 3, 5)
+
+    def test_parse_date_given_offset_should_ignore_the_time_zone(self):
+        """Test that the offset of a value wins over the time_zone of the property."""
+        due = parse_date("2024-03-05T15:30:00.000+01:00", "America/New_York")
+
+        assert due == EDITED
+        assert due.utcoffset() == timedelta(hours=1)
+        assert parse_date("2024-03-05T14:30:00.000Z", "Europe/Berlin") == EDITED
+
+    def test_parse_date_given_no_offset_should_read_it_in_the_time_zone(self):
+        """Test that a value without an offset is read in the time_zone of the property."""
+        due = parse_date("2024-03-05T15:30:00.000", "Europe/Berlin")
+
+        assert due == EDITED
+        assert due.tzinfo == ZoneInfo("Europe/Berlin")
+
+    def test_parse_date_given_no_offset_and_time_zone_should_be_utc(self):
+        """Test that a value without an offset or time_zone is read as UTC."""
+        assert parse_date("2024-03-05T14:30:00") == EDITED
+        assert parse_date("2024-03-05T14:30:00", "") == EDITED
+
+    def test_parse_date_given_unknown_time_zone_should_be_utc(self):
+        """Test that an unknown time_zone falls back to UTC."""
+        with self.assertLogs(level="WARNING"):
+            assert parse_date("2024-03-05T14:30:00", "Mars/Olympus_Mons") == EDITED
+
+    def test_format_date_should_round_trip(self):
+        """Test that formatted dates and datetimes parse back to the same value."""
+        for value in (date(2024, 3, 5), EDITED, EDITED.astimezone(ZoneInfo("Europe/Berlin"))):
+            assert parse_date(format_date(value)) == value
+        assert format_date("2024-03-05") == "2024-03-05"
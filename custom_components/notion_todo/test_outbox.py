@@ -0,0 +1,158 @@
+"""Test cases for queuing writes while Notion is unreachable."""
+from datetime import datetime, timedelta, timezone
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+from homeassistant.components import todo
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry, entity, entity_registry, issue_registry
+
+from benchmarks.dataset import rich_text
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.outbox import NotionOutbox
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+from custom_components.notion_todo.store import NotionSnapshotStore
+from custom_components.notion_todo.todo import NotionTodoListEntity
+
+DONE = "done"
+NOT_STARTED = "not-started"
+IN_PROGRESS = "in-progress"
+
+
+def values(title=None, status=None):
+    """Build the values of an update like the todo entity does."""
+    return {"title": title, "status": status, "due": None, "description": None}
+
+
+class TestOutbox(unittest.IsolatedAsyncioTestCase):
+    """Test cases for NotionOutbox with the local Notion stand-in."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server and a coordinator with an outbox."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.server = await FakeNotionServer(tasks=5).start()
+        self.session = aiohttp.ClientSession()
+        client = NotionApiClient(
+            self.server.token,
+            self.server.database_id,
+            self.session,
+            scheduler=NotionRequestScheduler(rate=1000, burst=1000),
+            base_url=self.server.url,
+        )
+        self.coordinator = NotionDataUpdateCoordinator(self.hass, client, outbox=NotionOutbox(self.hass, "test"))
+        await self.coordinator.async_restore()
+        await self.coordinator.async_refresh()
+        self.ids = list(self.coordinator.data)
+        # Give up on the unavailable server without waiting for the backoff.
+        self.backoff = patch("custom_components.notion_todo.api.RETRY_BACKOFF", 0)
+        self.backoff.start()
+
+    async def asyncTearDown(self):
+        """Stop the stand-in server."""
+        self.backoff.stop()
+        await self.coordinator.async_shutdown()
+        await self.session.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def async_add_entity(self, coordinator: NotionDataUpdateCoordinator) -> NotionTodoListEntity:
+        """Set up the todo services and add a list entity of the coordinator."""
+        entity.async_setup(self.hass)
+        await device_registry.async_load(self.hass)
+        await entity_registry.async_load(self.hass)
+        await issue_registry.async_load(self.hass)
+        with patch.object(todo.frontend, "async_register_built_in_panel"):
+            await todo.async_setup(self.hass, {})
+        todo_list = NotionTodoListEntity(coordinator, "test", "Notion")
+        await self.hass.data[todo.DOMAIN].async_add_entities([todo_list])
+        return todo_list
+
+    async def test_todo_services_given_outage_should_queue_and_replay_writes(self):
+        """Test that the list stays available during an outage and its edits reach Notion afterwards."""
+        todo_list = await self.async_add_entity(self.coordinator)
+        uid = next(uid for uid, task in self.coordinator.data.items() if task.status in (NOT_STARTED, IN_PROGRESS))
+        self.server.unavailable = True
+        await self.coordinator.async_refresh()
+
+        assert not self.coordinator.last_update_success
+        assert todo_list.available
+        await self.hass.services.async_call(
+            todo.DOMAIN, "add_item", {"item": "offline"}, target={"entity_id": todo_list.entity_id}, blocking=True
+        )
+        await self.hass.services.async_call(
+            todo.DOMAIN, "update_item", {"item": uid, "status": "completed"},
+            target={"entity_id": todo_list.entity_id}, blocking=True
+        )
+        assert self.coordinator.diagnostics["queued_writes"] == 2
+        assert "offline" in [item.summary for item in todo_list.todo_items]
+        assert not self.coordinator.last_update_success
+
+        self.server.unavailable = False
+        await self.coordinator.async_refresh()
+        await self.coordinator.async_replay_writes()
+
+        assert self.coordinator.diagnostics["queued_writes"] == 0
+        assert "offline" in [task.title for task in self.coordinator.data.values() if not task.id.startswith("local-")]
+        assert self.coordinator.data[uid].status == DONE
+
+    async def test_restore_given_unreachable_notion_should_keep_restored_tasks_available(self):
+        """Test that the restored tasks stay available if the first refresh after a restart fails."""
+        store = NotionSnapshotStore(self.hass, "test")
+        coordinator = NotionDataUpdateCoordinator(self.hass, self.coordinator.client, store=store)
+        await coordinator.async_refresh()
+        self.server.unavailable = True
+
+        restarted = NotionDataUpdateCoordinator(
+            self.hass, self.coordinator.client, store=store, outbox=NotionOutbox(self.hass, "restarted")
+        )
+        assert await restarted.async_restore()
+        todo_list = await self.async_add_entity(restarted)
+        await restarted.async_refresh()
+
+        assert not restarted.last_update_success
+        assert todo_list.available
+        assert [item.uid for item in todo_list.todo_items] == self.ids
+
+    async def test_writes_given_outage_should_show_and_persist_them(self):
+        """Test that writes during an outage are shown right away and saved."""
+        self.server.unavailable = True
+
+        await self.coordinator.async_update_task(self.ids[0], values("first", DONE))
+        await self.coordinator.async_update_task(self.ids[0], values("second"))
+        await self.coordinator.async_delete_task(self.ids[1])
+        await self.coordinator.async_create_task("created", NOT_STARTED)
+
+        data = self.coordinator.data
+        assert (data[self.ids[0]].title, data[self.ids[0]].status) == ("second", DONE)
+        assert self.ids[1] not in data
+        assert [task.title for uid, task in data.items() if uid.startswith("local-")] == ["created"]
+        restored = NotionOutbox(self.hass, "test")
+        await restored.async_load()
+        assert len(restored) == 3
+
+    async def test_replay_should_send_coalesced_writes_and_keep_remote_edits(self):
+        """Test that queued writes are sent once Notion is back, without overwriting edits made in Notion."""
+        self.server.unavailable = True
+        await self.coordinator.async_update_task(self.ids[0], values("first", DONE))
+        await self.coordinator.async_update_task(self.ids[0], values("second"))
+        await self.coordinator.async_update_task(self.ids[2], values("local", DONE))
+        self.server.unavailable = False
+        self.server.requests.clear()
+        page = self.server.pages[self.ids[2]]
+        page["properties"]["Task name"]["title"] = rich_text("remote")
+        page["last_edited_time"] = (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()
+
+        await self.coordinator.async_refresh()
+        await self.coordinator.async_replay_writes()
+
+        data = self.coordinator.data
+        assert (data[self.ids[0]].title, data[self.ids[0]].status) == ("second", DONE)
+        assert (data[self.ids[2]].title, data[self.ids[2]].status) == ("remote", DONE)
+        assert self.server.requests["PATCH /v1/pages/{id}"] == 2
+        assert self.coordinator.diagnostics["queued_writes"] == 0
@@ -0,0 +1,75 @@
+"""Test cases for the partitioned full sync."""
+from datetime import datetime, timedelta, timezone
+import tempfile
+import unittest
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.const import CONF_PARTITIONS, CONF_SORT_BY_DUE
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.partitions import in_range, quantile_bounds, range_conditions
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+
+TASKS = 25
+
+
+class TestPartitions(unittest.IsolatedAsyncioTestCase):
+    """Test cases for fetching a full sync in created_time partitions."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.server = await FakeNotionServer(tasks=TASKS).start()
+        self.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        """Stop the stand-in server."""
+        await self.session.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    def coordinator(self, **options) -> NotionDataUpdateCoordinator:
+        """Build a coordinator with the options for the stand-in server."""
+        client = NotionApiClient(
+            self.server.token,
+            self.server.database_id,
+            self.session,
+            scheduler=NotionRequestScheduler(rate=1000, burst=1000),
+            base_url=self.server.url,
+        )
+        return NotionDataUpdateCoordinator(self.hass, client, options=options, incremental=False)
+
+    def test_range_conditions_should_cover_every_time_once(self):
+        """Test that every created_time falls into exactly one range."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        created_times = [(start + timedelta(minutes=minute)).isoformat() for minute in (0, 0, 1, 5, 5, 5, 9)]
+        ranges = range_conditions(quantile_bounds(created_times, 3))
+
+        for minute in range(-1, 11):
+            matches = [in_range(start + timedelta(minutes=minute), conditions) for conditions in ranges]
+            assert matches.count(True) == 1, minute
+
+    def test_quantile_bounds_given_no_pages_should_return_no_bounds(self):
+        """Test that an empty database is fetched as a single range."""
+        assert quantile_bounds([], 4) == []
+        assert range_conditions(quantile_bounds([], 4)) == [[]]
+
+    async def test_full_sync_given_partitions_should_return_every_task_once(self):
+        """Test that the partitions together return the tasks of a sequential full sync."""
+        sequential = self.coordinator(**{CONF_SORT_BY_DUE: True})
+        partitioned = self.coordinator(**{CONF_SORT_BY_DUE: True, CONF_PARTITIONS: 4})
+
+        expected = await sequential._async_update_data()
+        with self.assertNoLogs("custom_components.notion_todo", level="WARNING"):
+            # The first full sync splits the time evenly, the second by the tasks seen.
+            first = await partitioned._async_update_data()
+            second = await partitioned._async_update_data()
+
+        assert len(expected) == TASKS
+        assert list(first.keys()) == list(second.keys()) == list(expected.keys())
+        assert [task.due for task in second.values()] == [task.due for task in expected.values()]
@@ -0,0 +1,58 @@
+"""Test cases for the adaptive poll interval."""
+from datetime import timedelta
+import unittest
+
+from custom_components.notion_todo.const import POLL_RATE_SHARE
+from custom_components.notion_todo.polling import AdaptivePollInterval
+
+MINIMUM = timedelta(seconds=30)
+MAXIMUM = timedelta(minutes=30)
+RATE = 3.0
+
+
+class TestAdaptivePollInterval(unittest.TestCase):
+    """Test cases for AdaptivePollInterval."""
+
+    def setUp(self):
+        """Build an interval starting at five minutes."""
+        self.interval = AdaptivePollInterval(MINIMUM, MAXIMUM, RATE, initial=timedelta(minutes=5))
+
+    def test_record_poll_given_idle_polls_should_double_up_to_the_maximum(self):
+        """Test that every idle poll doubles the interval until it reaches the maximum."""
+        intervals = [self.interval.record_poll(changes=0, requests=1) for _ in range(5)]
+
+        assert intervals == [timedelta(minutes=10), timedelta(minutes=20), MAXIMUM, MAXIMUM, MAXIMUM]
+
+    def test_record_poll_given_changes_should_reset_to_the_minimum(self):
+        """Test that a poll with changes drops the interval to the minimum, and idle polls back off again."""
+        self.interval.record_poll(changes=0, requests=1)
+
+        assert self.interval.record_poll(changes=2, requests=1) == MINIMUM
+        assert self.interval.record_poll(changes=0, requests=1) == MINIMUM * 2
+
+    def test_record_activity_should_reset_to_the_minimum(self):
+        """Test that a local write drops the interval to the minimum."""
+        self.interval.record_poll(changes=0, requests=1)
+
+        assert self.interval.record_activity() == MINIMUM
+        assert self.interval.interval == MINIMUM
+
+    def test_init_should_clamp_to_the_bounds(self):
+        """Test that the initial interval and a maximum below the minimum are clamped."""
+        assert AdaptivePollInterval(MINIMUM, MAXIMUM, RATE, initial=timedelta(seconds=1)).interval == MINIMUM
+        assert AdaptivePollInterval(MINIMUM, MAXIMUM, RATE, initial=timedelta(days=1)).interval == MAXIMUM
+
+        inverted = AdaptivePollInterval(MAXIMUM, MINIMUM, RATE)
+        assert inverted.maximum == inverted.minimum == MAXIMUM
+        assert inverted.record_poll(changes=0, requests=1) == MAXIMUM
+
+    def test_record_poll_given_costly_poll_should_not_go_below_the_rate_limit_floor(self):
+        """Test that polls needing many requests keep to a share of the rate limit, even after changes."""
+        requests = 60
+        floor = timedelta(seconds=requests / (RATE * POLL_RATE_SHARE))
+
+        assert self.interval.record_poll(changes=1, requests=requests) == floor
+        assert self.interval.record_activity() == floor
+        assert self.interval.diagnostics["rate_limit_floor"] == floor.total_seconds()
+
+        assert self.interval.record_poll(changes=1, requests=1) == MINIMUM
@@ -0,0 +1,65 @@
+"""Test cases for the conversion between Notion rich text and Markdown."""
+import unittest
+
+from benchmarks.dataset import rich_text
+from custom_components.notion_todo.notion_rich_text import from_markdown, to_markdown, to_plain_text
+
+BOLD = {'bold': True}
+ITALIC = {'italic': True}
+
+
+def annotated(segments: list[dict]) -> list[tuple[str, set[str]]]:
+    """Return the text and the annotations set on each segment built by from_markdown."""
+    return [
+        (segment['text']['content'], {name for name, value in segment.get('annotations', {}).items() if value})
+        for segment in segments
+    ]
+
+
+def round_trip(segments: list[dict]) -> list[tuple[str, set[str]]]:
+    """Render rich text as Markdown and parse it again."""
+    return annotated(from_markdown(to_markdown(segments)))
+
+
+class TestRichText(unittest.TestCase):
+    """Test cases for to_markdown and from_markdown."""
+
+    def test_from_markdown_given_markers_that_cannot_open_or_close_should_keep_them(self):
+        """Test that markers next to whitespace, inside words, empty or unmatched are text."""
+        for text in ["Compute 2 ** 10", "5 * 3 * 2", "sum a*b and c*d", "call ``now``", "**", "****",
+                     "~~ a ~~", "C:\\Users\\me", "[](http://example.com)", "a *b"]:
+            with self.subTest(text=text):
+                assert annotated(from_markdown(text)) == [(text, set())]
+
+    def test_from_markdown_should_nest_emphasis(self):
+        """Test that runs sharing an emphasis are parsed with nested markers."""
+        assert annotated(from_markdown("*a **b***")) == [("a ", {'italic'}), ("b", {'bold', 'italic'})]
+        assert annotated(from_markdown("***a* b**")) == [("a", {'bold', 'italic'}), (" b", {'bold'})]
+        assert annotated(from_markdown("`a*b`, ~~c~~")) == [("a*b", {'code'}), (", ", set()), ("c", {'strikethrough'})]
+
+    def test_to_markdown_given_adjacent_runs_should_nest_markers(self):
+        """Test that neighbouring runs sharing an emphasis round trip."""
+        segments = [*rich_text(" b..", ITALIC), *rich_text("ab", {**ITALIC, **BOLD})]
+
+        assert to_markdown(segments) == " *b..**ab***"
+        assert round_trip(segments) == [(" ", set()), ("b..", {'italic'}), ("ab", {'bold', 'italic'})]
+
+    def test_to_markdown_given_whitespace_at_the_edges_should_leave_it_out_of_the_markers(self):
+        """Test that whitespace is moved out of a run's markers instead of breaking them."""
+        segments = [*rich_text("plain"), *rich_text(" bold ", BOLD), *rich_text("plain")]
+
+        assert to_markdown(segments) == "plain **bold** plain"
+        assert round_trip(segments) == [("plain ", set()), ("bold", {'bold'}), (" plain", set())]
+
+    def test_to_markdown_given_emphasis_inside_a_word_should_keep_the_text(self):
+        """Test that emphasis that cannot change inside a word does not leave markers in the text."""
+        segments = [*rich_text("un", BOLD), *rich_text("done"), *rich_text(" task")]
+
+        assert round_trip(segments) == [("undone", {'bold'}), (" task", set())]
+
+    def test_to_markdown_given_markdown_characters_should_round_trip_the_text(self):
+        """Test that plain text with Markdown characters comes back unchanged."""
+        for text in ["Compute 2 ** 10", "a*b_c ~~d~~", "`x` [y](z) \\", "(****)"]:
+            with self.subTest(text=text):
+                assert to_plain_text({'plain_text': segment['text']['content']}
+                                     for segment in from_markdown(to_markdown(rich_text(text)))) == text
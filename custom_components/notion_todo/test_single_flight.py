@@ -0,0 +1,57 @@
+"""Test cases for the coalescing of concurrent refreshes."""
+import asyncio
+import unittest
+
+from custom_components.notion_todo.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test cases for SingleFlight."""
+
+    async def asyncSetUp(self):
+        """Count the runs of a slow function."""
+        self.started = []
+
+        async def refresh(value):
+            self.started.append(value)
+            await asyncio.sleep(0.01)
+            return len(self.started)
+
+        self.flight = SingleFlight(refresh)
+
+    async def test_call_given_burst_should_run_at_most_twice(self):
+        """Test that calls during a run share one trailing run."""
+        results = await asyncio.gather(*[self.flight(value) for value in range(20)])
+
+        assert self.started == [0, 1]
+        assert results == [1] + [2] * 19
+        assert self.flight.joined == 19
+
+    async def test_call_after_burst_should_run_again(self):
+        """Test that a call after the runs finished starts a new run."""
+        await asyncio.gather(self.flight(0), self.flight(1))
+
+        assert await self.flight(2) == 3
+
+    async def test_call_given_error_should_raise_for_every_caller(self):
+        """Test that the error of a run reaches all callers."""
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+        flight = SingleFlight(fail)
+
+        results = await asyncio.gather(flight(), flight(), flight(), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.runs == 2
+
+    async def test_call_given_cancelled_caller_should_finish_run(self):
+        """Test that cancelling a caller does not cancel the run others wait for."""
+        first = asyncio.ensure_future(self.flight(0))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(self.flight(1))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 2
+        assert self.started == [0, 1]
@@ -0,0 +1,200 @@
+"""Test cases for the todo list entity."""
+import asyncio
+from datetime import datetime, timezone
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+from homeassistant.components import todo
+from homeassistant.components.todo import TodoItem, TodoItemStatus
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry, entity, entity_registry, issue_registry
+
+from benchmarks.dataset import STATUSES, rich_text, timestamp
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import NotionApiClient, NotionApiClientError
+from custom_components.notion_todo.const import CONF_BLOCK_DESCRIPTIONS
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.outbox import LOCAL_ID_PREFIX, NotionOutbox
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+from custom_components.notion_todo.todo import NotionTodoListEntity
+
+IN_PROGRESS = "in-progress"
+NOT_STARTED = "not-started"
+TASKS = 5
+
+
+class TestTodoListEntity(unittest.IsolatedAsyncioTestCase):
+    """Test cases for NotionTodoListEntity with the local Notion stand-in."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server and set up the todo services."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.server = await FakeNotionServer(tasks=TASKS).start()
+        self.session = aiohttp.ClientSession()
+        entity.async_setup(self.hass)
+        await device_registry.async_load(self.hass)
+        await entity_registry.async_load(self.hass)
+        await issue_registry.async_load(self.hass)
+        with patch.object(todo.frontend, "async_register_built_in_panel"):
+            await todo.async_setup(self.hass, {})
+        # Give up on the unavailable server without waiting for the backoff.
+        self.backoff = patch("custom_components.notion_todo.api.RETRY_BACKOFF", 0)
+        self.backoff.start()
+
+    async def asyncTearDown(self):
+        """Stop the stand-in server."""
+        self.backoff.stop()
+        await self.coordinator.async_shutdown()
+        await self.session.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def async_add_entity(self, **options) -> NotionTodoListEntity:
+        """Add a list entity of a coordinator with an outbox and the options."""
+        client = NotionApiClient(
+            self.server.token,
+            self.server.database_id,
+            self.session,
+            scheduler=NotionRequestScheduler(rate=1000, burst=1000),
+            base_url=self.server.url,
+        )
+        self.coordinator = NotionDataUpdateCoordinator(
+            self.hass, client, options=options, outbox=NotionOutbox(self.hass, "test")
+        )
+        await self.coordinator.async_restore()
+        await self.coordinator.async_refresh()
+        todo_list = NotionTodoListEntity(self.coordinator, "test", "Notion")
+        await self.hass.data[todo.DOMAIN].async_add_entities([todo_list])
+        return todo_list
+
+    async def async_block_till_done(self) -> None:
+        """Wait for the tasks and the background tasks, e.g. fetches, to finish."""
+        await self.hass.async_block_till_done()
+        while self.hass._background_tasks:
+            await asyncio.gather(*self.hass._background_tasks)
+            await self.hass.async_block_till_done()
+
+    async def test_descriptions_given_failed_fetches_should_not_fetch_them_again(self):
+        """Test that pages whose content cannot be read are only read again once edited."""
+        todo_list = await self.async_add_entity(**{CONF_BLOCK_DESCRIPTIONS: True})
+        self.server.unavailable = True
+        await self.coordinator.async_create_task("offline", NOT_STARTED)
+
+        with patch.object(self.coordinator.client, "async_get_blocks",
+                          wraps=self.coordinator.client.async_get_blocks) as get_blocks:
+            todo_list.async_subscribe_updates(lambda items: None)
+            await self.async_block_till_done()
+            self.coordinator.async_update_listeners()
+            await self.async_block_till_done()
+
+            fetched = [call.args[0] for call in get_blocks.call_args_list]
+            assert sorted(fetched) == sorted(uid for uid in self.coordinator.data if not uid.startswith(LOCAL_ID_PREFIX))
+
+            self.server.unavailable = False
+            uid = fetched[0]
+            self.server.blocks[uid] = [{'type': 'paragraph', 'paragraph': {'rich_text': rich_text("content")}}]
+            self.server.pages[uid]["last_edited_time"] = timestamp(datetime.now(timezone.utc))
+            get_blocks.reset_mock()
+            await self.coordinator.async_refresh()
+            await self.async_block_till_done()
+
+        # The replayed create is read as well, the other failed pages are not.
+        refetched = {call.args[0] for call in get_blocks.call_args_list}
+        assert uid in refetched and not refetched & set(fetched[1:])
+        assert {item.uid: item.description for item in todo_list.todo_items}[uid] == "content"
+
+    async def test_coordinator_update_given_no_changes_should_not_write_the_state(self):
+        """Test that a poll without changes keeps the items and writes no state, and a change rebuilds one item."""
+        todo_list = await self.async_add_entity()
+        items = todo_list.todo_items
+
+        with patch.object(todo_list, "async_write_ha_state", wraps=todo_list.async_write_ha_state) as write:
+            await self.coordinator.async_refresh()
+            await self.coordinator.async_refresh()
+            assert write.call_count == 0
+            assert todo_list.todo_items is items
+
+            uid = items[0].uid
+            self.server.pages[uid]["properties"]["Task name"]["title"] = rich_text("edited")
+            self.server.pages[uid]["last_edited_time"] = timestamp(datetime.now(timezone.utc))
+            await self.coordinator.async_refresh()
+
+        assert write.call_count == 1
+        assert todo_list.todo_items[0].summary == "edited"
+        assert all(new is old for new, old in zip(todo_list.todo_items[1:], items[1:]))
+
+    def shown(self, todo_list: NotionTodoListEntity) -> dict[str, str]:
+        """Return the summaries of the items shown by the list."""
+        return {item.uid: item.summary for item in todo_list.todo_items}
+
+    async def test_update_given_returned_page_should_merge_it(self):
+        """Test that the page Notion returns for an update replaces the item, keeping an in progress status."""
+        todo_list = await self.async_add_entity()
+        uid, *others = self.coordinator.data
+        page = self.server.pages[uid]
+        page["properties"]["Status"]["status"] = {"id": IN_PROGRESS, "name": STATUSES[IN_PROGRESS], "color": "default"}
+        page["last_edited_time"] = timestamp(datetime.now(timezone.utc))
+        await self.coordinator.async_refresh()
+        items = {item.uid: item for item in todo_list.todo_items}
+
+        await todo_list.async_update_todo_item(TodoItem(
+            uid=uid, summary="updated", status=TodoItemStatus.NEEDS_ACTION
+        ))
+
+        assert page["properties"]["Status"]["status"]["id"] == IN_PROGRESS
+        assert self.coordinator.data[uid].title == "updated"
+        assert self.coordinator.data[uid].status == IN_PROGRESS
+        assert self.shown(todo_list)[uid] == "updated"
+        assert all(item is items[item.uid] for item in todo_list.todo_items if item.uid in others)
+
+    async def test_update_given_failure_should_only_roll_back_the_item(self):
+        """Test that a failed update restores its item and keeps an update finished meanwhile."""
+        todo_list = await self.async_add_entity()
+        failing, updated = list(self.coordinator.data)[:2]
+        titles = self.shown(todo_list)
+        update_task = self.coordinator.async_update_task
+        release = asyncio.Event()
+
+        async def async_update_task(uid, values):
+            if uid == failing:
+                await release.wait()
+                raise NotionApiClientError("rejected")
+            await update_task(uid, values)
+
+        with patch.object(self.coordinator, "async_update_task", side_effect=async_update_task):
+            failed = asyncio.create_task(todo_list.async_update_todo_item(TodoItem(
+                uid=failing, summary="failed", status=TodoItemStatus.NEEDS_ACTION
+            )))
+            await asyncio.sleep(0)
+            assert self.shown(todo_list)[failing] == "failed"
+            await todo_list.async_update_todo_item(TodoItem(
+                uid=updated, summary="updated", status=TodoItemStatus.NEEDS_ACTION
+            ))
+            release.set()
+            with self.assertRaises(NotionApiClientError):
+                await failed
+
+        assert self.shown(todo_list) == {**titles, updated: "updated"}
+
+    async def test_delete_given_partial_failure_should_only_restore_the_failed_items(self):
+        """Test that a delete restores the items it failed to delete, in their place, and raises."""
+        todo_list = await self.async_add_entity()
+        failing, deleted = list(self.coordinator.data)[1:3]
+        titles = self.shown(todo_list)
+        delete_task = self.coordinator.async_delete_task
+
+        async def async_delete_task(uid):
+            if uid == failing:
+                raise NotionApiClientError("rejected")
+            await delete_task(uid)
+
+        with (patch.object(self.coordinator, "async_delete_task", side_effect=async_delete_task),
+              self.assertRaises(NotionApiClientError)):
+            await todo_list.async_delete_todo_items([failing, deleted])
+
+        assert deleted not in self.coordinator.data and self.server.pages[deleted]["archived"]
+        assert list(self.shown(todo_list).items()) == [(uid, title) for uid, title in titles.items() if uid != deleted]
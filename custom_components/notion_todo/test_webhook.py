@@ -0,0 +1,220 @@
+"""Test cases for the webhook receiving change notifications."""
+import asyncio
+import hashlib
+import hmac
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from homeassistant import loader
+from homeassistant.components import persistent_notification, webhook
+from homeassistant.config_entries import ConfigEntries, ConfigEntry, ConfigEntryState
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry, entity, entity_registry, issue_registry, translation
+
+from benchmarks.dataset import rich_text
+from benchmarks.fake_notion_server import FakeNotionServer
+from custom_components.notion_todo.api import NotionApiClient
+from custom_components.notion_todo.const import CONF_DATABASES, CONF_PUSH, CONF_VERIFICATION_TOKEN, DOMAIN
+from custom_components.notion_todo.coordinator import NotionDataUpdateCoordinator
+from custom_components.notion_todo.scheduler import NotionRequestScheduler
+from custom_components.notion_todo.webhook import async_handle_webhook, parse_notification
+
+WEBHOOK_ID = "webhook"
+VERIFICATION_TOKEN = "verification"
+PAGE_ID = "00000001-0000-0000-0000-000000000000"
+PARENT_ID = "11111111-2222-3333-4444-555555555555"
+DATABASE_ID = "66666666-7777-8888-9999-000000000000"
+
+
+def sign(body: bytes, token: str = VERIFICATION_TOKEN) -> dict:
+    """Build the signature header Notion sends with a request."""
+    return {"X-Notion-Signature": "sha256=" + hmac.new(token.encode(), body, hashlib.sha256).hexdigest()}
+
+
+class TestParseNotification(unittest.TestCase):
+    """Test cases for parse_notification."""
+
+    def test_parse_notification_given_notion_event_should_return_page_and_database(self):
+        """Test that a page event names the page and its parent database."""
+        notification = parse_notification({
+            "type": "page.properties_updated",
+            "entity": {"id": PAGE_ID.replace("-", ""), "type": "page"},
+            "data": {"parent": {"id": PARENT_ID, "type": "database"}},
+        })
+
+        assert notification.page_ids == {PAGE_ID}
+        assert notification.database_id == PARENT_ID
+        assert not notification.schema_changed
+
+    def test_parse_notification_given_database_event_should_report_schema_change(self):
+        """Test that a database event asks for the schema to be fetched again."""
+        notification = parse_notification({"entity": {"id": PARENT_ID, "type": "database"}})
+
+        assert notification.database_id == PARENT_ID
+        assert notification.schema_changed
+
+    def test_parse_notification_given_invalid_payload_should_raise(self):
+        """Test that payloads naming no valid pages are rejected."""
+        for payload, error in [([], TypeError), ({"page_ids": "x"}, TypeError), ({"page_ids": ["x"]}, ValueError)]:
+            with self.subTest(payload=payload), self.assertRaises(error):
+                parse_notification(payload)
+
+
+class TestWebhook(unittest.IsolatedAsyncioTestCase):
+    """Test cases for posting notifications to the webhook."""
+
+    async def asyncSetUp(self):
+        """Start the stand-in server, an entry with two databases and the webhook."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        self.hass.config_entries = ConfigEntries(self.hass, {})
+        self.entry = ConfigEntry(
+            version=1, minor_version=1, domain=DOMAIN, title="Notion", source="user",
+            data={CONF_WEBHOOK_ID: WEBHOOK_ID}, options={CONF_VERIFICATION_TOKEN: VERIFICATION_TOKEN},
+        )
+        self.hass.config_entries._entries[self.entry.entry_id] = self.entry
+        self.server = await FakeNotionServer(tasks=3, database_id=DATABASE_ID).start()
+        self.session = aiohttp.ClientSession()
+        scheduler = NotionRequestScheduler(rate=1000, burst=1000)
+        self.coordinators = {
+            database_id: NotionDataUpdateCoordinator(self.hass, NotionApiClient(
+                self.server.token, database_id, self.session, scheduler=scheduler, base_url=self.server.url
+            ))
+            for database_id in (self.server.database_id, "other")
+        }
+        self.coordinator = self.coordinators[self.server.database_id]
+        await self.coordinator.async_refresh()
+        self.hass.data[DOMAIN] = {self.entry.entry_id: self.coordinators}
+
+        async def handle(request: web.Request) -> web.Response:
+            return await async_handle_webhook(self.hass, request.match_info["webhook_id"], request)
+
+        app = web.Application()
+        app.router.add_post("/api/webhook/{webhook_id}", handle)
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        """Stop the webhook and the stand-in server."""
+        await self.client.close()
+        for coordinator in self.coordinators.values():
+            await coordinator.async_shutdown()
+        await self.session.close()
+        await self.server.close()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def post(self, payload: dict, headers: dict | None = None) -> int:
+        """Post a payload to the webhook and return the status."""
+        body = json.dumps(payload).encode()
+        response = await self.client.post(f"/api/webhook/{WEBHOOK_ID}", data=body, headers=headers or sign(body))
+        return response.status
+
+    async def test_webhook_given_signed_payload_should_push_the_pages(self):
+        """Test that a signed notification reaches the coordinator of its database."""
+        payload = {"page_ids": [PAGE_ID], "database_id": self.server.database_id}
+        with patch.object(self.coordinator, "async_push") as push, \
+                patch.object(self.coordinators["other"], "async_push") as other:
+            assert await self.post(payload) == 200
+
+        push.assert_called_once_with({PAGE_ID})
+        other.assert_not_called()
+
+    async def test_webhook_given_verification_token_should_notify_without_logging_it(self):
+        """Test that the verification token is shown in a notification and kept out of the log."""
+        with self.assertLogs("custom_components.notion_todo", level="DEBUG") as logs, \
+                patch.object(persistent_notification, "async_create") as notify:
+            assert await self.post({"verification_token": "secret"}, {}) == 200
+
+        assert not any("secret" in line for line in logs.output)
+        notify.assert_called_once()
+        assert "secret" in notify.call_args.args[1]
+
+    async def test_webhook_given_bad_or_missing_signature_should_reject_it(self):
+        """Test that requests not signed with the verification token are rejected."""
+        body = json.dumps({"page_ids": [PAGE_ID]}).encode()
+        with patch.object(self.coordinator, "async_push") as push:
+            assert await self.post({"page_ids": [PAGE_ID]}, sign(body, "wrong")) == 401
+            assert await self.post({"page_ids": [PAGE_ID]}, {"X-Other": "header"}) == 401
+
+        push.assert_not_called()
+
+    async def test_webhook_given_unknown_database_should_ignore_it(self):
+        """Test that a notification for a database of no coordinator is ignored."""
+        payload = {"page_ids": [PAGE_ID], "database_id": PARENT_ID}
+        with patch.object(self.coordinator, "async_push") as push, \
+                patch.object(self.coordinators["other"], "async_push") as other:
+            assert await self.post(payload) == 200
+
+        push.assert_not_called()
+        other.assert_not_called()
+
+    async def test_webhook_given_no_database_should_fetch_the_pages_once(self):
+        """Test that pages of an unknown database are fetched once for all databases."""
+        self.server.pages[PAGE_ID]["properties"]["Task name"]["title"] = rich_text("pushed")
+        self.server.requests.clear()
+
+        assert await self.post({"page_ids": [PAGE_ID]}) == 200
+        await asyncio.gather(*self.entry._background_tasks)
+
+        assert self.server.requests["GET /v1/pages/{id}"] == 1
+        assert self.coordinator.data[PAGE_ID].title == "pushed"
+        assert self.coordinators["other"].data is None
+
+
+class TestReload(unittest.IsolatedAsyncioTestCase):
+    """Test cases for reloading an entry with push enabled."""
+
+    async def asyncSetUp(self):
+        """Set up Home Assistant with the integration loader and its dependencies."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.hass = HomeAssistant(self.config_dir.name)
+        loader.async_setup(self.hass)
+        translation.async_setup(self.hass)
+        entity.async_setup(self.hass)
+        await device_registry.async_load(self.hass)
+        await entity_registry.async_load(self.hass)
+        await issue_registry.async_load(self.hass)
+        self.hass.config.components.update({"http", "webhook"})
+        self.hass.config_entries = ConfigEntries(self.hass, {})
+        await self.hass.config_entries.async_initialize()
+        # No Notion is reached, the lists stay empty.
+        self.update = patch(
+            "custom_components.notion_todo.coordinator.NotionDataUpdateCoordinator._async_update_data",
+            return_value={},
+        )
+        self.update.start()
+
+    async def asyncTearDown(self):
+        """Stop Home Assistant."""
+        self.update.stop()
+        await self.hass.async_stop(force=True)
+        self.config_dir.cleanup()
+
+    async def test_reload_given_push_should_register_the_webhook_again(self):
+        """Test that changing the options of an entry with push reloads it with its webhook."""
+        entry = ConfigEntry(
+            version=1, minor_version=1, domain=DOMAIN, title="Notion", source="user",
+            data={CONF_ACCESS_TOKEN: "token", CONF_DATABASES: {DATABASE_ID: "Tasks"}}, options={CONF_PUSH: True},
+        )
+        await self.hass.config_entries.async_add(entry)
+        await self.hass.async_block_till_done()
+
+        self.hass.config_entries.async_update_entry(
+            entry, options={CONF_PUSH: True, CONF_VERIFICATION_TOKEN: VERIFICATION_TOKEN}
+        )
+        await self.hass.async_block_till_done()
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert list(self.hass.data[webhook.DOMAIN]) == [entry.data[CONF_WEBHOOK_ID]]
+        assert self.hass.states.get("todo.tasks") is not None
+        assert len(entry.update_listeners) == 1
+
+        await self.hass.config_entries.async_unload(entry.entry_id)
+        assert not self.hass.data[webhook.DOMAIN]
@@ -1,6 +1,8 @@
 """A todo platform for Notion."""
 
 import asyncio
+from collections.abc import Callable
+from time import perf_counter
 from typing import cast
 
 from homeassistant.components.todo import (
@@ -14,25 +16,29 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, TASK_STATUS_PROPERTY, TASK_DESCRIPTION_PROPERTY, TASK_DATE_PROPERTY
+from .const import (
+    DOMAIN,
+    STATUS_ARCHIVED,
+    STATUS_DONE,
+    STATUS_IN_PROGRESS,
+    STATUS_NOT_STARTED,
+)
 from .coordinator import NotionDataUpdateCoordinator
-from .notion_property_helper import NotionPropertyHelper as propHelper
+from .models import NotionTask
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the todo platform config entry."""
-    coordinator: NotionDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = ['Notion']
+    coordinators: dict[str, NotionDataUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id]
     async_add_entities(
-        NotionTodoListEntity(coordinator, e)
-        for e in entities
+        NotionTodoListEntity(coordinator, f"{entry.entry_id}-{database_id}", coordinator.title)
+        if coordinator.title
+        # Entries with a single untitled database keep their original entity.
+        else NotionTodoListEntity(coordinator, 'Notion-Notion', 'Notion')
+        for database_id, coordinator in coordinators.items()
     )
 
-STATUS_IN_PROGRESS = 'in-progress'
-STATUS_ARCHIVED = 'archived'
-STATUS_DONE = 'done'
-STATUS_NOT_STARTED = 'not-started'
 NOTION_TO_HASS_STATUS = {
     STATUS_NOT_STARTED: TodoItemStatus.NEEDS_ACTION,
     STATUS_IN_PROGRESS: TodoItemStatus.NEEDS_ACTION,
@@ -59,68 +65,198 @@ class NotionTodoListEntity(CoordinatorEntity[NotionDataUpdateCoordinator], TodoL
     def __init__(
         self,
         coordinator: NotionDataUpdateCoordinator,
-        user: str,
+        unique_id: str,
+        name: str,
     ) -> None:
         """Initialize TodoListEntity."""
         super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{user}-{user}"
-        self._attr_name = user
-        self._status = {}
+        self._attr_unique_id = unique_id
+        self._attr_name = name
+        self._items: dict[str, tuple[NotionTask, TodoItem]] = {}
+        self._available: bool | None = None
+        self._fetching_descriptions = False
+        self._update_listeners = _UpdateListeners(self._async_fetch_missing_descriptions)
+        if coordinator.block_descriptions:
+            # The content of a page is not written back.
+            self._attr_supported_features &= ~TodoListEntityFeature.SET_DESCRIPTION_ON_ITEM
+
+    @property
+    def available(self) -> bool:
+        """Return whether the list is available.
+
+        With an outbox, the list stays available while Notion is unreachable,
+        so edits are queued instead of being dropped by the service call.
+        """
+        return super().available or self.coordinator.available_offline
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is None:
+        """Handle updated data from the coordinator.
+
+        The state is only written if the items or the availability changed,
+        a poll without changes does not reach the recorder or the frontend.
+        """
+        started = perf_counter()
+        changed = self._update_items()
+        self.coordinator.client.metrics.record_entity_update(perf_counter() - started)
+        self._async_fetch_missing_descriptions()
+        available = self.available
+        if not changed and available == self._available:
+            return
+        self._available = available
+        super()._handle_coordinator_update()
+
+    def _update_items(self) -> bool:
+        """Update the todo items from the coordinator data, reusing unchanged items."""
+        data = self.coordinator.data
+        if data is None:
+            changed = self._attr_todo_items is not None
+            self._items = {}
             self._attr_todo_items = None
+            return changed
+
+        # Notion truncates last_edited_time to the minute, so two edits within a
+        # minute only differ in their fields. Unchanged tasks are usually the
+        # very same record, which makes the comparison cheap.
+        changed = list(data) != list(self._items)
+        items = {}
+        for uid, task in data.items():
+            cached = self._items.get(uid)
+            if cached is not None and (cached[0] is task or cached[0] == task):
+                items[uid] = cached
+            else:
+                items[uid] = (task, self._to_todo_item(task))
+                changed = True
+        self._items = items
+        if changed:
+            self._attr_todo_items = [item for _, item in items.values()]
+        return changed
+
+    @callback
+    def _async_fetch_missing_descriptions(self) -> None:
+        """Read missing descriptions while the list is open.
+
+        Only a subscribed client, e.g. an open todo card, has the content of
+        the pages fetched, when it subscribes and after coordinator updates.
+        The items are updated once it arrives.
+        """
+        if not self.coordinator.block_descriptions or not self._update_listeners or self._fetching_descriptions:
+            return
+        missing = [task for task, _ in self._items.values() if self.coordinator.description_missing(task)]
+        if missing:
+            self._fetching_descriptions = True
+            self.hass.async_create_background_task(
+                self._async_fetch_descriptions(missing), f"{self.entity_id} descriptions"
+            )
+
+    async def _async_fetch_descriptions(self, tasks: list[NotionTask]) -> None:
+        try:
+            fetched = await self.coordinator.async_fetch_descriptions(tasks)
+        finally:
+            self._fetching_descriptions = False
+        # Rebuild the items of the fetched tasks with their descriptions.
+        for uid in fetched:
+            self._items.pop(uid, None)
+        if self._update_items():
+            self.async_write_ha_state()
+        # Tasks added while the content was read.
+        self._async_fetch_missing_descriptions()
+
+    def _to_todo_item(self, task: NotionTask) -> TodoItem:
+        if self.coordinator.block_descriptions:
+            description = self.coordinator.cached_description(task)
         else:
-            items = []
-            for task in self.coordinator.data['results']:
-                id = task['id']
-                self._status[id] = propHelper.get_property_by_id(TASK_STATUS_PROPERTY, task)
-                status = NOTION_TO_HASS_STATUS[self._status[id]]
-
-                items.append(
-                    TodoItem(
-                        summary=propHelper.get_property_by_id('title', task),
-                        uid=id,
-                        status=status,
-                        description=propHelper.get_property_by_id(TASK_DESCRIPTION_PROPERTY, task),
-                        due=propHelper.get_property_by_id(TASK_DATE_PROPERTY, task)
-                    )
-                )
-            self._attr_todo_items = items
-        super()._handle_coordinator_update()
+            description = task.description
+        return TodoItem(
+            summary=task.title,
+            uid=task.id,
+            status=NOTION_TO_HASS_STATUS[task.status],
+            description=description,
+            due=task.due
+        )
 
     async def async_create_todo_item(self, item: TodoItem) -> None:
         """Create a To-do item."""
-        await self.coordinator.client.create_task(item.summary, status=HASS_TO_NOTION_STATUS[item.status])
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_create_task(item.summary, HASS_TO_NOTION_STATUS[item.status])
 
     async def async_update_todo_item(self, item: TodoItem) -> None:
-        """Update a To-do item."""
+        """Update a To-do item.
+
+        The item is shown with its new values right away and rolled back if
+        Notion rejects the update. The update is queued, so several edits in
+        a row go out as one request per item.
+        """
         uid: str = cast(str, item.uid)
         status = HASS_TO_NOTION_STATUS[item.status]
-        if self._status[uid] == STATUS_IN_PROGRESS and status == STATUS_NOT_STARTED:
+        current_status = self.coordinator.data[uid].status
+        if current_status == STATUS_IN_PROGRESS and status == STATUS_NOT_STARTED:
             status = STATUS_IN_PROGRESS
-        if self._status[uid] == STATUS_ARCHIVED and status == STATUS_DONE:
+        if current_status == STATUS_ARCHIVED and status == STATUS_DONE:
             status = STATUS_ARCHIVED
 
-        await self.coordinator.client.update_task(task_id=uid,
-                                                  title=item.summary,
-                                                  status=status,
-                                                  due=item.due,
-                                                  description=item.description)
-
-        await self.coordinator.async_refresh()
+        self._attr_todo_items = [item if i.uid == uid else i for i in self._attr_todo_items or []]
+        self.async_write_ha_state()
+        try:
+            await self.coordinator.async_update_task(uid, {
+                "title": item.summary,
+                "status": status,
+                "due": item.due,
+                "description": None if self.coordinator.block_descriptions else item.description,
+            })
+        except Exception:
+            self._async_restore_items({uid})
+            raise
 
     async def async_delete_todo_items(self, uids: list[str]) -> None:
-        """Delete a To-do item."""
-        await asyncio.gather(
-            *[self.coordinator.client.delete_task(task_id=uid) for uid in uids]
+        """Delete a To-do item.
+
+        The items disappear right away. Items whose delete failed are
+        restored and the first error is raised.
+        """
+        self._attr_todo_items = [i for i in self._attr_todo_items or [] if i.uid not in uids]
+        self.async_write_ha_state()
+
+        results = await asyncio.gather(
+            *[self.coordinator.async_delete_task(uid) for uid in uids],
+            return_exceptions=True
         )
-        await self.coordinator.async_refresh()
+        failed = {uid for uid, result in zip(uids, results) if isinstance(result, BaseException)}
+        if failed:
+            self._async_restore_items(failed)
+            raise next(result for result in results if isinstance(result, BaseException))
+
+    @callback
+    def _async_restore_items(self, uids: set[str]) -> None:
+        """Roll back the items shown before a failed write.
+
+        The items are restored from the coordinator data, other items keep
+        the edits made or merged while the write was in flight.
+        """
+        shown = {item.uid: item for item in self._attr_todo_items or []}
+        self._attr_todo_items = [
+            item if uid in uids else shown[uid]
+            for uid, (_, item) in self._items.items()
+            if uid in uids or uid in shown
+        ]
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass update state from existing coordinator data."""
         await super().async_added_to_hass()
         self._handle_coordinator_update()
+
+
+class _UpdateListeners(list):
+    """The subscribers of a list, calling on_subscribe when one is added.
+
+    TodoListEntity.async_subscribe_updates cannot be overridden, it appends
+    the listener of a new subscriber to this list.
+    """
+
+    def __init__(self, on_subscribe: Callable[[], None]) -> None:
+        super().__init__()
+        self._on_subscribe = on_subscribe
+
+    def append(self, listener: Callable) -> None:
+        super().append(listener)
+        self._on_subscribe()
@@ -0,0 +1,161 @@
+"""Webhook receiving change notifications for notion_todo."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import hmac
+import json
+import uuid
+
+from aiohttp import web
+
+from homeassistant.components import persistent_notification, webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_VERIFICATION_TOKEN, DOMAIN, LOGGER
+from .coordinator import NotionDataUpdateCoordinator
+
+
+@dataclass(slots=True)
+class ChangeNotification:
+    """The pages and databases a notification reports as changed."""
+
+    database_id: str | None = None
+    page_ids: set[str] = field(default_factory=set)
+    schema_changed: bool = False
+
+
+def parse_notification(payload: dict) -> ChangeNotification:
+    """Parse a Notion webhook event or a relayed list of page ids.
+
+    Notion events name the changed object in entity and its database in
+    data.parent. A relay, e.g. an automation, posts {"page_ids": [...]} with
+    an optional "database_id".
+
+    Raises:
+        TypeError: if the payload is neither
+        ValueError: if an id is not a UUID
+
+    """
+    if not isinstance(payload, dict):
+        raise TypeError("Payload is not an object")
+    notification = ChangeNotification()
+    if "entity" in payload:
+        entity = payload["entity"]
+        if not isinstance(entity, dict) or "id" not in entity:
+            raise ValueError("Event without entity id")
+        parent = (payload.get("data") or {}).get("parent") or {}
+        if entity.get("type") == "page":
+            notification.page_ids.add(_normalize_id(entity["id"]))
+            if parent.get("type") in ("database", "database_id") and parent.get("id"):
+                notification.database_id = _normalize_id(parent["id"])
+        elif entity.get("type") == "database":
+            notification.database_id = _normalize_id(entity["id"])
+            notification.schema_changed = True
+        return notification
+    page_ids = payload.get("page_ids", [payload["page_id"]] if "page_id" in payload else None)
+    if not isinstance(page_ids, list):
+        raise TypeError("Payload names no pages")
+    notification.page_ids.update(_normalize_id(page_id) for page_id in page_ids)
+    if payload.get("database_id"):
+        notification.database_id = _normalize_id(payload["database_id"])
+    return notification
+
+
+def valid_signature(token: str, body: bytes, signature: str | None) -> bool:
+    """Check the X-Notion-Signature of a request against the verification token."""
+    if not signature:
+        return False
+    expected = "sha256=" + hmac.new(token.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+@callback
+def async_register_webhook(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Register the webhook of an entry until it is unloaded."""
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+    webhook.async_register(
+        hass, DOMAIN, entry.title, webhook_id, async_handle_webhook, allowed_methods=["POST"]
+    )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+
+
+async def async_handle_webhook(hass: HomeAssistant, webhook_id: str, request: web.Request) -> web.Response:
+    """Handle a change notification.
+
+    The first request of a Notion webhook subscription carries the
+    verification token, which is shown in a persistent notification to be
+    entered in Notion and in the options. Once it is set in the options,
+    every request must be signed with it.
+    """
+    entry = next(
+        (entry for entry in hass.config_entries.async_entries(DOMAIN)
+         if entry.data.get(CONF_WEBHOOK_ID) == webhook_id),
+        None
+    )
+    coordinators: dict[str, NotionDataUpdateCoordinator] | None = (
+        hass.data.get(DOMAIN, {}).get(entry.entry_id) if entry else None
+    )
+    if coordinators is None:
+        return web.Response(status=404)
+
+    body = await request.read()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return web.Response(status=400, text="Invalid JSON")
+
+    if isinstance(payload, dict) and "verification_token" in payload:
+        # The token signs every notification, so it is shown in the frontend
+        # instead of being written to the log.
+        LOGGER.info("Received the Notion webhook verification token for %s", entry.title)
+        persistent_notification.async_create(
+            hass,
+            f"Enter the verification token `{payload['verification_token']}` in Notion to verify the "
+            "webhook subscription, and in the integration options.",
+            title=f"Notion ToDo webhook of {entry.title}",
+            notification_id=f"{DOMAIN}_{entry.entry_id}_verification_token",
+        )
+        return web.Response(status=200)
+
+    token = entry.options.get(CONF_VERIFICATION_TOKEN)
+    if token and not valid_signature(token, body, request.headers.get("X-Notion-Signature")):
+        return web.Response(status=401, text="Invalid signature")
+
+    try:
+        notification = parse_notification(payload)
+    except (KeyError, TypeError, ValueError) as exception:
+        return web.Response(status=400, text=str(exception))
+
+    if notification.database_id is None and len(coordinators) > 1 and notification.page_ids:
+        # The database of the pages is unknown, the pages are fetched once
+        # instead of by every database, which ignore pages of the others.
+        entry.async_create_background_task(
+            hass, _async_dispatch_pages(coordinators, notification.page_ids), f"{DOMAIN} push"
+        )
+        return web.Response(status=200)
+
+    for database_id, coordinator in coordinators.items():
+        if notification.database_id and notification.database_id.replace('-', '') != database_id.replace('-', ''):
+            continue
+        if notification.schema_changed:
+            coordinator.client.invalidate_database()
+            await coordinator.async_request_refresh()
+        elif notification.page_ids:
+            coordinator.async_push(notification.page_ids)
+    return web.Response(status=200)
+
+
+async def _async_dispatch_pages(coordinators: dict[str, NotionDataUpdateCoordinator], page_ids: set[str]) -> None:
+    """Fetch pages of an unknown database once and merge them into the databases they belong to."""
+    client = next(iter(coordinators.values())).client
+    pages = await client.get_pages(page_ids, return_exceptions=True)
+    for coordinator in coordinators.values():
+        coordinator.async_merge_pages(pages)
+
+
+def _normalize_id(id: str) -> str:
+    # Notion accepts ids with or without dashes, but returns them with dashes.
+    return str(uuid.UUID(str(id)))
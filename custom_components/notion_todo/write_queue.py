@@ -0,0 +1,121 @@
+"""Batching write queue for Notion task mutations."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .const import LOGGER, WRITE_BATCH_WINDOW
+
+WriteListener = Callable[[dict[str, dict | None]], None]
+
+
+class _PendingWrite:
+    """Mutations of one page waiting to be sent."""
+
+    __slots__ = ('values', 'delete', 'futures')
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+        self.delete = False
+        self.futures: list[asyncio.Future] = []
+
+
+class NotionWriteQueue:
+    """Collect task mutations over a short window and send one request per page.
+
+    Several updates of the same page are merged into one update with the final
+    values, a delete supersedes all updates of the page. The pages of a batch
+    are sent concurrently, the rate limit is enforced by the client. Every
+    caller gets the result or error of the request its mutation went out
+    with, and the listeners are told once about all pages of a batch.
+    """
+
+    def __init__(
+        self,
+        update: Callable[[str, dict[str, Any]], Awaitable[dict]],
+        delete: Callable[[str], Awaitable[dict]],
+        window: float = WRITE_BATCH_WINDOW,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            update (Callable): sends the merged values of a page
+            delete (Callable): deletes a page
+            window (float): seconds to collect mutations before sending them
+
+        """
+        self._update = update
+        self._delete = delete
+        self._window = window
+        self._pending: dict[str, _PendingWrite] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+        self._listeners: list[WriteListener] = []
+
+    def add_listener(self, listener: WriteListener) -> Callable[[], None]:
+        """Call listener with {page id: page, or None if deleted} after each batch."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def async_update(self, task_id: str, values: dict[str, Any]) -> dict:
+        """Queue an update of a page and wait for the page Notion returns."""
+        return await self._enqueue(task_id, values)
+
+    async def async_delete(self, task_id: str) -> dict:
+        """Queue the deletion of a page and wait until it is deleted."""
+        return await self._enqueue(task_id, None)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of pages waiting to be written."""
+        return len(self._pending)
+
+    def _enqueue(self, task_id: str, values: dict[str, Any] | None) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        pending = self._pending.setdefault(task_id, _PendingWrite())
+        if values is None:
+            pending.delete = True
+        else:
+            pending.values.update(values)
+        future = loop.create_future()
+        pending.futures.append(future)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._start_flush)
+        return future
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        flush = asyncio.get_running_loop().create_task(self._async_flush())
+        self._flushes.add(flush)
+        flush.add_done_callback(self._flushes.discard)
+
+    async def _async_flush(self) -> None:
+        batch, self._pending = self._pending, {}
+        task_ids = list(batch)
+        LOGGER.debug("Writing %s pages", len(task_ids))
+        results = await asyncio.gather(
+            *[self._send(task_id, batch[task_id]) for task_id in task_ids],
+            return_exceptions=True
+        )
+
+        written = {}
+        for task_id, result in zip(task_ids, results):
+            pending = batch[task_id]
+            for future in pending.futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            if not isinstance(result, BaseException):
+                written[task_id] = None if pending.delete else result
+        if written:
+            for listener in list(self._listeners):
+                listener(written)
+
+    def _send(self, task_id: str, pending: _PendingWrite) -> Awaitable[dict]:
+        if pending.delete:
+            return self._delete(task_id)
+        return self._update(task_id, pending.values)